@@ -0,0 +1,70 @@
+"""浏览器池基准：每次查询新启动浏览器 vs. 复用 ``BrowserPool`` 的页面。
+
+不访问网络：每次"查询"在页面中写入一段 HTML 并读取链接，耗时几乎全部来自
+浏览器的启动和页面创建。需要先运行 ``playwright install chromium``；
+``--remote`` 给出 ``ws://`` 地址时连接远程 Playwright 服务器。
+
+用法: python benchmarks/bench_browser_pool.py [--herbs 30] [--pool 4] [--remote ws://127.0.0.1:1985]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from playwright.sync_api import sync_playwright
+
+from biorange.utils.browser_pool import BrowserPool
+
+HTML = '<table><tr><td><a href="molecule.php?qn={0}">{0}</a></td></tr></table>'
+
+
+def legacy_search(term, remote):
+    """原来的写法：每个草药都启动 Playwright 和浏览器。"""
+    with sync_playwright() as p:
+        if remote:
+            browser = p.chromium.connect(remote)
+        else:
+            browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_content(HTML.format(term))
+        href = page.get_attribute("a", "href")
+        browser.close()
+        return href
+
+
+async def pooled_search(page, term):
+    await page.set_content(HTML.format(term))
+    return await page.get_attribute("a", "href")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--herbs", type=int, default=30)
+    parser.add_argument("--pool", type=int, default=4)
+    parser.add_argument("--remote", default=None)
+    args = parser.parse_args()
+    terms = [f"herb{i}" for i in range(args.herbs)]
+
+    start = time.perf_counter()
+    for term in terms:
+        legacy_search(term, args.remote)
+    print(f"{'legacy':>10} {args.herbs} herbs {time.perf_counter() - start:>7.2f}s")
+
+    start = time.perf_counter()
+    with BrowserPool(args.pool, remote_url=args.remote) as pool:
+        warm = time.perf_counter() - start
+        with ThreadPoolExecutor(args.pool) as executor:
+            list(
+                executor.map(
+                    lambda term: pool.run(lambda page: pooled_search(page, term)),
+                    terms,
+                )
+            )
+    print(
+        f"{'pool':>10} {args.herbs} herbs {time.perf_counter() - start:>7.2f}s "
+        f"(startup {warm:.2f}s, {args.pool} pages)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""批量绘图基准：连续绘制 500 张 PPI 网络图时的内存与耗时。
+
+``legacy`` 模仿原来的写法（每张图 ``plt.figure``、保存后不关闭），``headless``
+使用 ``render_many``（Agg 后端、复用图形）；每 100 张打印一次常驻内存。
+``--workers`` 大于 1（且有多个 CPU）时再用进程池绘制同样的图并计时。
+
+用法: python benchmarks/bench_rendering.py [--plots 500] [--nodes 60] [--workers 4]
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import networkx as nx  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from biorange.ppi.graph_builder import NetworkGraph  # noqa: E402
+from biorange.ppi.layout import compute_layout  # noqa: E402
+from biorange.ppi.ppi_final import plot_ppi_network  # noqa: E402
+from biorange.utils.rendering import render_many  # noqa: E402
+
+
+def rss_mb():
+    """当前常驻内存（Linux 读 /proc，其他平台退回峰值）。"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_nodes(n_nodes, seed):
+    edges = np.array(nx.barabasi_albert_graph(n_nodes, 2, seed=seed).edges())
+    return pd.DataFrame(
+        {
+            "preferredName_A": [f"G{a}" for a in edges[:, 0]],
+            "preferredName_B": [f"G{b}" for b in edges[:, 1]],
+        }
+    )
+
+
+def legacy_plot(nodes, output_dir, dpi):
+    """与 ``plot_ppi_network`` 相同的图，但每次新建图形且不关闭。"""
+    graph = NetworkGraph.from_frame(nodes, "preferredName_A", "preferredName_B")
+    plt.figure(figsize=(10, 10))
+    nx.draw(
+        graph.to_networkx(),
+        compute_layout(graph, "spectral"),
+        with_labels=True,
+        node_size=30,
+        node_color="#4562E0",
+        font_size=9,
+        edge_color="gray",
+        width=0.1,
+    )
+    plt.title("Protein-Protein Interaction Network")
+    plt.savefig(os.path.join(output_dir, "ppi_network.png"), dpi=dpi)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--plots", type=int, default=500)
+    parser.add_argument("--nodes", type=int, default=60)
+    parser.add_argument("--dpi", type=int, default=72)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    nodes = make_nodes(args.nodes, 0)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["BIORANGE_CACHE_DIR"] = tmp
+        jobs = [
+            dict(
+                nodes=nodes,
+                output_dir=tmp,
+                dpi=args.dpi,
+                layout="spectral",
+                formats=("png",),
+            )
+        ] * 100
+
+        print(f"{'mode':>9} {'plots':>6} {'rss':>9} {'time':>8}")
+        start = time.perf_counter()
+        for done in range(100, args.plots + 1, 100):
+            for _ in range(100):
+                legacy_plot(nodes, tmp, args.dpi)
+            print(
+                f"{'legacy':>9} {done:>6} {rss_mb():>7.0f}MB "
+                f"{time.perf_counter() - start:>7.1f}s"
+            )
+        plt.close("all")
+
+        start = time.perf_counter()
+        for done in range(100, args.plots + 1, 100):
+            render_many(plot_ppi_network, jobs)
+            print(
+                f"{'headless':>9} {done:>6} {rss_mb():>7.0f}MB "
+                f"{time.perf_counter() - start:>7.1f}s"
+            )
+
+        if args.workers > 1 and (os.cpu_count() or 1) > 1:
+            start = time.perf_counter()
+            render_many(plot_ppi_network, jobs * (args.plots // 100), args.workers)
+            print(
+                f"{args.workers} processes: {args.plots} plots in "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""集合交集基准：位掩码引擎与 Python 集合运算。
+
+在 ``--genes`` 个基因上随机生成若干集合（每个基因以 30% 的概率属于每个集合），
+比较 ``SetIntersection.counts()`` 与逐个组合做 ``set.intersection`` 得到全部
+包含计数的耗时；Python 集合只在不超过 ``--naive-max`` 个集合时运行。
+
+用法: python benchmarks/bench_set_engine.py [--genes 300000] [--sets 6 12 20]
+"""
+
+import argparse
+import time
+from itertools import combinations
+
+import numpy as np
+
+from biorange.venn.set_engine import SetIntersection
+
+
+def naive_inclusive(sets):
+    counts = {}
+    for k in range(1, len(sets) + 1):
+        for combo in combinations(range(len(sets)), k):
+            counts[combo] = len(set.intersection(*(sets[i] for i in combo)))
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--genes", type=int, default=300000)
+    parser.add_argument("--sets", type=int, nargs="+", default=[6, 12, 20])
+    parser.add_argument("--naive-max", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    genes = np.array([f"GENE{i}" for i in range(args.genes)], dtype=object)
+    print(f"{'sets':>5} {'regions':>8} {'engine':>8} {'matrix':>8} {'python':>8}")
+    for n_sets in args.sets:
+        groups = [genes[rng.random(args.genes) < 0.3] for _ in range(n_sets)]
+        labels = [f"S{i}" for i in range(n_sets)]
+
+        start = time.perf_counter()
+        engine = SetIntersection(groups, labels)
+        counts = engine.counts()
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        engine.membership_matrix()
+        matrix = time.perf_counter() - start
+
+        naive = "-"
+        if n_sets <= args.naive_max:
+            start = time.perf_counter()
+            sets = [set(group) for group in groups]
+            reference = naive_inclusive(sets)
+            naive = f"{time.perf_counter() - start:.2f}s"
+            assert sorted(reference.values()) == sorted(counts["inclusive"])
+        print(
+            f"{n_sets:>5} {len(counts):>8} {elapsed:>7.2f}s {matrix:>7.2f}s {naive:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""药物 × 疾病共有靶点矩阵基准。
+
+随机生成 ``--drugs`` 个药物和 ``--diseases`` 个疾病的靶点集合（基因词表
+``--genes`` 个），计时构建、全部药物-疾病对的统计、每个药物的前 k 个疾病，
+并与逐对 Python 集合交集（只取前 ``--naive-drugs`` 个药物后按比例外推）比较。
+
+用法: python benchmarks/bench_shared_targets.py [--drugs 5000] [--diseases 500]
+"""
+
+import argparse
+import resource
+import time
+
+import numpy as np
+
+from biorange.target_predict.shared_targets import SharedTargetMatrix
+
+
+def random_sets(prefix, n_sets, genes, low, high, rng):
+    return {
+        f"{prefix}{i}": list(rng.choice(genes, rng.integers(low, high), replace=False))
+        for i in range(n_sets)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--drugs", type=int, default=5000)
+    parser.add_argument("--diseases", type=int, default=500)
+    parser.add_argument("--genes", type=int, default=20000)
+    parser.add_argument("--block-size", type=int, default=1000)
+    parser.add_argument("--naive-drugs", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    genes = np.array([f"GENE{i}" for i in range(args.genes)], dtype=object)
+    drugs = random_sets("drug", args.drugs, genes, 20, 400, rng)
+    diseases = random_sets("disease", args.diseases, genes, 50, 2000, rng)
+
+    start = time.perf_counter()
+    engine = SharedTargetMatrix(drugs, diseases)
+    print(f"build:  {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    n_pairs = sum(len(b) for b in engine.iter_blocks(args.block_size))
+    print(f"pairs:  {time.perf_counter() - start:.2f}s ({n_pairs} pairs with overlap)")
+
+    start = time.perf_counter()
+    top = engine.top_k(10, block_size=args.block_size)
+    print(f"top-10: {time.perf_counter() - start:.2f}s ({len(top)} rows)")
+
+    start = time.perf_counter()
+    disease_sets = [set(v) for v in diseases.values()]
+    for targets in list(drugs.values())[: args.naive_drugs]:
+        targets = set(targets)
+        [len(targets & other) for other in disease_sets]
+    naive = (time.perf_counter() - start) * args.drugs / args.naive_drugs
+    print(f"python sets (intersection sizes only, extrapolated): {naive:.2f}s")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak RSS: {peak:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
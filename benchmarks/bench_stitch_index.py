@@ -0,0 +1,101 @@
+"""STITCH 查询延迟基准：列式索引 vs 逐块扫描 gz。
+
+分别用 1、100、10000 个 InChIKey 查询化学物质表和蛋白互作表，打印两种方式
+的单次查询耗时。仓库未内置 9606.protein_chemical.links 文件时，会用内置化学
+物质表中的 ID 生成一个同格式的模拟文件。
+
+用法: python benchmarks/bench_stitch_index.py [--links-rows 2000000]
+"""
+
+import argparse
+import gzip
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from biorange.target_predict.mol_target.stitch_inchikey import TCMDataProcessor
+from biorange.utils.package_fileload import get_data_file_path
+
+SIZES = (1, 100, 10000)
+
+
+def make_links_file(path, chemical_ids, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "chemical": rng.choice(chemical_ids, rows),
+            "protein": [f"9606.ENSP{n:011d}" for n in rng.integers(0, 20000, rows)],
+            "combined_score": rng.integers(150, 1000, rows),
+        }
+    )
+    with gzip.open(path, "wt") as f:
+        df.to_csv(f, sep="\t", index=False)
+
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links-rows", type=int, default=2000000)
+    args = parser.parse_args()
+
+    chemical_file = str(get_data_file_path("TCMSP_NGM_STITCH_INCHIKEY_202410.tsv.gz"))
+    chemical_table = pd.read_csv(chemical_file, sep="\t")
+    tmp = tempfile.TemporaryDirectory()
+
+    protein_file = str(
+        get_data_file_path("9606.protein_chemical.links.transfer.v5.0.tsv.gz")
+    )
+    if not os.path.exists(protein_file):
+        protein_file = os.path.join(tmp.name, "links.tsv.gz")
+        make_links_file(
+            protein_file, chemical_table["flat_chemical_id"].unique(), args.links_rows
+        )
+
+    indexed = TCMDataProcessor(index_dir=os.path.join(tmp.name, "index"))
+    scanned = TCMDataProcessor(use_index=False)
+
+    start = time.perf_counter()
+    indexed.build_index(chemical_file, "chemical")
+    indexed.build_index(protein_file, "protein")
+    print(f"one-time index build: {time.perf_counter() - start:.2f}s")
+
+    rng = np.random.default_rng(1)
+    all_keys = chemical_table["inchikey"].unique()
+    print(f"{'n_keys':>8} {'step':>9} {'gz scan':>10} {'index':>10} {'speedup':>8}")
+    for n in SIZES:
+        keys = list(rng.choice(all_keys, min(n, len(all_keys)), replace=False))
+        t_scan, chem_scan = timed(
+            lambda: scanned._merge_with_large_chemical_data(keys, chemical_file), 1
+        )
+        t_index, chem_index = timed(
+            lambda: indexed._merge_with_large_chemical_data(keys, chemical_file), 5
+        )
+        assert len(chem_scan) == len(chem_index)
+        print(
+            f"{n:>8} {'chemical':>9} {t_scan:>9.3f}s {t_index:>9.4f}s {t_scan / t_index:>7.0f}x"
+        )
+
+        t_scan, _ = timed(
+            lambda: scanned._map_chemical_to_protein(chem_scan, protein_file), 1
+        )
+        t_index, _ = timed(
+            lambda: indexed._map_chemical_to_protein(chem_index, protein_file), 5
+        )
+        print(
+            f"{n:>8} {'protein':>9} {t_scan:>9.3f}s {t_index:>9.4f}s {t_scan / t_index:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
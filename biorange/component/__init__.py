@@ -1 +1,5 @@
-from .tcmsp_component import TCMSPComponentLocalScraper, tcmsp_raw_component
+from .tcmsp_component import (
+    TCMSPComponentLocalScraper,
+    tcmsp_raw_component,
+    tcmsp_raw_component_batch,
+)
@@ -1,33 +1,87 @@
+import asyncio
 import json
 import re
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, Iterable, List, Optional
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 
 from biorange.logger import get_logger
-from biorange.utils.package_fileload import get_data_file_path
+from biorange.utils.browser_pool import BrowserPool
+from biorange.utils.lazy_loader import LazyMethod
+from biorange.utils.package_fileload import get_data_file_path, load_data_file
 
 logger = get_logger(__name__)
 
+TCMSP_URL = "https://old.tcmsp-e.com"
+RESULT_CELL = "#grid > div.k-grid-content > table > tbody > tr > td:nth-child(3)"
+
+
+class _RateLimiter:
+    """异步限速：相邻两次放行至少间隔 ``1 / rate`` 秒，``rate`` 为 None 时不限速。"""
+
+    def __init__(self, rate: Optional[float]):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            start = max(self._next, now)
+            self._next = start + self.interval
+        await asyncio.sleep(start - now)
+
 
 class TCMSPComponentLocalScraper:
-    def __init__(self, use_remote: bool = False, remote_url: Optional[str] = None):
+    def __init__(
+        self,
+        use_remote: bool = False,
+        remote_url: Optional[str] = None,
+        pool_size: int = 4,
+        retries: int = 1,
+        base_url: str = TCMSP_URL,
+    ):
         """
         初始化草药查询器，提供本地或远程的 Playwright 环境配置选项。
 
+        浏览器在第一次查询时启动，之后所有查询复用 ``pool_size`` 个页面（可从多个
+        线程同时查询）；用 ``with`` 语句或 ``close()`` 关闭浏览器。
+
         Args:
             use_remote (bool): 是否使用远程 Playwright 服务器。
             remote_url (Optional[str]): 远程服务器的 WebSocket URL（如果使用远程）。
+            pool_size (int): 浏览器池的页面数，即最大并行查询数，默认为 4。
+            retries (int): 页面查询失败时换新页面重试的次数，默认为 1。
+            base_url (str): TCMSP 站点地址，可以指向本地的替身服务，便于离线测试。
         """
         self.use_remote = use_remote
         self.remote_url = (
             remote_url or "ws://127.0.0.1:1985"
         )  # TODO 全局配置文件设置playwright服务器
+        self.retries = retries
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+        self.pool = BrowserPool(
+            pool_size, remote_url=self.remote_url if use_remote else None
+        )
         self._setup_playwright()
 
+    def close(self):
+        """关闭浏览器池。"""
+        self.pool.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def _setup_playwright(self):
         """
         为用户提供配置 Playwright 环境的提示。
@@ -54,38 +108,31 @@ class TCMSPComponentLocalScraper:
         Returns:
             str: 搜索结果的 URL。
         """
-        with sync_playwright() as p:
-            if self.use_remote:
-                browser = p.chromium.connect(self.remote_url)
-            else:
-                browser = p.chromium.launch(headless=True)
+        href = self.pool.run(
+            lambda page: self._find_result_href(page, search_term),
+            retries=self.retries,
+        )
+        if href:
+            result_url = f"{self.base_url}/{href}"
+            logger.info(f"成功获取搜索结果的URL: {result_url}")
+            return result_url
+        else:
+            logger.error("未能获取搜索结果的URL")
+            raise ValueError("未能获取搜索结果的URL")
 
-            page = browser.new_page()
-            page.goto("https://old.tcmsp-e.com/browse.php?qc=herbs")
+    async def _find_result_href(self, page, search_term: str) -> Optional[str]:
+        """在池中的页面上搜索草药，返回第一条结果的链接。"""
+        await page.goto(f"{self.base_url}/browse.php?qc=herbs")
 
-            # 在搜索框中输入搜索词
-            page.fill("#inputVarTcm", search_term)
-            page.click("#searchBtTcm")
+        # 在搜索框中输入搜索词
+        await page.fill("#inputVarTcm", search_term)
+        await page.click("#searchBtTcm")
 
-            # 等待搜索结果加载
-            page.wait_for_selector(
-                "#grid > div.k-grid-content > table > tbody > tr > td:nth-child(3)"
-            )
+        # 等待搜索结果加载
+        await page.wait_for_selector(RESULT_CELL)
 
-            # 获取搜索结果的href
-            href = page.get_attribute(
-                "#grid > div.k-grid-content > table > tbody > tr > td:nth-child(3) > a",
-                "href",
-            )
-            browser.close()
-
-            if href:
-                result_url = f"https://old.tcmsp-e.com/{href}"
-                logger.info(f"成功获取搜索结果的URL: {result_url}")
-                return result_url
-            else:
-                logger.error("未能获取搜索结果的URL")
-                raise ValueError("未能获取搜索结果的URL")
+        # 获取搜索结果的href
+        return await page.get_attribute(f"{RESULT_CELL} > a", "href")
 
     def fetch_webpage_content(self, url: str) -> str:
         """
@@ -98,7 +145,7 @@ class TCMSPComponentLocalScraper:
             str: 网页的HTML内容。
         """
         try:
-            response = requests.get(url)
+            response = self.session.get(url)
             response.raise_for_status()
             logger.info(f"成功获取网页内容: {url}")
             return response.text
@@ -186,7 +233,7 @@ class TCMSPComponentLocalScraper:
                 logger.info("数据已成功提取并转换为DataFrame")
 
                 logger.info(f"合并离线数据{get_data_file_path('TCMSP_mol.csv')}")
-                csv_table = pd.read_csv(get_data_file_path("TCMSP_mol.csv"))
+                csv_table = load_data_file("TCMSP_mol.csv")
                 data = pd.merge(
                     data["MOL_ID"],
                     csv_table,
@@ -204,11 +251,91 @@ class TCMSPComponentLocalScraper:
             logger.exception("处理过程中发生错误:")
             return pd.DataFrame()  # 返回空的DataFrame以确保函数返回类型一致
 
+    async def _fetch_herb(self, herb_name, semaphore, limiter):
+        """查询一个草药的成分 MOL_ID；失败时记录日志并返回 None。"""
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            try:
+                await limiter.wait()
+                href = await self.pool.with_page(
+                    lambda page: self._find_result_href(page, herb_name),
+                    retries=self.retries,
+                )
+                if not href:
+                    raise ValueError("未能获取搜索结果的URL")
+                await limiter.wait()
+                html_content = await loop.run_in_executor(
+                    None, self.fetch_webpage_content, f"{self.base_url}/{href}"
+                )
+                data = self.extract_json_data(html_content)
+            except Exception:
+                logger.exception(f"查询草药 {herb_name} 时发生错误:")
+                return None
+        if not data:
+            logger.warning(f"草药 {herb_name} 无法提取数据")
+            return None
+        return pd.DataFrame({"herb": herb_name, "MOL_ID": [d["MOL_ID"] for d in data]})
+
+    async def _fetch_herbs(self, herb_names, max_concurrency, requests_per_second):
+        semaphore = asyncio.Semaphore(max_concurrency)
+        limiter = _RateLimiter(requests_per_second)
+        return await asyncio.gather(
+            *(self._fetch_herb(herb, semaphore, limiter) for herb in herb_names)
+        )
+
+    def search_herbs(
+        self,
+        herb_names: Iterable[str],
+        max_concurrency: int = 4,
+        requests_per_second: Optional[float] = 2.0,
+    ) -> pd.DataFrame:
+        """
+        并发查询多个草药，返回合并后的结果。
+
+        搜索页（浏览器池中的页面）和结果页下载在同一个事件循环中并发进行，
+        同时处理的草药数不超过 ``max_concurrency``，对 TCMSP 的请求（搜索和下载各
+        一次）总速率不超过 ``requests_per_second``。所有草药的 MOL_ID 拼接后只与
+        离线数据 TCMSP_mol.csv 合并一次。
+
+        Args:
+            herb_names (Iterable[str]): 草药名，重复的只查询一次。
+            max_concurrency (int): 同时处理的草药数，默认为 4（实际并行的搜索还受
+                浏览器池大小限制）。
+            requests_per_second (float, optional): 每秒最多发出的请求数，默认为 2；
+                为 None 时不限速。
 
-tcmsp_raw_component = TCMSPComponentLocalScraper(use_remote=True).search_herb
+        Returns:
+            pd.DataFrame: 首列 ``herb`` 为草药名，其余列同 ``search_herb``，
+            按输入的草药顺序排列；查询失败的草药没有对应的行。
+        """
+        herb_names = list(dict.fromkeys(herb_names))
+        csv_table = load_data_file("TCMSP_mol.csv")
+        frames = [
+            frame
+            for frame in self.pool.run_async(
+                self._fetch_herbs(herb_names, max_concurrency, requests_per_second)
+            )
+            if frame is not None
+        ]
+        if not frames:
+            logger.warning("所有草药均未查询到成分，返回空的DataFrame")
+            return pd.DataFrame(columns=["herb"] + list(csv_table.columns))
+
+        logger.info(f"合并离线数据{get_data_file_path('TCMSP_mol.csv')}")
+        return pd.merge(
+            pd.concat(frames, ignore_index=True), csv_table, on="MOL_ID", how="inner"
+        )
+
+
+tcmsp_raw_component = LazyMethod(
+    TCMSPComponentLocalScraper, "search_herb", use_remote=True
+)
+tcmsp_raw_component_batch = LazyMethod(
+    TCMSPComponentLocalScraper, "search_herbs", use_remote=True
+)
 if __name__ == "__main__":
 
-    scraper = TCMSPComponentLocalScraper(use_remote=True)
-    df = scraper.search_herb("陈皮")
+    with TCMSPComponentLocalScraper(use_remote=True) as scraper:
+        df = scraper.search_herb("陈皮")
     df.to_csv("out.csv")
     print(df)
@@ -1,4 +1,5 @@
 from biorange.enrich_analysis.enrich_gokegg import (
+    perform_batch_enrichment_analysis as enrich_gokegg_batch,
     perform_enrichment_analysis as enrich_gokegg,
 )
 from biorange.enrich_analysis.plot_bar_gokegg import (
@@ -1,6 +1,58 @@
-import gseapy as gp
+import os
+
+import numpy as np
 import pandas as pd
-from typing import List, Literal
+from typing import Any, Dict, Iterable, List, Literal, Optional, Union
+
+from biorange.enrich_analysis.enrichr_client import get_enrichr_client
+from biorange.enrich_analysis.local_enrich import (
+    library_path,
+    local_enrichr,
+    local_enrichr_batch,
+)
+from biorange.enrich_analysis.result_cache import (
+    EnrichmentCache,
+    cache_key,
+    enrichment_cache,
+)
+
+
+def _run_enrichr(gene_list, library_groups, organism, backend, background, gmt_dir):
+    """
+    用 Enrichr 在线服务或本地引擎分析若干组基因集库，返回每组拼接后的结果。
+
+    "enrichr" 后端把所有组的库一次性并发请求（共用一个连接池）；"gseapy" 后端
+    按组依次调用 ``gseapy.enrichr``；"local" 后端离线计算。
+    """
+    if backend == "local":
+        return [
+            local_enrichr(gene_list, libraries, background=background, gmt_dir=gmt_dir)
+            for libraries in library_groups
+        ]
+    if backend == "enrichr":
+        by_library = get_enrichr_client(organism).enrich(
+            gene_list, [lib for libraries in library_groups for lib in libraries]
+        )
+        return [
+            pd.concat([by_library[lib] for lib in libraries], ignore_index=True)
+            for libraries in library_groups
+        ]
+    if backend != "gseapy":
+        raise ValueError(f"未知的富集分析后端：{backend}")
+
+    import gseapy as gp  # 依赖重，只有使用 gseapy 时才导入
+
+    return [
+        gp.enrichr(
+            gene_list=gene_list,
+            gene_sets=libraries,
+            organism=organism,
+            cutoff=1,  # 设置为1以获取所有结果，稍后会过滤
+            no_plot=True,
+            outdir=None,
+        ).results
+        for libraries in library_groups
+    ]
 
 
 def perform_enrichment_analysis(
@@ -10,6 +62,10 @@ def perform_enrichment_analysis(
     kegg_database: str = "KEGG_2021_Human",
     go_databases: List[str] = None,
     p_value_cutoff: float = 0.05,
+    backend: Literal["enrichr", "gseapy", "local"] = "gseapy",
+    background: Optional[Union[int, Iterable[str]]] = None,
+    gmt_dir: Optional[str] = None,
+    cache: Union[bool, EnrichmentCache] = False,
 ) -> pd.DataFrame:
     """
     对给定的基因列表执行GO和/或KEGG富集分析。
@@ -21,9 +77,22 @@ def perform_enrichment_analysis(
         kegg_database (str): 使用的KEGG数据库。默认为 "KEGG_2021_Human"。
         go_databases (List[str]): 使用的GO数据库列表。如果为None，则使用默认的GO数据库。
         p_value_cutoff (float): 显著性的p值阈值。默认为0.05。
+        backend (Literal['enrichr', 'gseapy', 'local']): "enrichr" 并发请求 Enrichr
+            在线服务（GO 和 KEGG 同时进行，失败自动重试）；"gseapy" 通过
+            ``gseapy.enrichr`` 依次请求；"local" 使用本地 GMT 基因集库离线计算
+            （库名首次使用时下载）。默认为 "gseapy"。
+        background (int | Iterable[str]): 本地分析的背景基因数或背景基因列表，
+            默认为基因集库中的全部基因。
+        gmt_dir (str): 本地分析的 GMT 文件目录，默认为 biorange 缓存目录。
+        cache (bool | EnrichmentCache): 结果缓存。默认为 False，每次重新分析。
+            True 使用默认的磁盘缓存（``BIORANGE_ENRICH_CACHE_TTL``，默认 7 天内
+            相同的输入直接返回缓存结果，在线后端也不会重新请求 Enrichr）；也可以
+            传入自定义的 ``EnrichmentCache``。本地后端的缓存键包含各 GMT 文件的
+            大小和修改时间，更新基因集库后自动失效。
 
     返回:
-        pd.DataFrame: 包含富集分析结果的DataFrame。
+        pd.DataFrame: 包含富集分析结果的DataFrame。``attrs["cache_hit"]`` 表示
+        结果是否来自缓存。
     """
     # 如果未指定GO数据库，则使用默认的GO数据库
     if go_databases is None:
@@ -33,35 +102,87 @@ def perform_enrichment_analysis(
             "GO_Cellular_Component_2021",
         ]
 
-    results = pd.DataFrame()  # 初始化空的DataFrame来存储结果
-
-    # 如果分析类型是GO或全部
-    if analysis_type in ["go", "all"]:
-        # 使用gseapy进行GO富集分析
-        enr_go = gp.enrichr(
-            gene_list=gene_list,
-            gene_sets=go_databases,
-            organism=organism,
-            cutoff=1,  # 设置为1以获取所有结果，稍后会过滤
-            no_plot=True,
-            outdir=None,
+    def compute():
+        return _perform_enrichment_analysis(
+            gene_list,
+            analysis_type,
+            organism,
+            kegg_database,
+            go_databases,
+            p_value_cutoff,
+            backend,
+            background,
+            gmt_dir,
         )
-        go_results = enr_go.results
-        results = pd.concat([results, go_results])  # 将GO结果添加到总结果中
 
-    # 如果分析类型是KEGG或全部
+    if cache is False:
+        results = compute()
+        results.attrs["cache_hit"] = False
+        return results
+    if cache is True:
+        cache = enrichment_cache
+    databases = (go_databases if analysis_type in ["go", "all"] else []) + (
+        [kegg_database] if analysis_type in ["kegg", "all"] else []
+    )
+    if background is None:
+        background_key = None
+    elif isinstance(background, (int, np.integer)):
+        background_key = int(background)
+    else:
+        background_key = sorted(set(background))
+    key = cache_key(
+        gene_list,
+        analysis_type=analysis_type,
+        organism=organism,
+        databases=databases,
+        p_value_cutoff=p_value_cutoff,
+        backend=backend,
+        background=background_key,
+        gmt_dir=str(gmt_dir) if gmt_dir else None,
+        libraries=(
+            _library_signatures(databases, gmt_dir) if backend == "local" else None
+        ),
+    )
+    return cache.get_or_compute(key, compute)
+
+
+def _library_signatures(databases, gmt_dir):
+    """本地 GMT 文件的大小和修改时间，基因集库更新后缓存键随之改变。"""
+    signatures = {}
+    for database in databases:
+        if not isinstance(database, (str, os.PathLike)):
+            continue
+        stat = os.stat(library_path(database, gmt_dir))
+        signatures[str(database)] = [stat.st_size, stat.st_mtime_ns]
+    return signatures
+
+
+def _perform_enrichment_analysis(
+    gene_list,
+    analysis_type,
+    organism,
+    kegg_database,
+    go_databases,
+    p_value_cutoff,
+    backend,
+    background,
+    gmt_dir,
+) -> pd.DataFrame:
+    library_groups = []
+    # 如果分析类型是GO或全部，进行GO富集分析
+    if analysis_type in ["go", "all"]:
+        library_groups.append(go_databases)
+    # 如果分析类型是KEGG或全部，进行KEGG富集分析
     if analysis_type in ["kegg", "all"]:
-        # 使用gseapy进行KEGG富集分析
-        enr_kegg = gp.enrichr(
-            gene_list=gene_list,
-            gene_sets=[kegg_database],
-            organism=organism,
-            cutoff=1,  # 设置为1以获取所有结果，稍后会过滤
-            no_plot=True,
-            outdir=None,
+        library_groups.append([kegg_database])
+
+    # GO 和 KEGG 的结果依次添加到总结果中
+    results = pd.concat(
+        [pd.DataFrame()]
+        + _run_enrichr(
+            gene_list, library_groups, organism, backend, background, gmt_dir
         )
-        kegg_results = enr_kegg.results
-        results = pd.concat([results, kegg_results])  # 将KEGG结果添加到总结果中
+    )
 
     # 根据p值阈值过滤结果
     results = results[results["Adjusted P-value"] < p_value_cutoff]
@@ -72,6 +193,57 @@ def perform_enrichment_analysis(
     return results
 
 
+def perform_batch_enrichment_analysis(
+    gene_lists: Dict[Any, Iterable[str]],
+    analysis_type: Literal["go", "kegg", "all"] = "all",
+    kegg_database: str = "KEGG_2021_Human",
+    go_databases: List[str] = None,
+    p_value_cutoff: float = 0.05,
+    background: Optional[Union[int, Iterable[str]]] = None,
+    gmt_dir: Optional[str] = None,
+    n_workers: int = 1,
+) -> pd.DataFrame:
+    """
+    对多个基因列表执行GO和/或KEGG富集分析（本地引擎）。
+
+    每个基因集库只加载一次，所有列表与库中所有 term 的重叠数由一次稀疏矩阵乘法得到。
+
+    参数:
+        gene_lists (Dict[Any, Iterable[str]]): 列表名 → 基因符号列表。
+        analysis_type, kegg_database, go_databases, p_value_cutoff, background, gmt_dir:
+            同 ``perform_enrichment_analysis``。
+        n_workers (int): 进程数，默认为1。
+
+    返回:
+        pd.DataFrame: 长表，``list_id`` 列为列表名；每个列表内按调整后的p值排序。
+    """
+    if go_databases is None:
+        go_databases = [
+            "GO_Biological_Process_2021",
+            "GO_Molecular_Function_2021",
+            "GO_Cellular_Component_2021",
+        ]
+    gene_sets = []
+    if analysis_type in ["go", "all"]:
+        gene_sets += go_databases
+    if analysis_type in ["kegg", "all"]:
+        gene_sets.append(kegg_database)
+
+    results = local_enrichr_batch(
+        gene_lists,
+        gene_sets,
+        background=background,
+        gmt_dir=gmt_dir,
+        n_workers=n_workers,
+    )
+    results = results[results["Adjusted P-value"] < p_value_cutoff]
+    # 列表顺序不变，列表内按调整后的p值排序
+    position = {list_id: i for i, list_id in enumerate(gene_lists)}
+    results = results.assign(_position=results["list_id"].map(position))
+    results = results.sort_values(["_position", "Adjusted P-value"], kind="stable")
+    return results.drop(columns="_position")
+
+
 # 示例用法
 if __name__ == "__main__":
     gene_list = [
@@ -0,0 +1,175 @@
+"""Enrichr 在线服务客户端
+
+``gseapy.enrichr`` 每次调用都新建 HTTP 会话，并且逐个库串行请求结果。这里
+按 Enrichr 的接口（``addList`` 上传一次基因列表，``export`` 按库导出结果）
+直接请求：所有库的导出请求在一个有界线程池中并发进行，共用一个带连接池的
+``requests.Session``；连接错误、超时和 429/5xx 响应按指数退避重试，每个请求
+的耗时记录在日志中。返回的结果与 ``gseapy.enrichr(...).results`` 的列一致。
+
+``base_url`` 可以指向本地的替身服务，便于离线测试。
+"""
+
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from biorange.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENRICHR_URL = "https://maayanlab.cloud"
+ENRICHR_INSTANCES = {
+    "human": "Enrichr",
+    "mouse": "Enrichr",
+    "fly": "FlyEnrichr",
+    "yeast": "YeastEnrichr",
+    "worm": "WormEnrichr",
+    "fish": "FishEnrichr",
+}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Enrichr export 接口返回的列（不含首列 Gene_set）
+EXPORT_COLUMNS = [
+    "Term",
+    "Overlap",
+    "P-value",
+    "Adjusted P-value",
+    "Old P-value",
+    "Old Adjusted P-value",
+    "Odds Ratio",
+    "Combined Score",
+    "Genes",
+]
+
+
+class EnrichrClient:
+    """复用连接、并发请求多个库的 Enrichr 客户端。
+
+    Args:
+        organism (str): 物种，见 ``ENRICHR_INSTANCES``，默认为 "human"。
+        base_url (str, optional): 服务地址（含实例名），默认根据物种确定。
+        max_workers (int): 同时进行的请求数，默认为 4。
+        retries (int): 失败后的最大重试次数，默认为 3。
+        backoff (float): 首次重试前的等待秒数，之后每次翻倍，默认为 0.5。
+        timeout (float): 单个请求的超时秒数，默认为 60。
+    """
+
+    def __init__(
+        self,
+        organism: str = "human",
+        base_url: Optional[str] = None,
+        max_workers: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 60,
+    ):
+        if base_url is None:
+            if organism.lower() not in ENRICHR_INSTANCES:
+                raise ValueError(
+                    f"不支持的物种：{organism}，可选 {sorted(ENRICHR_INSTANCES)}"
+                )
+            base_url = f"{ENRICHR_URL}/{ENRICHR_INSTANCES[organism.lower()]}"
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        """发送请求，失败时按指数退避重试。"""
+        url = f"{self.base_url}/{path}"
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                response = self.session.request(
+                    method, url, timeout=self.timeout, **kwargs
+                )
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    logger.debug(
+                        f"{method} {path} {kwargs.get('params', '')} "
+                        f"{time.perf_counter() - start:.2f}s"
+                    )
+                    return response
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = repr(e)
+            if attempt == self.retries:
+                raise requests.HTTPError(
+                    f"{method} {url} 在 {self.retries + 1} 次尝试后仍失败：{error}"
+                )
+            delay = self.backoff * 2**attempt
+            logger.warning(
+                f"{method} {path} 失败（{error}），{delay:.1f}s 后重试 "
+                f"({attempt + 1}/{self.retries})"
+            )
+            time.sleep(delay)
+
+    def add_list(self, gene_list: Iterable[str], description: str = "biorange") -> int:
+        """上传基因列表，返回 ``userListId``。"""
+        genes = "\n".join(str(gene).strip() for gene in gene_list)
+        if not genes:
+            raise ValueError("基因列表不能为空")
+        response = self._request(
+            "POST",
+            "addList",
+            files={"list": (None, genes), "description": (None, description)},
+        )
+        return response.json()["userListId"]
+
+    def export(self, user_list_id: int, library: str) -> pd.DataFrame:
+        """导出一个库的富集结果，首列为 ``Gene_set``。"""
+        start = time.perf_counter()
+        response = self._request(
+            "GET",
+            "export",
+            params={
+                "userListId": user_list_id,
+                "filename": "biorange",
+                "backgroundType": library,
+            },
+        )
+        if response.text.strip():
+            result = pd.read_csv(io.StringIO(response.text), sep="\t")
+        else:
+            # 没有任何 term 时 Enrichr 可能返回空内容
+            result = pd.DataFrame(columns=EXPORT_COLUMNS)
+        result.insert(0, "Gene_set", library)
+        logger.info(
+            f"Enrichr {library}: {len(result)} terms in "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+        return result
+
+    def enrich(
+        self, gene_list: Iterable[str], libraries: List[str]
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        上传一次基因列表，并发导出所有库的结果。
+
+        Args:
+            gene_list (Iterable[str]): 基因符号列表。
+            libraries (List[str]): Enrichr 库名。
+
+        Returns:
+            Dict[str, pd.DataFrame]: 库名 → 结果，顺序与 ``libraries`` 一致。
+        """
+        user_list_id = self.add_list(gene_list)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = pool.map(lambda lib: self.export(user_list_id, lib), libraries)
+            return dict(zip(libraries, results))
+
+
+@lru_cache(maxsize=None)
+def get_enrichr_client(organism: str = "human") -> EnrichrClient:
+    """每个物种一个共享客户端，多次分析复用同一个连接池。"""
+    return EnrichrClient(organism)
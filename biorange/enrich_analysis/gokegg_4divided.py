@@ -3,6 +3,8 @@ import matplotlib.pyplot as plt
 from gseapy import barplot, dotplot
 import os
 
+from biorange.utils.rendering import finish_figure
+
 
 def kegg_enrichment_analysis(gene_list, output_dir):
     """
@@ -19,18 +21,23 @@ def kegg_enrichment_analysis(gene_list, output_dir):
     return enr_KEGG
 
 
-def plot_kegg(enr_KEGG, output_dir):
+def plot_kegg(enr_KEGG, output_dir, formats=("png",), dpi=None, show=False):
     """
-    绘制KEGG富集分析结果的图并保存
+    绘制KEGG富集分析结果的图并保存，保存后关闭图形
     """
-    os.makedirs(output_dir, exist_ok=True)
 
     # 绘制柱状图
     barplot_fig = barplot(
         enr_KEGG.res2d, title="KEGG_2021_Human", figsize=(6, 7), color="darkred"
     )
-    barplot_fig.figure.savefig(
-        os.path.join(output_dir, "KEGG_barplot.png"), bbox_inches="tight"
+    finish_figure(
+        barplot_fig.figure,
+        output_dir,
+        "KEGG_barplot",
+        formats,
+        dpi,
+        show,
+        bbox_inches="tight",
     )
 
     # 绘制点图
@@ -41,8 +48,14 @@ def plot_kegg(enr_KEGG, output_dir):
         size=10,
         figsize=(6, 7),
     )
-    dotplot_fig.figure.savefig(
-        os.path.join(output_dir, "KEGG_dotplot.png"), bbox_inches="tight"
+    finish_figure(
+        dotplot_fig.figure,
+        output_dir,
+        "KEGG_dotplot",
+        formats,
+        dpi,
+        show,
+        bbox_inches="tight",
     )
 
 
@@ -65,11 +78,10 @@ def go_enrichment_analysis(gene_list, output_dir):
     return enr_GO
 
 
-def plot_go(enr_GO, output_dir):
+def plot_go(enr_GO, output_dir, formats=("png",), dpi=None, show=False):
     """
-    绘制GO富集分析结果的图并保存
+    绘制GO富集分析结果的图并保存，保存后关闭图形
     """
-    os.makedirs(output_dir, exist_ok=True)
 
     # 绘制柱状图，交换横纵坐标
     barplot_fig = barplot(
@@ -83,8 +95,14 @@ def plot_go(enr_GO, output_dir):
         color=["darkred", "darkblue", "green"],
         orientation="horizontal",  # 设置为水平柱状图
     )
-    barplot_fig.figure.savefig(
-        os.path.join(output_dir, "GO_barplot.png"), bbox_inches="tight"
+    finish_figure(
+        barplot_fig.figure,
+        output_dir,
+        "GO_barplot",
+        formats,
+        dpi,
+        show,
+        bbox_inches="tight",
     )
 
     # 绘制点图
@@ -101,8 +119,14 @@ def plot_go(enr_GO, output_dir):
         show_ring=False,
         marker="o",
     )
-    dotplot_fig.figure.savefig(
-        os.path.join(output_dir, "GO_dotplot.png"), bbox_inches="tight"
+    finish_figure(
+        dotplot_fig.figure,
+        output_dir,
+        "GO_dotplot",
+        formats,
+        dpi,
+        show,
+        bbox_inches="tight",
     )
 
 
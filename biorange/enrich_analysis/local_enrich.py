@@ -0,0 +1,416 @@
+"""本地（离线）过表达富集分析
+
+把 GMT 格式的基因集库读成稀疏的 term × gene 关联矩阵，一个基因列表与所有
+term 的重叠数只需一次稀疏矩阵乘法；超几何 p 值和 BH 校正 p 值对所有 term
+一次性向量化计算。输出列与 ``gseapy.enrichr`` 的结果一致，可直接替换在线分析。
+
+基因集库可以是本地 GMT 文件，也可以是 Enrichr 的库名：库名首次使用时从
+Enrichr 下载一次并保存到 ``get_cache_dir("gmt")``，之后完全离线。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from biorange.logger import get_logger
+from biorange.utils.atomic import atomic_write
+from biorange.utils.overlap_stats import benjamini_hochberg, hypergeom_sf
+from biorange.utils.package_fileload import get_cache_dir
+
+logger = get_logger(__name__)
+
+ENRICHR_LIBRARY_URL = "https://maayanlab.cloud/Enrichr/geneSetLibrary"
+
+RESULT_COLUMNS = [
+    "Gene_set",
+    "Term",
+    "Overlap",
+    "P-value",
+    "Adjusted P-value",
+    "Odds Ratio",
+    "Combined Score",
+    "Genes",
+]
+
+
+def read_gmt(path: Union[str, Path]) -> Dict[str, List[str]]:
+    """读取 GMT 文件：每行为 term、描述，其后是基因名（制表符分隔）。"""
+    gene_sets = {}
+    with open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 3:
+                continue
+            # Enrichr 导出的 GMT 中基因名可能带 ",1.0" 之类的权重
+            genes = [g.split(",")[0].strip() for g in fields[2:]]
+            gene_sets[fields[0]] = [g for g in genes if g]
+    return gene_sets
+
+
+def write_gmt(gene_sets: Dict[str, Iterable[str]], path: Union[str, Path]):
+    """把 term → 基因列表写成 GMT 文件。"""
+    with atomic_write(path, "wt", encoding="utf-8") as f:
+        for term, genes in gene_sets.items():
+            f.write("\t".join([term, ""] + list(genes)) + "\n")
+
+
+def download_enrichr_library(name: str, gmt_dir: Optional[Union[str, Path]] = None):
+    """从 Enrichr 下载基因集库并保存为 GMT，返回文件路径；已存在时直接返回。"""
+    gmt_dir = Path(gmt_dir) if gmt_dir else get_cache_dir("gmt")
+    path = gmt_dir / f"{name}.gmt"
+    if path.is_file():
+        return path
+
+    import requests
+
+    logger.info(f"Downloading Enrichr library {name}")
+    response = requests.get(
+        ENRICHR_LIBRARY_URL,
+        params={"mode": "text", "libraryName": name},
+        timeout=60,
+    )
+    response.raise_for_status()
+    gmt_dir.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path, "wt", encoding="utf-8") as f:
+        f.write(response.text)
+    return path
+
+
+class GeneSetLibrary:
+    """一个基因集库的稀疏关联矩阵。
+
+    Args:
+        gene_sets (Dict[str, Iterable[str]]): term → 基因列表。
+        name (str): 库名，对应结果中的 ``Gene_set`` 列。
+    """
+
+    def __init__(self, gene_sets: Dict[str, Iterable[str]], name: str):
+        self.name = name
+        self.terms = np.array(list(gene_sets), dtype=object)
+        members = [list(genes) for genes in gene_sets.values()]
+        codes, genes = pd.factorize(
+            pd.Series(list(chain.from_iterable(members)), dtype=object)
+        )
+        self.genes = np.asarray(genes, dtype=object)
+        self.gene_ids = pd.Index(self.genes)
+        rows = np.repeat(np.arange(len(members)), [len(m) for m in members])
+        # 行为 term、列为基因的 0/1 矩阵；同一 term 内重复的基因只记一次
+        matrix = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.int32), (rows, codes)),
+            shape=(len(self.terms), len(self.genes)),
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        self.matrix = matrix
+        self.term_sizes = np.diff(matrix.indptr).astype(np.int64)
+
+    def __len__(self):
+        return len(self.terms)
+
+    @classmethod
+    def from_gmt(cls, path: Union[str, Path], name: Optional[str] = None):
+        """从 GMT 文件构建，库名默认取文件名（不含扩展名）。"""
+        path = Path(path)
+        return cls(read_gmt(path), name or path.stem)
+
+    def query_vector(self, gene_list: Iterable[str]) -> np.ndarray:
+        """基因列表在本库基因上的 0/1 指示向量（库外基因被忽略）。"""
+        ids = self.gene_ids.get_indexer(
+            pd.unique(pd.Series(list(gene_list), dtype=object))
+        )
+        vector = np.zeros(len(self.genes), dtype=np.int32)
+        vector[ids[ids >= 0]] = 1
+        return vector
+
+    def query_matrix(self, gene_lists: Sequence[Iterable[str]]) -> sparse.csc_matrix:
+        """多个基因列表的 gene × list 0/1 矩阵（库外基因被忽略）。"""
+        rows, cols = [], []
+        for j, gene_list in enumerate(gene_lists):
+            ids = self.gene_ids.get_indexer(
+                pd.unique(pd.Series(list(gene_list), dtype=object))
+            )
+            ids = ids[ids >= 0]
+            rows.append(ids)
+            cols.append(np.full(len(ids), j))
+        rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        cols = np.concatenate(cols) if cols else np.array([], dtype=np.int64)
+        return sparse.csc_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(self.genes), len(gene_lists)),
+        )
+
+    def _with_background(self, background):
+        """返回 (关联矩阵, term 大小, 背景基因数, 背景指示向量或 None)。"""
+        if background is None:
+            return self.matrix, self.term_sizes, len(self.genes), None
+        if isinstance(background, (int, np.integer)):
+            return self.matrix, self.term_sizes, int(background), None
+        in_background = self.query_vector(background)
+        n_background = len(pd.unique(pd.Series(list(background), dtype=object)))
+        matrix = self.matrix.multiply(in_background).tocsr()
+        # multiply 会保留显式的 0，需要去掉后 indices 才只包含背景内的基因
+        matrix.eliminate_zeros()
+        term_sizes = np.asarray(matrix.sum(axis=1)).ravel()
+        return matrix, term_sizes, n_background, in_background
+
+    def enrich(
+        self,
+        gene_list: Iterable[str],
+        background: Optional[Union[int, Iterable[str]]] = None,
+        min_overlap: int = 1,
+    ) -> pd.DataFrame:
+        """
+        对一个基因列表做过表达分析。
+
+        Args:
+            gene_list (Iterable[str]): 基因符号列表。
+            background (int | Iterable[str], optional): 背景基因数或背景基因列表，
+                默认为本库中出现过的全部基因。给出背景基因列表时，基因列表和
+                基因集都限定在背景内。
+            min_overlap (int): 只返回重叠数不少于该值的 term，默认为 1。BH 校正
+                始终针对全部重叠数 ≥ 1 的 term，不受该参数影响。
+
+        Returns:
+            pd.DataFrame: 列为 ``RESULT_COLUMNS``，按 p 值升序排列。
+        """
+        result = self.enrich_batch({0: gene_list}, background, min_overlap)
+        return result[RESULT_COLUMNS]
+
+    def enrich_batch(
+        self,
+        gene_lists: Dict[Any, Iterable[str]],
+        background: Optional[Union[int, Iterable[str]]] = None,
+        min_overlap: int = 1,
+    ) -> pd.DataFrame:
+        """
+        一次分析多个基因列表：所有列表与所有 term 的重叠数由一次稀疏矩阵乘法得到，
+        背景和对数阶乘表在各列表之间共用。
+
+        Args:
+            gene_lists (Dict[Any, Iterable[str]]): 列表名 → 基因符号列表。
+            background, min_overlap: 同 ``enrich``。
+
+        Returns:
+            pd.DataFrame: 长表，首列 ``list_id`` 为列表名，其余列为 ``RESULT_COLUMNS``；
+            按列表顺序、再按 p 值升序排列。BH 校正在每个列表内分别进行。
+        """
+        list_ids = list(gene_lists)
+        matrix, term_sizes, n_background, in_background = self._with_background(
+            background
+        )
+        queries = self.query_matrix([gene_lists[i] for i in list_ids])
+        if in_background is not None:
+            queries = queries.multiply(in_background[:, None]).tocsc()
+            queries.eliminate_zeros()
+        n_query = np.asarray(queries.sum(axis=0)).ravel().astype(np.int64)
+
+        # term × list 的重叠数，只有非零项参与后续计算
+        overlap = (matrix @ queries).tocoo()
+        keep = overlap.data >= 1
+        terms, lists, k = overlap.row[keep], overlap.col[keep], overlap.data[keep]
+        # BH 校正覆盖所有重叠数 ≥ 1 的 term，min_overlap 只决定报告哪些行
+        report = np.flatnonzero(k >= min_overlap)
+        if len(report) == 0:
+            return pd.DataFrame(columns=["list_id"] + RESULT_COLUMNS)
+
+        sizes, n = term_sizes[terms], n_query[lists]
+        # P(X >= k)，X ~ 超几何(背景 N，基因集 K，抽样 n)；相同的 (k, K, n) 只算一次
+        base = np.int64(n_background + 1)
+        codes, keys = pd.factorize((k * base + sizes) * base + n)
+        p_values = hypergeom_sf(
+            keys // (base * base), n_background, keys // base % base, keys % base
+        )[codes]
+        adjusted = benjamini_hochberg(p_values, groups=lists)
+
+        # Enrichr 的比值比：(a·d)/(b·c)，各格加 0.5 避免除零
+        a = k + 0.5
+        b = n - k + 0.5
+        c = sizes - k + 0.5
+        d = n_background - sizes - n + k + 0.5
+        odds_ratio = (a * d) / (b * c)
+        combined = -np.log(np.maximum(p_values, np.finfo(float).tiny)) * odds_ratio
+
+        # 先按列表、再按 p 值排序，p 值相同的按 term 顺序
+        order = report[np.lexsort((terms[report], p_values[report], lists[report]))]
+        terms, lists, k, sizes = terms[order], lists[order], k[order], sizes[order]
+        genes = self._overlap_genes(matrix, queries, terms, lists)
+        return pd.DataFrame(
+            {
+                "list_id": [list_ids[j] for j in lists],
+                "Gene_set": self.name,
+                "Term": self.terms[terms],
+                "Overlap": [f"{x}/{y}" for x, y in zip(k, sizes)],
+                "P-value": p_values[order],
+                "Adjusted P-value": adjusted[order],
+                "Odds Ratio": odds_ratio[order],
+                "Combined Score": combined[order],
+                "Genes": genes,
+            }
+        )
+
+    def _overlap_genes(self, matrix, queries, terms, lists) -> List[str]:
+        """每个 (term, list) 的重叠基因，以 ";" 连接（``lists`` 需已分组排列）。"""
+        symbols, bounds = [], [0]
+        boundaries = np.flatnonzero(np.diff(lists)) + 1
+        for block in np.split(np.arange(len(terms)), boundaries):
+            query = queries[:, lists[block[0]]].toarray().ravel()
+            hits = matrix[terms[block]].multiply(query).tocsr()
+            hits.eliminate_zeros()
+            symbols.extend(self.genes[hits.indices].tolist())
+            bounds.extend((hits.indptr[1:] + bounds[-1]).tolist())
+        return [";".join(symbols[start:end]) for start, end in zip(bounds, bounds[1:])]
+
+
+def local_enrichr(
+    gene_list: Iterable[str],
+    gene_sets: Sequence[Union[str, Path, GeneSetLibrary]],
+    background: Optional[Union[int, Iterable[str]]] = None,
+    gmt_dir: Optional[Union[str, Path]] = None,
+) -> pd.DataFrame:
+    """
+    ``gseapy.enrichr(...).results`` 的离线替代。
+
+    Args:
+        gene_list (Iterable[str]): 基因符号列表。
+        gene_sets (Sequence): Enrichr 库名、GMT 文件路径或 ``GeneSetLibrary``。
+        background (int | Iterable[str], optional): 背景，见 ``GeneSetLibrary.enrich``。
+        gmt_dir (str | Path, optional): 下载的 GMT 文件保存目录。
+
+    Returns:
+        pd.DataFrame: 各库结果按库的顺序拼接，列与 gseapy 结果一致。
+    """
+    gene_list = list(gene_list)
+    results = [
+        (
+            library
+            if isinstance(library, GeneSetLibrary)
+            else load_library(library, gmt_dir)
+        ).enrich(gene_list, background=background)
+        for library in gene_sets
+    ]
+    if not results:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(results, ignore_index=True)
+
+
+# 工作进程的全局状态，由 initializer 设置一次，基因集库不随每批列表重复序列化
+_worker_state = {}
+
+
+def _init_worker(libraries: List[GeneSetLibrary], background, min_overlap: int):
+    _worker_state.update(
+        libraries=libraries, background=background, min_overlap=min_overlap
+    )
+
+
+def _enrich_chunk(gene_lists: Dict[Any, List[str]]) -> pd.DataFrame:
+    return _enrich_libraries(
+        _worker_state["libraries"],
+        gene_lists,
+        _worker_state["background"],
+        _worker_state["min_overlap"],
+    )
+
+
+def _enrich_libraries(libraries, gene_lists, background, min_overlap):
+    results = [
+        library.enrich_batch(gene_lists, background, min_overlap)
+        for library in libraries
+    ]
+    if not results:
+        return pd.DataFrame(columns=["list_id"] + RESULT_COLUMNS)
+    return pd.concat(results, ignore_index=True)
+
+
+def local_enrichr_batch(
+    gene_lists: Dict[Any, Iterable[str]],
+    gene_sets: Sequence[Union[str, Path, GeneSetLibrary]],
+    background: Optional[Union[int, Iterable[str]]] = None,
+    gmt_dir: Optional[Union[str, Path]] = None,
+    min_overlap: int = 1,
+    n_workers: int = 1,
+) -> pd.DataFrame:
+    """
+    对多个基因列表做离线富集分析，每个库只加载一次。
+
+    Args:
+        gene_lists (Dict[Any, Iterable[str]]): 列表名 → 基因符号列表。
+        gene_sets (Sequence): Enrichr 库名、GMT 文件路径或 ``GeneSetLibrary``。
+        background (int | Iterable[str], optional): 背景，见 ``GeneSetLibrary.enrich``。
+        gmt_dir (str | Path, optional): 下载的 GMT 文件保存目录。
+        min_overlap (int): 只返回重叠数不少于该值的 term，默认为 1。
+        n_workers (int): 进程数，默认为 1（不开进程池）。列表被均分成若干块，
+            每块在一个进程里对所有库做一次批量分析。
+
+    Returns:
+        pd.DataFrame: 长表，首列 ``list_id``，其余列与 ``local_enrichr`` 一致；
+        按列表顺序、库顺序、p 值排列。
+    """
+    gene_lists = {list_id: list(genes) for list_id, genes in gene_lists.items()}
+    libraries = [
+        (
+            library
+            if isinstance(library, GeneSetLibrary)
+            else load_library(library, gmt_dir)
+        )
+        for library in gene_sets
+    ]
+    if background is not None and not isinstance(background, (int, np.integer)):
+        background = list(background)
+    list_ids = list(gene_lists)
+    n_workers = max(1, min(n_workers, len(list_ids)))
+    if n_workers == 1:
+        result = _enrich_libraries(libraries, gene_lists, background, min_overlap)
+    else:
+        logger.info(
+            f"Enriching {len(list_ids)} gene lists with {n_workers} worker processes"
+        )
+        chunks = [
+            {list_ids[i]: gene_lists[list_ids[i]] for i in part}
+            for part in np.array_split(np.arange(len(list_ids)), n_workers)
+        ]
+        with ProcessPoolExecutor(
+            max_workers=n_workers,
+            initializer=_init_worker,
+            initargs=(libraries, background, min_overlap),
+        ) as pool:
+            result = pd.concat(pool.map(_enrich_chunk, chunks), ignore_index=True)
+    # 各库的结果是分开拼接的，这里按列表顺序稳定排序，同一列表内保持库顺序
+    position = {list_id: i for i, list_id in enumerate(list_ids)}
+    order = np.argsort(
+        np.fromiter(
+            map(position.get, result["list_id"]), dtype=np.int64, count=len(result)
+        ),
+        kind="stable",
+    )
+    return result.iloc[order].reset_index(drop=True)
+
+
+@lru_cache(maxsize=16)
+def _load_gmt_library(path: str, mtime: float) -> GeneSetLibrary:
+    """读取 GMT 并构建关联矩阵（每个进程、每个文件版本只做一次）。"""
+    return GeneSetLibrary.from_gmt(path)
+
+
+def library_path(
+    library: Union[str, Path], gmt_dir: Optional[Union[str, Path]] = None
+) -> Path:
+    """GMT 文件路径原样返回；Enrichr 库名返回本地 GMT 路径（首次使用时下载）。"""
+    if str(library).endswith(".gmt") or os.path.isfile(library):
+        return Path(library)
+    return download_enrichr_library(str(library), gmt_dir)
+
+
+def load_library(
+    library: Union[str, Path], gmt_dir: Optional[Union[str, Path]] = None
+) -> GeneSetLibrary:
+    """按 GMT 文件路径或 Enrichr 库名加载基因集库（库名首次使用时下载）。"""
+    path = library_path(library, gmt_dir)
+    return _load_gmt_library(str(path.resolve()), os.path.getmtime(path))
@@ -0,0 +1,237 @@
+"""富集分析结果的磁盘缓存
+
+同一个基因列表、同一组数据库和参数的富集分析结果按内容寻址保存：键是
+排序去重后的基因列表、数据库名、物种、阈值等参数的 SHA-256 摘要，每个结果
+存成一个压缩的列式 ``.npz`` 文件（每列一个数组，不使用 pickle）。
+
+- 过期：条目写入时记录创建时间，超过 ``ttl`` 秒后视为未命中并删除；
+- 容量：所有条目总大小超过 ``max_bytes`` 时按最近使用时间淘汰（命中时更新
+  文件的 mtime，LRU 以 mtime 为准）；
+- 并发：写入先落到临时文件再 ``os.replace``，多个进程可以共享同一目录，
+  读到的总是完整的条目；被其他进程删除的条目按未命中处理。
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from biorange.logger import get_logger
+from biorange.utils.atomic import atomic_write
+from biorange.utils.package_fileload import get_cache_dir
+
+logger = get_logger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def cache_key(gene_list: Iterable[str], **params) -> str:
+    """
+    计算缓存键：基因列表与顺序、重复无关，其余参数按名称排序后参与摘要。
+
+    Args:
+        gene_list (Iterable[str]): 基因符号列表。
+        **params: 影响结果的其他参数（数据库名、物种、阈值等），需可 JSON 序列化。
+
+    Returns:
+        str: 十六进制 SHA-256 摘要。
+    """
+    payload = {
+        "version": CACHE_VERSION,
+        "genes": sorted({str(gene) for gene in gene_list}),
+        "params": params,
+    }
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _encode_column(values: pd.Series, prefix: str, arrays: Dict[str, np.ndarray]):
+    """数值列原样保存；文本列转为定长 Unicode 数组，缺失值另存掩码。"""
+    if values.dtype != object:
+        arrays[prefix] = values.to_numpy()
+        return
+    missing = values.isna().to_numpy()
+    arrays[prefix] = np.array(
+        values.where(~missing, "").astype(str).tolist(), dtype="U"
+    )
+    if missing.any():
+        arrays[prefix + ".missing"] = missing
+
+
+def _decode_column(prefix: str, data) -> np.ndarray:
+    values = data[prefix]
+    if values.dtype.kind != "U":
+        return values
+    values = values.astype(object)
+    if prefix + ".missing" in data:
+        values[data[prefix + ".missing"]] = None
+    return values
+
+
+class EnrichmentCache:
+    """按内容寻址的富集分析结果缓存。
+
+    Args:
+        cache_dir (str | Path, optional): 缓存目录，默认为 ``get_cache_dir("enrichment")``。
+        ttl (float): 条目有效期（秒），默认为 7 天；None 表示永不过期。
+        max_bytes (int): 缓存总大小上限，默认为 512 MB；None 表示不限制。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        ttl: Optional[float] = DEFAULT_TTL,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    ):
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @property
+    def cache_dir(self) -> Path:
+        # 首次使用时才创建目录，导入模块不产生任何文件
+        if self._cache_dir is None:
+            self._cache_dir = get_cache_dir("enrichment")
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        return self._cache_dir
+
+    def path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """
+        读取缓存的结果。
+
+        Returns:
+            pd.DataFrame | None: 命中时返回结果，``attrs["cache_hit"]`` 为 True；
+            不存在、已过期或文件损坏时返回 None。
+        """
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                meta = json.loads(str(data["__meta__"]))
+                if self._expired(meta["created"]):
+                    raise _Expired
+                frame = pd.DataFrame(
+                    {
+                        name: _decode_column(f"col{i}", data)
+                        for i, name in enumerate(meta["columns"])
+                    },
+                    columns=meta["columns"],
+                    index=pd.Index(
+                        _decode_column("index", data), name=meta["index_name"]
+                    ),
+                )
+        except _Expired:
+            self._remove(path)
+            self.stats["misses"] += 1
+            return None
+        except (OSError, KeyError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        try:
+            # mtime 作为最近使用时间，供 LRU 淘汰
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats["hits"] += 1
+        frame.attrs.update(cache_hit=True, cache_key=key)
+        return frame
+
+    def put(self, key: str, frame: pd.DataFrame) -> Path:
+        """写入结果（原子替换），然后按过期时间和总大小清理缓存。"""
+        arrays = {}
+        for i, name in enumerate(frame.columns):
+            _encode_column(frame.iloc[:, i], f"col{i}", arrays)
+        _encode_column(frame.index.to_series(), "index", arrays)
+        meta = {
+            "columns": [str(name) for name in frame.columns],
+            "index_name": frame.index.name,
+            "created": time.time(),
+        }
+        arrays["__meta__"] = np.array(json.dumps(meta, ensure_ascii=False))
+
+        path = self.path(key)
+        with atomic_write(path) as f:
+            np.savez_compressed(f, **arrays)
+        self.stats["writes"] += 1
+        self.prune()
+        return path
+
+    def get_or_compute(self, key: str, compute) -> pd.DataFrame:
+        """命中则返回缓存结果，否则调用 ``compute()`` 计算并写入缓存。"""
+        frame = self.get(key)
+        if frame is not None:
+            return frame
+        frame = compute()
+        self.put(key, frame)
+        frame.attrs.update(cache_hit=False, cache_key=key)
+        return frame
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _remove(self, path: Path) -> int:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            # 其他进程已经删除
+            return 0
+        self.stats["evictions"] += 1
+        return size
+
+    def prune(self):
+        """删除过期条目；总大小超过上限时按最近使用时间淘汰最旧的条目。"""
+        entries = []
+        for path in self.cache_dir.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        if self.ttl is not None:
+            # mtime 不早于创建时间，据此可以跳过仍然新鲜的条目，不必逐个打开
+            cutoff = time.time() - self.ttl
+            for mtime, size, path in entries:
+                if mtime < cutoff:
+                    self._remove(path)
+            entries = [entry for entry in entries if entry[0] >= cutoff]
+        if self.max_bytes is None:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            total -= size
+            self._remove(path)
+
+    def clear(self):
+        """删除所有缓存条目。"""
+        for path in self.cache_dir.glob("*.npz"):
+            self._remove(path)
+
+    def info(self) -> Dict[str, Any]:
+        """条目数、总大小和命中统计。"""
+        sizes = [p.stat().st_size for p in self.cache_dir.glob("*.npz")]
+        return {"entries": len(sizes), "bytes": int(sum(sizes)), **self.stats}
+
+
+class _Expired(Exception):
+    pass
+
+
+# 进程级默认缓存，可通过环境变量 BIORANGE_ENRICH_CACHE_TTL（秒）和
+# BIORANGE_ENRICH_CACHE_BYTES 调整
+enrichment_cache = EnrichmentCache(
+    ttl=float(os.getenv("BIORANGE_ENRICH_CACHE_TTL", DEFAULT_TTL)),
+    max_bytes=int(os.getenv("BIORANGE_ENRICH_CACHE_BYTES", DEFAULT_MAX_BYTES)),
+)
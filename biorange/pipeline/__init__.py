@@ -0,0 +1,2 @@
+from .dag import Pipeline, Stage
+from .workflow import build_pipeline, load_config, run_pipeline
@@ -0,0 +1,288 @@
+"""分阶段流水线：依赖图、并行执行与断点续跑
+
+每个阶段（``Stage``）是一个普通函数，声明它依赖的上游阶段和自身参数；
+``Pipeline`` 按依赖关系调度：
+
+- 依赖全部完成的阶段立即提交到线程池，互不依赖的分支（例如成分靶点和疾病
+  靶点的各个数据源）同时运行；
+- 每个阶段的键是 ``阶段名 + 函数 + 版本 + 参数 + 上游阶段的键 + 上游输出的
+  内容摘要`` 的 SHA-256 摘要，输出以该键保存到检查点目录（先写临时文件再
+  ``os.replace``）。重新运行时键未变的阶段直接读取检查点，参数改变的阶段及其
+  所有下游重新计算，即从第一个改变的阶段继续；上游重新计算后输出改变（例如
+  读取的外部数据更新了），下游也随之重新计算；
+- 函数按模块名和限定名参与键的计算，修改函数体不会使检查点失效：修改阶段的
+  实现后请改变该阶段的 ``version``，或删除检查点目录；
+- 每个阶段的状态和耗时记录在 ``Pipeline.report`` 中。
+"""
+
+import hashlib
+import json
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from biorange.logger import get_logger
+from biorange.utils.atomic import atomic_write
+
+logger = get_logger(__name__)
+
+CHECKPOINT_VERSION = 2
+REPORT_COLUMNS = ["stage", "status", "seconds", "key"]
+
+
+class Stage:
+    """流水线中的一个阶段。
+
+    Args:
+        name (str): 阶段名，在流水线内唯一。
+        func (Callable): 阶段函数，以关键字参数接收 ``params`` 和各上游阶段的输出
+            （参数名即上游阶段名）。
+        deps (Iterable[str]): 上游阶段名。
+        params (Dict[str, Any], optional): 传给 ``func`` 的参数，参与检查点键的计算，
+            需可 JSON 序列化（其他对象按 ``str`` 处理）。
+        checkpoint (bool): 是否保存检查点，默认为 True。
+        version (str, optional): 阶段实现的版本，参与检查点键的计算；修改 ``func``
+            的实现后改变它，使已有的检查点失效。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        deps: Iterable[str] = (),
+        params: Optional[Dict[str, Any]] = None,
+        checkpoint: bool = True,
+        version: Optional[str] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.params = dict(params or {})
+        self.checkpoint = checkpoint
+        self.version = version
+
+    def key(
+        self,
+        dep_keys: Dict[str, str],
+        dep_digests: Optional[Dict[str, Optional[str]]] = None,
+    ) -> str:
+        """
+        由阶段定义和上游阶段的键计算本阶段的键。
+
+        ``dep_digests`` 为上游输出的内容摘要（运行时才有）；为 None 时只由阶段
+        定义决定，即 ``Pipeline.keys`` 返回的键。
+        """
+        payload = {
+            "version": CHECKPOINT_VERSION,
+            "stage": self.name,
+            "func": f"{getattr(self.func, '__module__', '')}."
+            f"{getattr(self.func, '__qualname__', repr(self.func))}",
+            "func_version": self.version,
+            "params": self.params,
+            "deps": {dep: dep_keys[dep] for dep in self.deps},
+        }
+        if dep_digests is not None:
+            payload["inputs"] = {dep: dep_digests[dep] for dep in self.deps}
+        text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={self.deps})"
+
+
+class Pipeline:
+    """由若干 ``Stage`` 组成的有向无环图。
+
+    Args:
+        stages (Iterable[Stage]): 阶段列表，顺序无关。
+        checkpoint_dir (str | Path, optional): 检查点目录；为 None 时不读写检查点。
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[Stage] = (),
+        checkpoint_dir: Optional[Union[str, Path]] = None,
+    ):
+        self.stages: Dict[str, Stage] = {}
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.report = pd.DataFrame(columns=REPORT_COLUMNS)
+        for stage in stages:
+            self.add(stage)
+
+    def add(self, stage: Stage) -> Stage:
+        if stage.name in self.stages:
+            raise ValueError(f"阶段名重复：{stage.name}")
+        self.stages[stage.name] = stage
+        return stage
+
+    def order(self) -> List[str]:
+        """拓扑排序后的阶段名；依赖缺失或存在环时抛出 ValueError。"""
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"阶段 {stage.name} 依赖未定义的阶段：{missing}")
+        order, state = [], {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"阶段依赖存在环：{' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dep in self.stages[name].deps:
+                visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def keys(self) -> Dict[str, str]:
+        """各阶段只由定义决定的键（不含上游输出的内容摘要），用于比较两个流水线的定义。"""
+        keys = {}
+        for name in self.order():
+            keys[name] = self.stages[name].key(keys)
+        return keys
+
+    def _checkpoint_path(self, name: str, key: str) -> Path:
+        return self.checkpoint_dir / f"{name}.{key[:16]}.pkl"
+
+    def _load(self, name: str, key: str):
+        """读取检查点，返回 (是否命中, 输出, 输出的内容摘要)。"""
+        if self.checkpoint_dir is None or not self.stages[name].checkpoint:
+            return False, None, None
+        path = self._checkpoint_path(name, key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, digest = pickle.load(f)
+                if stored_key != key:
+                    return False, None, None
+                output = pickle.load(f)
+        except FileNotFoundError:
+            return False, None, None
+        except Exception:
+            logger.warning(f"检查点 {path} 无法读取，重新计算")
+            return False, None, None
+        return True, output, digest
+
+    def _save(self, name: str, key: str, digest: str, data: bytes):
+        if self.checkpoint_dir is None or not self.stages[name].checkpoint:
+            return
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        # 同一阶段只保留最新的检查点
+        for old in self.checkpoint_dir.glob(f"{name}.*.pkl"):
+            old.unlink(missing_ok=True)
+        # 文件内先是 (键, 摘要)，再是输出本身的序列化字节
+        with atomic_write(self._checkpoint_path(name, key)) as f:
+            pickle.dump((key, digest), f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(data)
+
+    def _execute(self, name: str, key: str, inputs: Dict[str, Any]):
+        stage = self.stages[name]
+        start = time.perf_counter()
+        output = stage.func(**stage.params, **inputs)
+        seconds = time.perf_counter() - start
+        try:
+            data = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            if self.checkpoint_dir is not None and stage.checkpoint:
+                raise
+            # 不保存检查点且无法序列化的输出没有摘要，下游只按本阶段的键区分
+            return output, None, seconds
+        digest = hashlib.sha256(data).hexdigest()
+        self._save(name, key, digest, data)
+        return output, digest, seconds
+
+    def run(
+        self,
+        n_workers: int = 4,
+        resume: bool = True,
+        targets: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        运行流水线。
+
+        Args:
+            n_workers (int): 线程数，默认为 4；为 1 时按拓扑顺序串行运行。
+            resume (bool): 是否使用已有的检查点，默认为 True。
+            targets (Iterable[str], optional): 只运行这些阶段及其上游，默认运行全部。
+
+        Returns:
+            Dict[str, Any]: 阶段名 → 输出。各阶段的状态（"cached" 或 "run"）、
+            耗时（秒）和键记录在 ``self.report`` 中。
+        """
+        order = self.order()
+        selected = self._upstream(targets) if targets is not None else set(order)
+        pending = [name for name in order if name in selected]
+        # 阶段的键含上游输出的摘要，上游完成后才能计算
+        outputs, digests, keys, records = {}, {}, {}, {}
+
+        def finished(name, status, seconds, output, digest):
+            outputs[name] = output
+            digests[name] = digest
+            records[name] = (name, status, seconds, keys[name])
+            logger.info(f"阶段 {name}：{status}，{seconds:.2f}s")
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=max(1, n_workers)) as pool:
+            while pending or running:
+                for name in list(pending):
+                    if any(dep not in outputs for dep in self.stages[name].deps):
+                        continue
+                    pending.remove(name)
+                    keys[name] = self.stages[name].key(keys, digests)
+                    hit, output, digest = (
+                        self._load(name, keys[name]) if resume else (False, None, None)
+                    )
+                    if hit:
+                        finished(name, "cached", 0.0, output, digest)
+                        continue
+                    inputs = {dep: outputs[dep] for dep in self.stages[name].deps}
+                    running[pool.submit(self._execute, name, keys[name], inputs)] = name
+                    if n_workers <= 1:
+                        break
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                failed = None
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        output, digest, seconds = future.result()
+                    except Exception as e:
+                        logger.error(f"阶段 {name} 失败：{e}")
+                        failed = failed or e
+                        continue
+                    finished(name, "run", seconds, output, digest)
+                if failed is not None:
+                    # 不再提交新阶段，等正在运行的阶段结束（其检查点照常保存）
+                    pending.clear()
+                    for future in running:
+                        future.exception()
+                    self.report = self._report(records)
+                    raise failed
+
+        self.report = self._report(records)
+        return outputs
+
+    def _report(self, records) -> pd.DataFrame:
+        rows = [records[name] for name in self.order() if name in records]
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+    def _upstream(self, targets: Iterable[str]) -> set:
+        """``targets`` 及其所有上游阶段。"""
+        selected, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"未定义的阶段：{name}")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.stages[name].deps)
+        return selected
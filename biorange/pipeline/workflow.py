@@ -0,0 +1,337 @@
+"""网络药理学标准流程
+
+按 ``config.yaml``（``disease_name``、``drug_name``、``results_dir``）组装
+``Pipeline``，阶段与依赖如下::
+
+    herb_components → admet → tcmsp_targets ┐
+                            → stitch_targets ├→ compound_targets ┐
+                            → chembl_targets ┘                   ├→ venn → ppi
+    omim_targets     ┐                                           │       → enrichment → network_type
+    ttd_targets      ┘→ disease_targets ─────────────────────────┘
+
+成分靶点的各个数据源、疾病靶点的各个数据源以及 PPI 与富集分析互不依赖，
+在线程池中同时运行。``network_type`` 需要 KEGG 富集结果和成分靶点，位于富集之后。
+GeneCards 需要交互式登录，默认不使用，可在配置的 ``disease_sources`` 中加入。
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+import pandas as pd
+import yaml
+
+from biorange.logger import get_logger
+from biorange.pipeline.dag import Pipeline, Stage
+
+logger = get_logger(__name__)
+
+COMPOUND_SOURCES = ("tcmsp", "stitch", "chembl")
+DISEASE_SOURCES = ("omim", "ttd")
+TARGET_COLUMNS = ["gene_name", "compound_name", "source", "inchikey"]
+
+
+def load_config(config_path: Union[str, Path] = "config.yaml") -> Dict[str, Any]:
+    """
+    读取流程配置。
+
+    Args:
+        config_path (str | Path): 配置文件路径，默认为当前目录下的 config.yaml。
+
+    Returns:
+        Dict[str, Any]: 配置；``drug_name`` 统一为列表，``results_dir`` 默认为 "results"。
+    """
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    for key in ("disease_name", "drug_name"):
+        if not config.get(key):
+            raise ValueError(f"配置文件 {config_path} 缺少 {key}")
+    if isinstance(config["drug_name"], str):
+        config["drug_name"] = [config["drug_name"]]
+    config.setdefault("results_dir", "results")
+    return config
+
+
+# ---------------------------------------------------------------- 阶段函数
+
+
+def herb_components(drug_name, max_concurrency=4, requests_per_second=2.0):
+    """TCMSP 中各草药的成分，``herb`` 列标明来源草药。"""
+    from biorange.component import tcmsp_raw_component_batch
+
+    return tcmsp_raw_component_batch(
+        drug_name,
+        max_concurrency=max_concurrency,
+        requests_per_second=requests_per_second,
+    )
+
+
+def admet(herb_components):
+    from biorange.target_predict import admet_filter
+
+    keys = herb_components[["inchikey"]].dropna().drop_duplicates()
+    return admet_filter(keys)
+
+
+def _inchikeys(frame):
+    return frame["inchikey"].dropna().unique().tolist()
+
+
+def tcmsp_targets(admet):
+    from biorange.target_predict import tcmsp_inchikey_target
+
+    return tcmsp_inchikey_target(_inchikeys(admet))
+
+
+def stitch_targets(admet, combined_score_threshold=300):
+    from biorange.target_predict import stich_inchikey_target
+
+    return stich_inchikey_target(
+        _inchikeys(admet), combined_score_threshold=combined_score_threshold
+    )
+
+
+def chembl_targets(admet):
+    """ChEMBL 靶点：``targetChemblId`` 按内置的 ChEMBL → 基因名映射表转换为 ``gene_name``。"""
+    from biorange.target_predict import chembl_inchikey_target
+    from biorange.utils.package_fileload import load_data_file
+
+    targets = chembl_inchikey_target(_inchikeys(admet))
+    genes = load_data_file("chembl_uniport_gene25_clean.csv")[
+        ["targetChemblId", "gene_name"]
+    ].drop_duplicates()
+    return (
+        targets[["inchikey", "targetChemblId"]]
+        .merge(genes, on="targetChemblId", how="inner")
+        .assign(source="ChEMBL")
+    )
+
+
+def compound_targets(admet, **sources):
+    """
+    合并各数据源的成分靶点。
+
+    Returns:
+        pd.DataFrame: gene_name、compound_name、source、inchikey 四列，
+        成分名取自 ADMET 结果的 ``Name``（缺失时用 inchikey）。
+    """
+    names = admet.drop_duplicates("inchikey").set_index("inchikey")["Name"]
+    frames = [
+        frame[["inchikey", "gene_name", "source"]]
+        for frame in sources.values()
+        if not frame.empty
+    ]
+    if not frames:
+        return pd.DataFrame(columns=TARGET_COLUMNS)
+    targets = pd.concat(frames, ignore_index=True).dropna(subset=["gene_name"])
+    targets["compound_name"] = (
+        targets["inchikey"].map(names).fillna(targets["inchikey"])
+    )
+    return targets[TARGET_COLUMNS].drop_duplicates(ignore_index=True)
+
+
+def omim_targets(disease_name):
+    from biorange.target_predict import omim_disease_target
+
+    return omim_disease_target(disease_name)
+
+
+def ttd_targets(disease_name):
+    from biorange.target_predict import ttd_disease_target
+
+    return ttd_disease_target(disease_name)
+
+
+def genecards_targets(disease_name):
+    from biorange.target_predict import genecards_disease_target
+
+    return genecards_disease_target(disease_name)
+
+
+def disease_targets(**sources):
+    """合并各数据源的疾病靶点（disease、gene_name、source 三列）。"""
+    frames = [frame for frame in sources.values() if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=["disease", "gene_name", "source"])
+    targets = pd.concat(frames, ignore_index=True)
+    return targets[["disease", "gene_name", "source"]].drop_duplicates(
+        ignore_index=True
+    )
+
+
+def venn(compound_targets, disease_targets):
+    """成分靶点与疾病靶点的交集（``shared_targets`` 列）。"""
+    from biorange.venn import SetIntersection
+
+    engine = SetIntersection(
+        [compound_targets["gene_name"].dropna(), disease_targets["gene_name"].dropna()],
+        ["drug", "disease"],
+    )
+    return pd.DataFrame({"shared_targets": engine.elements_in(["drug", "disease"])})
+
+
+def ppi(venn, output_dir):
+    from biorange.ppi import ppi_analysis
+
+    return ppi_analysis(venn["shared_targets"].tolist(), output_dir, show=False)
+
+
+def enrichment(venn, backend=None):
+    """``backend`` 为 None 时使用 ``enrich_gokegg`` 的默认后端。"""
+    from biorange.enrich_analysis import enrich_gokegg
+
+    kwargs = {} if backend is None else {"backend": backend}
+    return enrich_gokegg(venn["shared_targets"].tolist(), "all", **kwargs)
+
+
+def network_type(enrichment, compound_targets):
+    """KEGG 通路、靶点与成分的网络文件（``node`` 为关系表，``type`` 为节点类型表）。"""
+    from biorange.ppi import generate_type
+
+    kegg = enrichment[enrichment["Gene_set"].str.startswith("KEGG")]
+    kegg_df = kegg.rename(columns={"Term": "Description", "Genes": "gene_name"})[
+        ["Description", "gene_name"]
+    ].reset_index(drop=True)
+    node_df, type_df, _ = generate_type(kegg_df, compound_targets)
+    return {"node": node_df, "type": type_df}
+
+
+# ---------------------------------------------------------------- 组装与运行
+
+
+def build_pipeline(
+    config: Dict[str, Any],
+    compound_sources: Optional[Iterable[str]] = None,
+    disease_sources: Optional[Iterable[str]] = None,
+) -> Pipeline:
+    """
+    按配置组装标准流程。
+
+    Args:
+        config (Dict[str, Any]): ``load_config`` 的结果。可选键 ``enrich_backend``
+            （富集分析后端，默认使用 ``enrich_gokegg`` 的默认后端）、
+            ``combined_score_threshold``（STITCH 分数阈值，默认为 300）、
+            ``compound_sources`` 和 ``disease_sources``。
+        compound_sources (Iterable[str], optional): 使用的成分靶点数据源，默认取
+            配置中的 ``compound_sources``，再默认为 ``COMPOUND_SOURCES``。
+        disease_sources (Iterable[str], optional): 使用的疾病靶点数据源，默认取
+            配置中的 ``disease_sources``，再默认为 ``DISEASE_SOURCES``
+            （不含需要登录的 "genecards"）。
+
+    Returns:
+        Pipeline: 检查点保存在 ``results_dir/.checkpoints``。
+    """
+    results_dir = config["results_dir"]
+    if compound_sources is None:
+        compound_sources = config.get("compound_sources", COMPOUND_SOURCES)
+    if disease_sources is None:
+        disease_sources = config.get("disease_sources", DISEASE_SOURCES)
+    compound_sources, disease_sources = list(compound_sources), list(disease_sources)
+    compound_funcs = {
+        "tcmsp": (tcmsp_targets, {}),
+        "stitch": (
+            stitch_targets,
+            {"combined_score_threshold": config.get("combined_score_threshold", 300)},
+        ),
+        "chembl": (chembl_targets, {}),
+    }
+    disease_funcs = {
+        "omim": omim_targets,
+        "ttd": ttd_targets,
+        "genecards": genecards_targets,
+    }
+    compound_names = [f"{source}_targets" for source in compound_sources]
+    disease_names = [f"{source}_targets" for source in disease_sources]
+
+    stages = [
+        Stage(
+            "herb_components",
+            herb_components,
+            params={"drug_name": list(config["drug_name"])},
+        ),
+        Stage("admet", admet, ["herb_components"]),
+    ]
+    for source, name in zip(compound_sources, compound_names):
+        func, params = compound_funcs[source]
+        stages.append(Stage(name, func, ["admet"], params))
+    for source, name in zip(disease_sources, disease_names):
+        stages.append(
+            Stage(
+                name,
+                disease_funcs[source],
+                params={"disease_name": config["disease_name"]},
+            )
+        )
+    stages += [
+        Stage("compound_targets", compound_targets, ["admet"] + compound_names),
+        Stage("disease_targets", disease_targets, disease_names),
+        Stage("venn", venn, ["compound_targets", "disease_targets"]),
+        Stage("ppi", ppi, ["venn"], {"output_dir": os.path.join(results_dir, "ppi")}),
+        Stage(
+            "enrichment",
+            enrichment,
+            ["venn"],
+            {"backend": config.get("enrich_backend")},
+        ),
+        Stage("network_type", network_type, ["enrichment", "compound_targets"]),
+    ]
+    return Pipeline(stages, checkpoint_dir=os.path.join(results_dir, ".checkpoints"))
+
+
+def _export(results_dir: str, name: str, output):
+    """DataFrame 输出写成 ``<阶段名>.csv``，DataFrame 字典写成 ``<阶段名>-<键>.csv``。"""
+    if isinstance(output, pd.DataFrame):
+        output.to_csv(os.path.join(results_dir, f"{name}.csv"), index=False)
+    elif isinstance(output, dict):
+        for key, frame in output.items():
+            if isinstance(frame, pd.DataFrame):
+                frame.to_csv(
+                    os.path.join(results_dir, f"{name}-{key}.csv"), index=False
+                )
+
+
+def run_pipeline(
+    config_path: Union[str, Path] = "config.yaml",
+    n_workers: int = 4,
+    resume: bool = True,
+    targets: Optional[Iterable[str]] = None,
+    **build_kwargs,
+) -> Dict[str, Any]:
+    """
+    按配置文件运行标准流程。
+
+    配置文件不存在时先复制默认的 config.yaml。各阶段的 DataFrame 输出写入
+    ``results_dir``，耗时报告写入 ``results_dir/pipeline_report.csv``。
+
+    Args:
+        config_path (str | Path): 配置文件路径，默认为 "config.yaml"。
+        n_workers (int): 并行线程数，默认为 4。
+        resume (bool): 是否从检查点继续，默认为 True。
+        targets (Iterable[str], optional): 只运行这些阶段及其上游。
+        **build_kwargs: 传给 ``build_pipeline`` 的参数（如 ``disease_sources``）。
+
+    Returns:
+        Dict[str, Any]: 阶段名 → 输出。
+    """
+    from biorange.utils.package_fileload import copy_config_if_not_exists
+    from biorange.utils.rendering import headless
+
+    config_path = Path(config_path)
+    copy_config_if_not_exists(str(config_path.parent), config_path.name)
+    config = load_config(config_path)
+    results_dir = config["results_dir"]
+    os.makedirs(results_dir, exist_ok=True)
+    # 绘图可能在工作线程中进行，统一使用无界面后端
+    headless(True)
+
+    pipeline = build_pipeline(config, **build_kwargs)
+    try:
+        outputs = pipeline.run(n_workers=n_workers, resume=resume, targets=targets)
+    finally:
+        pipeline.report.to_csv(
+            os.path.join(results_dir, "pipeline_report.csv"), index=False
+        )
+        logger.info(f"各阶段耗时：\n{pipeline.report.to_string(index=False)}")
+    for name, output in outputs.items():
+        _export(results_dir, name, output)
+    return outputs
@@ -1,4 +1,5 @@
 from biorange.ppi import ppi_final
+from biorange.utils.lazy_loader import LazyMethod
 import pandas as pd
 
 
@@ -14,11 +15,7 @@ class NetworkTypeProcessor:
         return gene_description_df
 
     def _fetch_ppi_data(self, gene_names):
-        ppi_data = ppi_final.fetch_ppi_data(gene_names)
-        if ppi_data is None:
-            return pd.DataFrame()
-
-        interaction_nodes = ppi_final.parse_interaction_data(ppi_data)
+        interaction_nodes = ppi_final.get_ppi_network(gene_names, self.species_id)
         if interaction_nodes is None:
             return pd.DataFrame()
 
@@ -99,7 +96,7 @@ class NetworkTypeProcessor:
         return node_relationships_df, node_types_df, interaction_nodes
 
 
-generate_type = NetworkTypeProcessor().process_from_dataframe
+generate_type = LazyMethod(NetworkTypeProcessor, "process_from_dataframe")
 
 if __name__ == "__main__":
     processor = NetworkTypeProcessor()
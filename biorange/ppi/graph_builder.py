@@ -0,0 +1,107 @@
+"""网络图的批量构建
+
+化合物-靶点-通路网络和 PPI 网络都以两列边表给出。这里把两列端点交错排列后
+一次 ``pd.factorize`` 得到节点编号（顺序与逐行 ``add_edge`` 时节点首次出现的
+顺序相同），在整数编号上去重无向边、用 ``np.bincount`` 计算度数；需要
+networkx 图时批量加入节点和边，并在同一个对象上缓存，度数、布局和绘图共用。
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+
+class NetworkGraph:
+    """由边表构建的无向图。
+
+    Args:
+        source (Iterable): 边的一端。
+        target (Iterable): 边的另一端，与 ``source`` 等长。
+    """
+
+    def __init__(self, source: Iterable, target: Iterable):
+        source = np.asarray(source, dtype=object)
+        target = np.asarray(target, dtype=object)
+        # 交错排列后编号，节点顺序与逐行 add_edge 的插入顺序一致
+        codes, names = pd.factorize(np.column_stack([source, target]).ravel())
+        self.names = np.asarray(names, dtype=object)
+        u, v = codes[0::2], codes[1::2]
+        # 无向边：(u, v) 与 (v, u) 视为同一条，保留首次出现的方向
+        n = len(self.names)
+        key = np.minimum(u, v).astype(np.int64) * n + np.maximum(u, v)
+        _, first = np.unique(key, return_index=True)
+        first.sort()
+        self.u, self.v = u[first], v[first]
+        self._degree = None
+        self._graph = None
+
+    @classmethod
+    def from_frame(
+        cls, edges: pd.DataFrame, source: str = "node1", target: str = "node2"
+    ) -> "NetworkGraph":
+        """从两列边表构建，缺少任一端点的行被忽略。"""
+        edges = edges[[source, target]].dropna()
+        return cls(edges[source].to_numpy(), edges[target].to_numpy())
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.u)
+
+    @property
+    def degree(self) -> np.ndarray:
+        """各节点的度数（自环计 2，与 networkx 一致），按 ``names`` 的顺序。"""
+        if self._degree is None:
+            n = len(self.names)
+            self._degree = np.bincount(self.u, minlength=n) + np.bincount(
+                self.v, minlength=n
+            )
+        return self._degree
+
+    def degree_frame(self) -> pd.DataFrame:
+        """``node``、``degree`` 两列，按度数降序排列（度数相同保持节点顺序）。"""
+        df = pd.DataFrame({"node": self.names, "degree": self.degree})
+        return df.sort_values(by="degree", ascending=False, kind="stable")
+
+    def degree_dict(self) -> Dict:
+        return dict(zip(self.names.tolist(), self.degree.tolist()))
+
+    def top_nodes(self, k: int) -> List:
+        """度数最高的 ``k`` 个节点（度数相同保持节点顺序）。"""
+        order = np.argsort(-self.degree, kind="stable")[:k]
+        return self.names[order].tolist()
+
+    def edge_list(self) -> List[tuple]:
+        return list(zip(self.names[self.u].tolist(), self.names[self.v].tolist()))
+
+    def to_networkx(self) -> nx.Graph:
+        """对应的 networkx 图（首次调用时批量构建，之后复用同一个对象）。"""
+        if self._graph is None:
+            graph = nx.Graph()
+            graph.add_nodes_from(self.names.tolist())
+            graph.add_edges_from(self.edge_list())
+            self._graph = graph
+        return self._graph
+
+    def nodes_by_type(
+        self, types: pd.DataFrame, type_order: Optional[Iterable[str]] = None
+    ) -> Dict[str, List]:
+        """
+        按节点类型分组。
+
+        Args:
+            types (pd.DataFrame): ``node``、``type`` 两列；同一节点出现多次时以最后一次为准。
+            type_order (Iterable[str], optional): 返回的类型及其顺序，默认为出现过的所有类型。
+
+        Returns:
+            Dict[str, List]: 类型 → 节点列表（按节点顺序），没有类型的节点不出现。
+        """
+        type_map = types.drop_duplicates("node", keep="last").set_index("node")["type"]
+        node_types = pd.Series(self.names).map(type_map).to_numpy(dtype=object)
+        if type_order is None:
+            type_order = pd.unique(node_types[pd.notna(node_types)])
+        return {t: self.names[node_types == t].tolist() for t in type_order}
@@ -0,0 +1,219 @@
+"""带缓存的 STRING 网络请求层
+
+同一次运行中 ``ppi_final.main`` 和 ``NetworkTypeProcessor`` 常常对重叠的基因集合
+请求 STRING，这里统一经过一个客户端：
+
+- 缓存：每个请求按（物种、阈值、排序去重后的基因集合）的摘要缓存响应文本，
+  内存中保留一份，同时写入 ``get_cache_dir("ppi", <species_id>)``，之后的进程直接复用；
+- 分页：基因数超过 ``page_size`` 时把基因分成若干页，对每一对页面请求
+  二者并集的网络并行获取，再合并去重。任意一条边的两个端点总落在某一对
+  页面中，因此合并结果与一次性请求完全相同；
+- 合并请求：相同的请求正在进行时，其他线程等待同一个结果而不重复发送；
+- 统计：``stats`` 记录命中、未命中、合并等待和实际发出的请求数。
+
+``base_url`` 可以指向本地的替身服务，便于离线测试。
+"""
+
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from io import StringIO
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+import requests
+
+from biorange.logger import get_logger
+from biorange.utils.atomic import atomic_write
+from biorange.utils.package_fileload import get_cache_dir
+
+logger = get_logger(__name__)
+
+STRING_API_URL = "https://string-db.org/api"
+
+
+def normalize_genes(gene_names: Iterable[str]) -> List[str]:
+    """去掉空白和空值，排序去重；缓存键和分页都基于这个结果。"""
+    genes = {str(gene).strip() for gene in gene_names if pd.notna(gene)}
+    return sorted(gene for gene in genes if gene)
+
+
+def parse_network_tsv(text: str) -> pd.DataFrame:
+    """解析 STRING ``tsv/network`` 的响应，空响应返回空表。"""
+    if not text.strip():
+        return pd.DataFrame(columns=["preferredName_A", "preferredName_B"])
+    return pd.read_csv(StringIO(text), sep="\t")
+
+
+class StringClient:
+    """缓存、分页并合并重复请求的 STRING 网络客户端。
+
+    Args:
+        species_id (int): NCBI 物种编号，默认为 9606（人）。
+        required_score (int, optional): combined_score 阈值（0-1000），默认使用 API 的默认值。
+        page_size (int): 每页基因数，默认为 1000（每个请求最多两页）。
+        max_workers (int): 并行请求数，默认为 4。
+        base_url (str): API 地址，默认为 ``STRING_API_URL``。
+        cache_dir (str | Path, optional): 响应缓存目录，默认为 ``get_cache_dir("ppi", species_id)``。
+        persist (bool): 是否把响应写入磁盘缓存，默认为 True。
+        timeout (float): 单个请求的超时秒数，默认为 120。
+    """
+
+    def __init__(
+        self,
+        species_id: int = 9606,
+        required_score: Optional[int] = None,
+        page_size: int = 1000,
+        max_workers: int = 4,
+        base_url: str = STRING_API_URL,
+        cache_dir: Optional[Union[str, Path]] = None,
+        persist: bool = True,
+        timeout: float = 120,
+    ):
+        self.species_id = species_id
+        self.required_score = required_score
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.base_url = base_url.rstrip("/")
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self.persist = persist
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "requests": 0}
+        self._memory: Dict[str, str] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self) -> Path:
+        if self._cache_dir is None:
+            self._cache_dir = get_cache_dir("ppi", str(self.species_id))
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        return self._cache_dir
+
+    def cache_key(self, genes: List[str]) -> str:
+        text = "\n".join([str(self.species_id), str(self.required_score)] + genes)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if not self.persist:
+            return None
+        try:
+            return (self.cache_dir / f"{key}.tsv").read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, text: str):
+        if not self.persist:
+            return
+        path = self.cache_dir / f"{key}.tsv"
+        try:
+            with atomic_write(path, "wt", encoding="utf-8") as f:
+                f.write(text)
+        except OSError as e:
+            logger.warning(f"Failed to cache STRING response {path}: {e}")
+
+    def _post(self, genes: List[str]) -> str:
+        params = {
+            "identifiers": "\r".join(genes),
+            "species": self.species_id,
+            "caller_identity": "biorange",
+        }
+        if self.required_score is not None:
+            params["required_score"] = self.required_score
+        response = self.session.post(
+            f"{self.base_url}/tsv/network", data=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.text
+
+    def fetch(self, genes: List[str]) -> str:
+        """请求一组（已规范化的）基因的网络，返回响应文本。"""
+        key = self.cache_key(genes)
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self.stats["hits"] += 1
+                return text
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            text = self._read_disk(key)
+            if text is None:
+                with self._lock:
+                    self.stats["misses"] += 1
+                    self.stats["requests"] += 1
+                text = self._post(genes)
+                self._write_disk(key, text)
+            else:
+                with self._lock:
+                    self.stats["hits"] += 1
+            with self._lock:
+                self._memory[key] = text
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def network(self, gene_names: Iterable[str]) -> pd.DataFrame:
+        """
+        获取基因集合的网络，基因较多时分页并行请求后合并。
+
+        Args:
+            gene_names (Iterable[str]): 基因名列表。
+
+        Returns:
+            pd.DataFrame: STRING ``tsv/network`` 的结果，每条边一行。
+        """
+        genes = normalize_genes(gene_names)
+        if len(genes) <= self.page_size:
+            return parse_network_tsv(self.fetch(genes))
+
+        pages = [
+            genes[start : start + self.page_size]
+            for start in range(0, len(genes), self.page_size)
+        ]
+        # 至少两页时，任意两页的并集已经覆盖了页内的边
+        batches = [pages[i] + pages[j] for i, j in combinations(range(len(pages)), 2)]
+        logger.info(
+            f"Fetching STRING network for {len(genes)} genes "
+            f"in {len(batches)} requests"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            parts = [parse_network_tsv(t) for t in pool.map(self.fetch, batches)]
+        merged = pd.concat(parts, ignore_index=True)
+        if merged.empty:
+            return merged
+        # 同一条边会出现在多个请求中，按无序端点对去重
+        id_a = "stringId_A" if "stringId_A" in merged.columns else "preferredName_A"
+        id_b = "stringId_B" if "stringId_B" in merged.columns else "preferredName_B"
+        first = merged[id_a].where(merged[id_a] <= merged[id_b], merged[id_b])
+        second = merged[id_b].where(merged[id_a] <= merged[id_b], merged[id_a])
+        return merged[
+            ~pd.DataFrame({"a": first, "b": second}).duplicated()
+        ].reset_index(drop=True)
+
+    def clear(self):
+        """清空内存缓存（磁盘缓存保留）。"""
+        with self._lock:
+            self._memory.clear()
+
+
+@lru_cache(maxsize=None)
+def get_string_client(species_id: int = 9606) -> StringClient:
+    """每个物种一个共享客户端，同一进程中的请求共用缓存。"""
+    return StringClient(species_id)
@@ -5,26 +5,33 @@ import matplotlib.pyplot as plt
 import os
 import numpy as np
 import matplotlib.cm as cm
+from functools import lru_cache
 from io import StringIO
 
+from biorange.ppi.graph_builder import NetworkGraph
+from biorange.ppi.layout import compute_layout
+from biorange.ppi.ppi_client import get_string_client
+from biorange.ppi.string_store import (
+    DEFAULT_REQUIRED_SCORE,
+    StringStore,
+    default_store_dir,
+)
+from biorange.utils.rendering import DEFAULT_FORMATS, finish_figure, new_figure
 
-def fetch_ppi_data(gene_names, species_id=9606):
-    url = "https://string-db.org/api/tsv/network"
-    params = {
-        "identifiers": "\r".join(gene_names),
-        "species": species_id,
-        "caller_identity": "my_script",
-    }
 
-    response = requests.post(url, data=params)
+def fetch_ppi_data(gene_names, species_id=9606):
+    """
+    请求 STRING 网络，返回 TSV 文本；失败时打印错误并返回 None。
 
-    if response.status_code != 200:
-        print(f"Error: {response.status_code}")
-        print(response.text)
+    请求经过共享的 ``StringClient``：相同的基因集合在进程内和磁盘上都有缓存，
+    基因较多时分页并行请求。
+    """
+    try:
+        network = get_string_client(species_id).network(gene_names)
+    except requests.RequestException as e:
+        print(f"Error: {e}")
         return None
-
-    data = response.text
-    return data
+    return network.to_csv(sep="\t", index=False)
 
 
 def parse_interaction_data(data):
@@ -44,16 +51,80 @@ def parse_interaction_data(data):
         return None
 
 
+@lru_cache(maxsize=4)
+def _open_string_store(store_dir, mtime):
+    return StringStore(store_dir)
+
+
+def get_ppi_network(
+    gene_names,
+    species_id=9606,
+    store_dir=None,
+    required_score=DEFAULT_REQUIRED_SCORE,
+):
+    """
+    获取基因集合的 PPI 网络：有本地 STRING 库时离线查询，否则请求 STRING API。
+
+    本地库用 ``StringStore.build`` 从 STRING 下载文件导入，默认位置为
+    ``default_store_dir(species_id)``。
+
+    Args:
+        gene_names (Iterable[str]): 基因名列表。
+        species_id (int): NCBI 物种编号，默认为 9606（人）。
+        store_dir (str, optional): 本地 STRING 库目录。
+        required_score (int): 本地查询的 combined_score 阈值（0-1000），默认为 400。
+
+    Returns:
+        pd.DataFrame | None: ``preferredName_A``、``preferredName_B`` 两列，失败时为 None。
+    """
+    store_dir = store_dir or default_store_dir(species_id)
+    if StringStore.exists(store_dir):
+        store = _open_string_store(
+            str(store_dir), os.path.getmtime(os.path.join(store_dir, "store.json"))
+        )
+        network = store.network(gene_names, required_score=required_score)
+        return network[["preferredName_A", "preferredName_B"]]
+
+    data = fetch_ppi_data(gene_names, species_id)
+    if data is None:
+        return None
+    return parse_interaction_data(data)
+
+
 def save_interaction_data(nodes, output_dir):
     output_csv_path = os.path.join(output_dir, "protein_interactions.csv")
     nodes.to_csv(output_csv_path, index=False, header=["node1", "node2"])
     return output_csv_path
 
 
-def plot_ppi_network(nodes, output_dir, edge_width=0.1, dpi=900):
-    G = nx.from_pandas_edgelist(nodes, "preferredName_A", "preferredName_B")
-    plt.figure(figsize=(10, 10))
-    pos = nx.kamada_kawai_layout(G)
+def _network_graph(nodes, graph=None):
+    """PPI 边表对应的 ``NetworkGraph``；已经构建过时直接复用。"""
+    if graph is None:
+        graph = NetworkGraph.from_frame(nodes, "preferredName_A", "preferredName_B")
+    return graph
+
+
+def plot_ppi_network(
+    nodes,
+    output_dir,
+    edge_width=0.1,
+    dpi=900,
+    graph=None,
+    layout="auto",
+    formats=DEFAULT_FORMATS,
+    show=None,
+):
+    """
+    绘制完整的 PPI 网络图。
+
+    ``layout`` 见 ``compute_layout``：默认小网络用 Kamada-Kawai，大网络用
+    网格加速的力导向布局；布局按网络缓存，重复作图时不再计算。``formats``、
+    ``dpi``、``show`` 见 ``finish_figure``，返回按 ``formats`` 顺序的文件路径。
+    """
+    graph = _network_graph(nodes, graph)
+    G = graph.to_networkx()
+    fig = new_figure("ppi_network", (10, 10))
+    pos = compute_layout(graph, layout)
     nx.draw(
         G,
         pos,
@@ -65,34 +136,27 @@ def plot_ppi_network(nodes, output_dir, edge_width=0.1, dpi=900):
         width=edge_width,
     )
     plt.title("Protein-Protein Interaction Network")
-    png_path = os.path.join(output_dir, "ppi_network.png")
-    pdf_path = os.path.join(output_dir, "ppi_network.pdf")
-    plt.savefig(png_path, dpi=dpi)
-    plt.savefig(pdf_path)
-    plt.show()
-    return png_path, pdf_path
-
-
-def calculate_node_degrees(nodes, output_dir):
-    G = nx.Graph()
-    G.add_edges_from(zip(nodes["preferredName_A"], nodes["preferredName_B"]))
-    degree_dict = dict(G.degree(G.nodes()))
-    df = pd.DataFrame(list(degree_dict.items()), columns=["node", "degree"])
-    df_sorted = df.sort_values(by="degree", ascending=False)
+    return tuple(finish_figure(fig, output_dir, "ppi_network", formats, dpi, show))
+
+
+def calculate_node_degrees(nodes, output_dir, graph=None):
+    df_sorted = _network_graph(nodes, graph).degree_frame()
     degree_csv_path = os.path.join(output_dir, "string_node_degree.csv")
     df_sorted.to_csv(degree_csv_path, index=False)
     return df_sorted, degree_csv_path
 
 
-def plot_core_targets(degree_df, nodes, output_dir):
+def plot_core_targets(
+    degree_df,
+    nodes,
+    output_dir,
+    graph=None,
+    formats=DEFAULT_FORMATS,
+    dpi=None,
+    show=None,
+):
     degree_dict = degree_df.set_index("node")["degree"].to_dict()
-    edges = [
-        (row["preferredName_A"], row["preferredName_B"]) for _, row in nodes.iterrows()
-    ]
-
-    G = nx.Graph()
-    G.add_nodes_from(degree_dict.keys())
-    G.add_edges_from(edges)
+    G = _network_graph(nodes, graph).to_networkx()
 
     top_nodes = [
         node
@@ -147,7 +211,7 @@ def plot_core_targets(degree_df, nodes, output_dir):
         for node in subgraph.nodes()
     }
 
-    plt.figure(figsize=(6, 6))
+    fig = new_figure("ppi_core_targets", (6, 6))
     nx.draw(
         subgraph,
         pos,
@@ -162,22 +226,14 @@ def plot_core_targets(degree_df, nodes, output_dir):
         plt.text(x, y, s=node, fontsize=font_sizes[node], ha="center", va="center")
 
     plt.title("PPI network top 100")
-    pdf_path = os.path.join(output_dir, "PPI_network_degree.pdf")
-    png_path = os.path.join(output_dir, "PPI_network_degree.png")
-    plt.savefig(pdf_path)
-    plt.savefig(png_path)
-    plt.show()
-    return png_path, pdf_path
-
+    return tuple(
+        finish_figure(fig, output_dir, "PPI_network_degree", formats, dpi, show)
+    )
 
-def main(gene_names, output_dir):
-    # 获取PPI数据
-    data = fetch_ppi_data(gene_names)
-    if data is None:
-        return
 
-    # 解析PPI数据
-    nodes = parse_interaction_data(data)
+def main(gene_names, output_dir, show=None):
+    # 获取并解析PPI数据（有本地 STRING 库时离线查询）
+    nodes = get_ppi_network(gene_names)
     if nodes is None:
         return
 
@@ -186,14 +242,21 @@ def main(gene_names, output_dir):
     if interaction_csv_path is None:
         return
 
+    # 构建一次网络，度数计算和两张图共用
+    graph = _network_graph(nodes)
+
     # 绘制PPI网络图
-    ppi_png_path, ppi_pdf_path = plot_ppi_network(nodes, output_dir)
+    ppi_png_path, ppi_pdf_path = plot_ppi_network(
+        nodes, output_dir, graph=graph, show=show
+    )
 
     # 计算节点度数并保存
-    degree_df, degree_csv_path = calculate_node_degrees(nodes, output_dir)
+    degree_df, degree_csv_path = calculate_node_degrees(nodes, output_dir, graph=graph)
 
     # 绘制核心靶点图
-    core_png_path, core_pdf_path = plot_core_targets(degree_df, nodes, output_dir)
+    core_png_path, core_pdf_path = plot_core_targets(
+        degree_df, nodes, output_dir, graph=graph, show=show
+    )
 
     return {
         "interaction_csv": interaction_csv_path,
@@ -2,7 +2,9 @@ import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
 import numpy as np
-import os
+
+from biorange.ppi.graph_builder import NetworkGraph
+from biorange.utils.rendering import DEFAULT_FORMATS, finish_figure, new_figure
 
 
 def create_custom_layout(node_types, num_rows, num_cols):
@@ -56,25 +58,22 @@ def draw_custom_layout(
     output_file="output",
     output_dir="./results/output/type",
     figsize=(14, 10),
+    formats=DEFAULT_FORMATS,
+    dpi=None,
+    show=None,
 ):
 
-    G = nx.Graph()
-    for _, row in nodes_df.iterrows():
-        G.add_edge(row["node1"], row["node2"])
-
-    type_dict = types_df.set_index("node")["type"].to_dict()
-    nx.set_node_attributes(G, type_dict, "type")
+    graph = NetworkGraph.from_frame(nodes_df, "node1", "node2")
+    G = graph.to_networkx()
 
     type_color = {"compound": "#0D71BF", "target": "#2BB11E", "pathway": "#F56327"}
     type_shape = {"compound": "d", "target": "o", "pathway": "*"}
 
-    node_types = {
-        t: [n for n, d in G.nodes(data=True) if d["type"] == t] for t in type_color
-    }
+    node_types = graph.nodes_by_type(types_df, type_color)
 
     pos = create_custom_layout(node_types, num_rows, num_cols)
 
-    plt.figure(figsize=figsize)
+    fig = new_figure("custom_layout", figsize)
 
     node_sizes = {"compound": 200, "target": 300, "pathway": 200}
     font_sizes = {"compound": 10, "target": 6, "pathway": 10}
@@ -97,12 +96,7 @@ def draw_custom_layout(
 
     plt.legend(scatterpoints=1, markerscale=0.4, fontsize=8)
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    plt.savefig(os.path.join(output_dir, f"{output_file}.pdf"))
-    plt.savefig(os.path.join(output_dir, f"{output_file}.png"))
-    plt.show()
+    return finish_figure(fig, output_dir, output_file, formats, dpi, show)
 
 
 def draw_concentric_layout(
@@ -114,21 +108,17 @@ def draw_concentric_layout(
     output_dir="./results/output/type",
     figsize=(12, 12),
     dpi=900,
+    formats=DEFAULT_FORMATS,
+    show=None,
 ):
 
-    G = nx.Graph()
-    for _, row in nodes_df.iterrows():
-        G.add_edge(row["node1"], row["node2"])
-
-    type_dict = types_df.set_index("node")["type"].to_dict()
-    nx.set_node_attributes(G, type_dict, "type")
+    graph = NetworkGraph.from_frame(nodes_df, "node1", "node2")
+    G = graph.to_networkx()
 
     type_color = {"compound": "#FEBA2C", "target": "#DA5A6A", "pathway": "#8A09A5"}
     type_shape = {"compound": "s", "target": "o", "pathway": "*"}
 
-    node_types = {
-        t: [n for n, d in G.nodes(data=True) if d["type"] == t] for t in type_color
-    }
+    node_types = graph.nodes_by_type(types_df, type_color)
 
     if layer_radii is None:
         layer_radii = [0.1, 0.4, 0.55, 0.7, 0.85, 1, 1.6]
@@ -153,7 +143,7 @@ def draw_concentric_layout(
     layers = [compounds_nodes, *target_layers, pathway_nodes]
     pos = create_concentric_layout(G, layers, layer_radii)
 
-    plt.figure(figsize=figsize)
+    fig = new_figure("concentric_layout", figsize)
 
     node_sizes = {"compound": 200, "target": 500, "pathway": 700}
     font_sizes = {"compound": 8, "target": 8, "pathway": 6}
@@ -176,12 +166,7 @@ def draw_concentric_layout(
 
     plt.legend(scatterpoints=1, markerscale=0.4, fontsize=8)
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-
-    plt.savefig(os.path.join(output_dir, f"{output_file}.pdf"))
-    plt.savefig(os.path.join(output_dir, f"{output_file}.png"), dpi=dpi)
-    plt.show()
+    return finish_figure(fig, output_dir, output_file, formats, dpi, show)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,228 @@
+"""本地 STRING 蛋白互作库
+
+把 STRING 下载页面的 ``<taxon>.protein.info.*.txt.gz``（蛋白 ID 与基因名）和
+``<taxon>.protein.links.*.txt.gz``（蛋白对与 combined_score）导入成两个
+``ColumnarIndex``：
+
+- ``nodes``：按基因名（preferred_name）排序，行号即节点编号；
+- ``edges``：每条边以较小的节点编号为键，保存另一端编号和 combined_score。
+
+查询一组基因的诱导子图时，先二分查找出基因对应的节点，再取出以这些节点为
+键的所有边，保留另一端也在基因集合内、且分数达到阈值的边。整个过程都是
+内存映射数组上的向量运算，1000 个基因的查询在毫秒级完成，不需要联网。
+
+返回的表与 STRING API ``/api/tsv/network`` 的主要列一致（``stringId_A``、
+``stringId_B``、``preferredName_A``、``preferredName_B``、``ncbiTaxonId``、
+``score``）。与在线服务不同，基因只按 preferred_name 精确匹配，不做别名解析。
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from biorange.logger import get_logger
+from biorange.utils.atomic import atomic_write
+from biorange.utils.columnar_index import ColumnarIndex, source_signature
+from biorange.utils.package_fileload import get_cache_dir
+
+logger = get_logger(__name__)
+
+STORE_FILE = "store.json"
+STORE_VERSION = 1
+# STRING API 的默认阈值（medium confidence）
+DEFAULT_REQUIRED_SCORE = 400
+
+NETWORK_COLUMNS = [
+    "stringId_A",
+    "stringId_B",
+    "preferredName_A",
+    "preferredName_B",
+    "ncbiTaxonId",
+    "score",
+]
+
+
+def default_store_dir(species_id: int = 9606) -> Path:
+    """本地 STRING 库的默认位置：``get_cache_dir("string")/<species_id>``。"""
+    return get_cache_dir("string") / str(species_id)
+
+
+class StringStore:
+    """只读的本地 STRING 互作库。
+
+    Args:
+        store_dir (str | Path): ``build`` 生成的目录。
+    """
+
+    def __init__(self, store_dir: Union[str, Path]):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / STORE_FILE, "rt", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.species_id = self.meta["species_id"]
+        self.nodes = ColumnarIndex(self.store_dir / "nodes")
+        self.edges = ColumnarIndex(self.store_dir / "edges")
+        self._edge_b = self.edges._arrays["node_b"]
+        self._edge_score = self.edges._arrays["score"]
+
+    def __len__(self):
+        return len(self.edges)
+
+    @staticmethod
+    def exists(store_dir: Union[str, Path]) -> bool:
+        """目录中是否有完整可用的库（版本匹配）。"""
+        path = Path(store_dir) / STORE_FILE
+        if not path.is_file():
+            return False
+        try:
+            with open(path, "rt", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return meta.get("version") == STORE_VERSION and all(
+            ColumnarIndex.is_fresh(Path(store_dir) / name)
+            for name in ("nodes", "edges")
+        )
+
+    @classmethod
+    def build(
+        cls,
+        links_file: Union[str, Path],
+        info_file: Union[str, Path],
+        store_dir: Optional[Union[str, Path]] = None,
+        species_id: Optional[int] = None,
+        min_score: int = 0,
+        chunksize: int = 2_000_000,
+    ) -> "StringStore":
+        """
+        从 STRING 下载文件导入本地库。
+
+        Args:
+            links_file (str | Path): ``protein.links`` 文件（空格分隔，
+                protein1 protein2 combined_score），可以是 .gz。
+            info_file (str | Path): ``protein.info`` 文件（制表符分隔，
+                首列为蛋白 ID，第二列为 preferred_name），可以是 .gz。
+            store_dir (str | Path, optional): 输出目录，默认为 ``default_store_dir``。
+            species_id (int, optional): NCBI 物种编号，默认从蛋白 ID 前缀推断。
+            min_score (int): 导入时丢弃 combined_score 低于该值的边，默认全部保留。
+            chunksize (int): 分块读取 links 文件的行数。
+
+        Returns:
+            StringStore: 导入好的库。
+        """
+        info = pd.read_csv(info_file, sep="\t", usecols=[0, 1], dtype=str)
+        info.columns = ["string_id", "preferred_name"]
+        if species_id is None:
+            species_id = int(info["string_id"].iloc[0].split(".", 1)[0])
+        store_dir = Path(store_dir) if store_dir else default_store_dir(species_id)
+        store_dir.mkdir(parents=True, exist_ok=True)
+        marker = store_dir / STORE_FILE
+        if marker.exists():
+            marker.unlink()
+
+        # 节点按基因名排序后的行号就是节点编号
+        nodes = ColumnarIndex.build(
+            [info],
+            store_dir / "nodes",
+            key="preferred_name",
+            columns=["string_id"],
+            source=info_file,
+        )
+        protein_ids = pd.Index(nodes.take(np.arange(len(nodes)))["string_id"])
+
+        def edge_chunks():
+            for chunk in pd.read_csv(
+                links_file,
+                sep=" ",
+                dtype={"combined_score": np.int16},
+                chunksize=chunksize,
+            ):
+                chunk = chunk[chunk["combined_score"] >= min_score]
+                a = protein_ids.get_indexer(chunk["protein1"])
+                b = protein_ids.get_indexer(chunk["protein2"])
+                known = (a >= 0) & (b >= 0)
+                a, b = a[known], b[known]
+                # 每条边以较小的编号为键，A-B 与 B-A 存成同一形式，查询时去重
+                yield pd.DataFrame(
+                    {
+                        "node_a": np.minimum(a, b).astype(np.int32),
+                        "node_b": np.maximum(a, b).astype(np.int32),
+                        "score": chunk["combined_score"].to_numpy()[known],
+                    }
+                )
+
+        ColumnarIndex.build(
+            edge_chunks(),
+            store_dir / "edges",
+            key="node_a",
+            columns=["node_b", "score"],
+            source=links_file,
+        )
+        meta = {
+            "version": STORE_VERSION,
+            "species_id": species_id,
+            "min_score": min_score,
+            "links": source_signature(links_file),
+            "info": source_signature(info_file),
+        }
+        with atomic_write(marker, "wt", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        store = cls(store_dir)
+        logger.info(
+            f"Built STRING store {store_dir} ({len(info)} proteins, {len(store)} links)"
+        )
+        return store
+
+    def node_ids(self, gene_names: Iterable[str]) -> np.ndarray:
+        """基因名对应的节点编号（升序、去重；同名的多个蛋白都会返回）。"""
+        return self.nodes.positions(gene_names)
+
+    def network(
+        self,
+        gene_names: Iterable[str],
+        required_score: int = DEFAULT_REQUIRED_SCORE,
+    ) -> pd.DataFrame:
+        """
+        返回基因集合的诱导子图。
+
+        Args:
+            gene_names (Iterable[str]): 基因名（preferred_name）。
+            required_score (int): combined_score 阈值（0-1000），默认为 400。
+
+        Returns:
+            pd.DataFrame: 每条边一行，列为 ``NETWORK_COLUMNS``，``score`` 为 0-1
+            之间的 combined_score；按 preferredName_A、preferredName_B 排序。
+        """
+        ids = self.node_ids(gene_names)
+        positions = self.edges.positions(ids.astype(np.int32))
+        a = np.asarray(self.edges._keys[positions], dtype=np.int64)
+        b = np.asarray(self._edge_b[positions], dtype=np.int64)
+        score = np.asarray(self._edge_score[positions])
+
+        member = np.zeros(len(self.nodes), dtype=bool)
+        member[ids] = True
+        keep = member[b] & (score >= required_score) & (a != b)
+        a, b, score = a[keep], b[keep], score[keep]
+        # 同一条边在 links 文件中出现两次（A-B、B-A），只保留一次
+        pair = a * len(self.nodes) + b
+        _, first = np.unique(pair, return_index=True)
+        a, b, score = a[first], b[first], score[first]
+
+        used = np.union1d(a, b)
+        names = self.nodes.take(used, ["preferred_name", "string_id"])
+        ia, ib = np.searchsorted(used, a), np.searchsorted(used, b)
+        preferred = names["preferred_name"].to_numpy()
+        string_ids = names["string_id"].to_numpy()
+        return pd.DataFrame(
+            {
+                "stringId_A": string_ids[ia],
+                "stringId_B": string_ids[ib],
+                "preferredName_A": preferred[ia],
+                "preferredName_B": preferred[ib],
+                "ncbiTaxonId": self.species_id,
+                "score": score / 1000.0,
+            },
+            columns=NETWORK_COLUMNS,
+        )
@@ -42,4 +42,10 @@ from biorange.target_predict.disease_target.genecards import (
 
 from biorange.target_predict.data_processing.ingredient_input import admet_filter
 
-from biorange.target_predict.mol_target.chembl_local import chembl_inchikey_target
+from biorange.target_predict.mol_target.chembl_local import (
+    ChemblTargetScraper,
+    chembl_inchikey_target,
+)
+
+## 药物-疾病共有靶点
+from biorange.target_predict.shared_targets import SharedTargetMatrix
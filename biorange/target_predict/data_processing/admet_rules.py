@@ -0,0 +1,241 @@
+"""声明式 ADMET 过滤规则
+
+规则写成字符串（例如 ``"QED > 0.5"``）或 ``Rule`` 对象，用 ``{"all": [...]}`` /
+``{"any": [...]}`` 组合（列表默认为 "all"），编译后对整列 NumPy 数组求值，
+得到一个布尔掩码和每条规则的通过数。
+
+ADMET 表按 inchikey 建立一次索引，之后任意一批成分只需查出行号再取掩码，
+不用每次把输入和整张 ADMET 表合并。缺少 ADMET 数据（或该列为空）的成分
+不满足任何比较规则。
+"""
+
+import operator
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from biorange.logger import get_logger
+
+logger = get_logger(__name__)
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+_RULE_PATTERN = re.compile(r"^\s*(.+?)\s*(==|!=|>=|<=|>|<)\s*(.+?)\s*$")
+
+
+def _parse_value(text: str):
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+@dataclass(frozen=True)
+class Rule:
+    """单列比较规则：``column op value``。
+
+    Attributes:
+        column (str): ADMET 列名。
+        op (str): 比较运算符，见 ``OPERATORS``。
+        value (Any): 阈值。
+    """
+
+    column: str
+    op: str
+    value: Any
+
+    def __post_init__(self):
+        if self.op not in OPERATORS:
+            raise ValueError(f"不支持的运算符：{self.op}")
+
+    @classmethod
+    def parse(cls, text: str) -> "Rule":
+        """解析 ``"QED > 0.5"`` 形式的规则字符串。"""
+        match = _RULE_PATTERN.match(text)
+        if match is None:
+            raise ValueError(f"无法解析规则：{text!r}")
+        column, op, value = match.groups()
+        return cls(column, op, _parse_value(value))
+
+    def __str__(self):
+        if isinstance(self.value, float):
+            return f"{self.column} {self.op} {self.value:g}"
+        return f"{self.column} {self.op} {self.value!r}"
+
+    def leaves(self) -> List["Rule"]:
+        return [self]
+
+    def combine(self, leaf_masks: Dict["Rule", np.ndarray]) -> np.ndarray:
+        return leaf_masks[self].copy()
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        values = columns[self.column]
+        if values.dtype.kind == "f":
+            # 缺失值不满足任何比较（包括 !=）
+            return OPERATORS[self.op](values, self.value) & ~np.isnan(values)
+        return OPERATORS[self.op](values, self.value) & pd.notna(values)
+
+
+@dataclass(frozen=True)
+class AllOf:
+    """所有子规则都满足。"""
+
+    rules: tuple
+
+    def __str__(self):
+        return "(" + " and ".join(map(str, self.rules)) + ")"
+
+    def leaves(self) -> List[Rule]:
+        return [leaf for rule in self.rules for leaf in rule.leaves()]
+
+    def combine(self, leaf_masks: Dict[Rule, np.ndarray]) -> np.ndarray:
+        mask = self.rules[0].combine(leaf_masks)
+        for rule in self.rules[1:]:
+            mask &= rule.combine(leaf_masks)
+        return mask
+
+
+@dataclass(frozen=True)
+class AnyOf:
+    """任一子规则满足。"""
+
+    rules: tuple
+
+    def __str__(self):
+        return "(" + " or ".join(map(str, self.rules)) + ")"
+
+    def leaves(self) -> List[Rule]:
+        return [leaf for rule in self.rules for leaf in rule.leaves()]
+
+    def combine(self, leaf_masks: Dict[Rule, np.ndarray]) -> np.ndarray:
+        mask = self.rules[0].combine(leaf_masks)
+        for rule in self.rules[1:]:
+            mask |= rule.combine(leaf_masks)
+        return mask
+
+
+RuleSpec = Union[str, Rule, AllOf, AnyOf, Dict[str, Sequence], Sequence]
+
+
+def compile_rules(spec: RuleSpec) -> Union[Rule, AllOf, AnyOf]:
+    """
+    把声明式规则编译成可求值的规则树。
+
+    Args:
+        spec: 规则字符串、``Rule``、``{"all": [...]}``、``{"any": [...]}``，
+            或它们组成的列表（等同于 "all"）。
+
+    Returns:
+        Rule | AllOf | AnyOf: 编译后的规则树。
+    """
+    if isinstance(spec, (Rule, AllOf, AnyOf)):
+        return spec
+    if isinstance(spec, str):
+        return Rule.parse(spec)
+    if isinstance(spec, dict):
+        if len(spec) != 1 or next(iter(spec)) not in ("all", "any"):
+            raise ValueError(
+                f"规则组只能是 {{'all': [...]}} 或 {{'any': [...]}}：{spec}"
+            )
+        kind, children = next(iter(spec.items()))
+        group = AllOf if kind == "all" else AnyOf
+    else:
+        group, children = AllOf, spec
+    children = tuple(compile_rules(child) for child in children)
+    if not children:
+        raise ValueError("规则组不能为空")
+    return children[0] if len(children) == 1 else group(children)
+
+
+class RuleResult(NamedTuple):
+    """规则求值结果。
+
+    Attributes:
+        mask (np.ndarray): 每行是否通过全部规则。
+        counts (pd.Series): 每条规则单独的通过数，最后一项 "all" 为整体通过数。
+    """
+
+    mask: np.ndarray
+    counts: pd.Series
+
+
+class ADMETRuleEngine:
+    """按 inchikey 索引的 ADMET 表，对声明式规则做向量化求值。
+
+    Args:
+        admet_data (pd.DataFrame): ADMET 表，需包含 ``key`` 列。
+        key (str): 索引列，默认为 "inchikey"。重复的键只保留第一行。
+    """
+
+    def __init__(self, admet_data: pd.DataFrame, key: str = "inchikey"):
+        if admet_data[key].duplicated().any():
+            logger.warning(f"ADMET 数据中存在重复的 {key}，只保留第一行")
+            admet_data = admet_data.drop_duplicates(subset=[key])
+        self.data = admet_data.reset_index(drop=True)
+        self.key = key
+        self.index = pd.Index(self.data[key])
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self.data)
+
+    def column(self, name: str) -> np.ndarray:
+        """返回求值用的列数组（数值列转为 float64），首次使用时缓存。"""
+        if name not in self._columns:
+            if name not in self.data.columns:
+                raise ValueError(f"ADMET 数据中没有列：{name}")
+            series = self.data[name]
+            if pd.api.types.is_numeric_dtype(series):
+                values = series.to_numpy(dtype=np.float64)
+            else:
+                values = series.to_numpy(dtype=object)
+            # 末尾追加一行缺失值，供查不到的键（行号 -1）使用
+            self._columns[name] = np.append(
+                values, np.nan if values.dtype.kind == "f" else None
+            )
+        return self._columns[name]
+
+    def positions(self, keys: Iterable) -> np.ndarray:
+        """返回每个键在 ADMET 表中的行号，查不到的为 -1。"""
+        return self.index.get_indexer(pd.Index(list(keys), dtype=object))
+
+    def evaluate(
+        self, rules: RuleSpec, positions: Optional[np.ndarray] = None
+    ) -> RuleResult:
+        """
+        对 ADMET 表中的若干行求值。
+
+        Args:
+            rules: 声明式规则，见 ``compile_rules``。
+            positions (np.ndarray, optional): 行号（-1 表示无 ADMET 数据），
+                默认为整张表。
+
+        Returns:
+            RuleResult: 通过掩码和每条规则的通过数。
+        """
+        compiled = compile_rules(rules)
+        leaves = compiled.leaves()
+        names = {leaf.column for leaf in leaves}
+        if positions is None:
+            columns = {name: self.column(name)[:-1] for name in names}
+        else:
+            columns = {name: self.column(name)[positions] for name in names}
+
+        # 每条规则只比较一次，组合时复用各自的掩码
+        leaf_masks = {leaf: leaf.evaluate(columns) for leaf in leaves}
+        counts = {str(leaf): int(np.count_nonzero(m)) for leaf, m in leaf_masks.items()}
+        mask = compiled.combine(leaf_masks)
+        counts["all"] = int(np.count_nonzero(mask))
+        return RuleResult(mask, pd.Series(counts, name="passed"))
@@ -1,30 +1,56 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
 # 内置数据在python中主要是相对位置问题  之前写了一个获取内置数据函数，读取这个包data下指定名字的数据
-from biorange.utils.package_fileload import get_data_file_path
+from biorange.target_predict.data_processing.admet_rules import ADMETRuleEngine
+from biorange.utils.lazy_loader import LazyMethod
+from biorange.utils.package_fileload import load_data_file, resolve_data_file
 
 
 class ADMETFilter:
+    """
+    按 ADMET 性质过滤成分。
+
+    Args:
+        lipinski_threshold (int): Lipinski 规则满足数，默认为 4。
+        qed_threshold (float): QED 下限（不含），默认为 0.5。
+        bioavailability_threshold (float): 口服生物利用度下限（不含），默认为 0.3。
+        rules (optional): 自定义声明式规则（见 ``admet_rules.compile_rules``），
+            给出时替代上面三个阈值，例如
+            ``["QED > 0.6", {"any": ["logP < 5", "tpsa <= 140"]}]``。
+        admet_file (str): ADMET 数据文件名或路径。
+    """
+
     def __init__(
         self,
         lipinski_threshold=4,
         qed_threshold=0.5,
         bioavailability_threshold=0.3,
+        rules=None,
+        admet_file="TCM_NGM__ADMET_12184.csv",
     ):
         self.lipinski_threshold = lipinski_threshold
         self.qed_threshold = qed_threshold
         self.bioavailability_threshold = bioavailability_threshold
-        self.admet_file_path = get_data_file_path("TCM_NGM__ADMET_12184.csv")
+        self.rules = rules or [
+            f"Lipinski == {lipinski_threshold}",
+            f"QED > {qed_threshold}",
+            f"Bioavailability_Ma > {bioavailability_threshold}",
+        ]
+        self.admet_file_path = resolve_data_file(admet_file)
         self.admet_data = self._load_admet_data()
+        # 按 inchikey 建立一次索引，之后每批输入只需查行号、算掩码
+        self.engine = ADMETRuleEngine(self.admet_data)
+        self.rule_counts = None
 
     def _load_admet_data(self):
         # 检查 ADMET 数据文件是否存在
         if not self.admet_file_path.is_file():
             raise FileNotFoundError(f"未找到 ADMET 数据文件：{self.admet_file_path}")
 
-        # 读取 ADMET 数据
-        admet_data = pd.read_csv(self.admet_file_path)
+        # 读取 ADMET 数据（同一进程内共享，只读一次）
+        admet_data = load_data_file(self.admet_file_path)
         required_columns = ["inchikey", "Lipinski", "QED", "Bioavailability_Ma"]
         missing_columns = [
             col for col in required_columns if col not in admet_data.columns
@@ -43,6 +69,72 @@ class ADMETFilter:
         # 处理 DataFrame 格式的输入数据
         return self._process_data(input_dataframe, apply_filter)
 
+    def sweep(
+        self,
+        input_dataframe,
+        lipinski_thresholds=(4,),
+        qed_thresholds=(0.5,),
+        bioavailability_thresholds=(0.3,),
+        return_ids=True,
+    ):
+        """
+        一次计算多组阈值组合下保留的成分，用于挑选过滤阈值。
+
+        条件与默认过滤相同：``Lipinski == l``、``QED > q``、``Bioavailability_Ma > b``。
+        每个 Lipinski 取值内按 QED 从高到低排序，``QED > q`` 的成分正好是一个前缀；
+        再对每个生物利用度阈值做一次累计计数，任意组合的保留数都只需查表，
+        不会对每个组合重新过滤。
+
+        Args:
+            input_dataframe (pd.DataFrame): 含 ``inchikey`` 列的输入数据。
+            lipinski_thresholds (Iterable[int]): Lipinski 取值网格。
+            qed_thresholds (Iterable[float]): QED 阈值网格。
+            bioavailability_thresholds (Iterable[float]): 生物利用度阈值网格。
+            return_ids (bool): 是否返回每个组合保留的 inchikey，默认为 True。
+
+        Returns:
+            pd.DataFrame: 每个阈值组合一行，包含 lipinski_threshold、qed_threshold、
+            bioavailability_threshold、n_compounds（保留的不重复成分数），以及
+            inchikeys（按输入顺序排列的数组）。
+        """
+        if "inchikey" not in input_dataframe.columns:
+            raise ValueError("输入数据必须包含 'inchikey' 列。")
+
+        keys = pd.unique(input_dataframe["inchikey"].dropna().to_numpy(dtype=object))
+        positions = self.engine.positions(keys)
+        keys, positions = keys[positions >= 0], positions[positions >= 0]
+        lipinski = self.engine.column("Lipinski")[positions]
+        qed = self.engine.column("QED")[positions]
+        bioavailability = self.engine.column("Bioavailability_Ma")[positions]
+
+        qed_grid = np.asarray(list(qed_thresholds), dtype=np.float64)
+        bio_grid = np.asarray(list(bioavailability_thresholds), dtype=np.float64)
+
+        records = []
+        for lipinski_threshold in lipinski_thresholds:
+            members = np.flatnonzero(lipinski == lipinski_threshold)
+            # QED 从高到低排序（缺失值排在最后），QED > q 的成分是前 prefix 个
+            order = members[np.argsort(-qed[members], kind="stable")]
+            prefix = np.searchsorted(-qed[order], -qed_grid, side="left")
+            # bio_pass[i, j]：排序后第 j 个成分是否满足第 i 个生物利用度阈值
+            bio_pass = bioavailability[order][None, :] > bio_grid[:, None]
+            cumulative = np.zeros((len(bio_grid), len(order) + 1), dtype=np.int64)
+            np.cumsum(bio_pass, axis=1, out=cumulative[:, 1:])
+
+            for qed_threshold, size in zip(qed_grid, prefix):
+                for i, bio_threshold in enumerate(bio_grid):
+                    record = {
+                        "lipinski_threshold": lipinski_threshold,
+                        "qed_threshold": qed_threshold,
+                        "bioavailability_threshold": bio_threshold,
+                        "n_compounds": int(cumulative[i, size]),
+                    }
+                    if return_ids:
+                        kept = np.sort(order[:size][bio_pass[i, :size]])
+                        record["inchikeys"] = keys[kept]
+                    records.append(record)
+        return pd.DataFrame(records)
+
     def _process_data(self, data, apply_filter):
         # 检查输入数据是否为 DataFrame
         if not isinstance(data, pd.DataFrame):
@@ -52,34 +144,22 @@ class ADMETFilter:
         if "inchikey" not in data.columns:
             raise ValueError("输入数据必须包含 'inchikey' 列。")
 
-        # 合并输入数据与 ADMET 数据
-        merged_data = pd.merge(data, self.admet_data, on="inchikey", how="left")
-
-        # 检查合并结果是否为空
-        if merged_data.empty:
+        # 检查输入数据是否为空
+        if data.empty:
             raise ValueError(
                 "合并后的数据为空，请检查输入数据中的 'inchikey' 列是否有效。"
             )
 
         if apply_filter:
-            # 确保用于过滤的列存在
-            filter_columns = ["Lipinski", "QED", "Bioavailability_Ma"]
-            missing_filter_columns = [
-                col for col in filter_columns if col not in merged_data.columns
-            ]
-            if missing_filter_columns:
-                raise ValueError(
-                    f"缺少用于过滤的列：{', '.join(missing_filter_columns)}"
-                )
-
-            # 应用过滤条件
-            filtered_data = merged_data[
-                (merged_data["Lipinski"] == self.lipinski_threshold)
-                & (merged_data["QED"] > self.qed_threshold)
-                & (merged_data["Bioavailability_Ma"] > self.bioavailability_threshold)
-            ]
-        else:
-            filtered_data = merged_data
+            # 先按 inchikey 查行号并对规则求值，只有通过的行才与 ADMET 数据合并
+            result = self.engine.evaluate(
+                self.rules, self.engine.positions(data["inchikey"])
+            )
+            self.rule_counts = result.counts
+            data = data[result.mask]
+
+        # 与引擎中去重后的 ADMET 表合并：重复的 inchikey 不会使输入行成倍增加
+        filtered_data = pd.merge(data, self.engine.data, on="inchikey", how="left")
 
         # 选择需要保留的列
         columns_to_keep = [
@@ -105,7 +185,7 @@ class ADMETFilter:
         return filtered_data[existing_columns]
 
 
-admet_filter = ADMETFilter().process_dataframe
+admet_filter = LazyMethod(ADMETFilter, "process_dataframe")
 if __name__ == "__main__":
     # 示例
     input_file_path = (
@@ -0,0 +1,273 @@
+"""疾病名称的多关键词匹配
+
+OMIM、TTD 的疾病检索要把一组疾病名（常常是上百个同义词）和表中的疾病文本
+做不区分大小写的子串匹配。这里在加载时对文本列做一次规范化（只转小写，与原来
+``str.contains(case=False)`` 逐字符忽略大小写的规则一致，空白保持原样）并去重，查询时先得到候选文本，再在候选上逐个关键词做精确的子串确认：
+
+- 默认把所有关键词编译成一个正则交替式，对去重后的文本扫描一次得到候选；
+- 给出 ``index_paths`` 时改用倒排词索引（词 → 文本编号）：关键词里的每个词
+  必然是某个文本词的子串，先在词表中找到这些文本词，再对各自的倒排表求交集。
+  索引在首次查询时构建并保存，之后的进程直接加载。
+
+两种方式的结果都与逐个关键词 ``str.contains`` 后拼接完全一致（按关键词顺序、
+再按行顺序）。关键词按字面匹配，不再解释为正则表达式。
+"""
+
+import hashlib
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from biorange.logger import get_logger
+from biorange.utils.atomic import atomic_write
+from biorange.utils.package_fileload import get_cache_dir, resolve_data_file
+
+logger = get_logger(__name__)
+
+_TOKEN = re.compile(r"\w+")
+
+TOKEN_INDEX_VERSION = 1
+# 候选文本少于该数量时不再求交集，直接逐条确认更快
+_VERIFY_DIRECTLY = 256
+
+
+def normalize_text(text: str) -> str:
+    """转小写，文本列和关键词使用同一规则；不改写空白。"""
+    return text.lower()
+
+
+def _normalize_terms(terms: Union[str, Iterable[str]]) -> List[str]:
+    if isinstance(terms, str):
+        terms = [terms]
+    return [normalize_text(str(term)) for term in terms]
+
+
+def default_index_paths(data_file: Union[str, Path], column: str) -> List[Path]:
+    """索引文件的默认位置：数据文件旁边，不可写时退回缓存目录。"""
+    data_path = resolve_data_file(data_file)
+    name = f"{data_path.name}.{column.replace(' ', '_')}.tokens.npz"
+    return [data_path.with_name(name), get_cache_dir("disease_index") / name]
+
+
+class _Haystack:
+    """把一组文本用 ``\\0`` 拼成一个长串，子串查找在 C 层面一次完成。"""
+
+    def __init__(self, texts: Sequence[str]):
+        self.text = "\0".join(texts)
+        self.starts = np.cumsum([0] + [len(text) + 1 for text in texts])
+        self.size = len(texts)
+
+    def find(self, term: str) -> np.ndarray:
+        """返回包含 ``term`` 的文本编号（升序、去重）。"""
+        offsets = [m.start() for m in re.finditer(re.escape(term), self.text)]
+        hit = np.zeros(self.size, dtype=bool)
+        hit[np.searchsorted(self.starts, offsets, side="right") - 1] = True
+        return np.flatnonzero(hit)
+
+
+class TokenIndex:
+    """规范化文本的倒排词索引，以 CSR 形式保存（词表、indptr、文本编号）。
+
+    Args:
+        vocab (np.ndarray): 排好序的词表。
+        indptr (np.ndarray): 第 i 个词的倒排表为 ``indices[indptr[i]:indptr[i + 1]]``。
+        indices (np.ndarray): 文本编号。
+        digest (str): 被索引文本的摘要，用于判断索引是否过期。
+    """
+
+    def __init__(self, vocab, indptr, indices, digest: str):
+        self.vocab = np.asarray(vocab)
+        self.indptr = np.asarray(indptr)
+        self.indices = np.asarray(indices)
+        self.digest = digest
+        self._vocab_haystack = _Haystack(self.vocab.tolist())
+
+    @staticmethod
+    def digest_of(texts: Sequence[str]) -> str:
+        return hashlib.sha1("\0".join(texts).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def build(cls, texts: Sequence[str]) -> "TokenIndex":
+        """为规范化后的文本构建索引，文本编号即其在 ``texts`` 中的位置。"""
+        postings = {}
+        for i, text in enumerate(texts):
+            for token in set(_TOKEN.findall(text)):
+                postings.setdefault(token, []).append(i)
+        vocab = sorted(postings)
+        lengths = [len(postings[token]) for token in vocab]
+        indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        indices = np.fromiter(
+            (i for token in vocab for i in postings[token]),
+            dtype=np.int64,
+            count=int(indptr[-1]),
+        )
+        return cls(np.array(vocab, dtype=str), indptr, indices, cls.digest_of(texts))
+
+    def save(self, path: Union[str, Path]):
+        """写入 ``.npz`` 文件（先写临时文件再替换，避免读到写了一半的索引）。"""
+        # 索引写在数据文件旁边，权限为 0644，共享安装时其他用户也能直接读取
+        with atomic_write(path) as f:
+            np.savez(
+                f,
+                version=TOKEN_INDEX_VERSION,
+                vocab=self.vocab,
+                indptr=self.indptr,
+                indices=self.indices,
+                digest=self.digest,
+            )
+
+    @classmethod
+    def load(cls, path: Union[str, Path], digest: str) -> Optional["TokenIndex"]:
+        """读取索引文件；文件不存在、版本或摘要不符时返回 None。"""
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != TOKEN_INDEX_VERSION:
+                    return None
+                if str(data["digest"]) != digest:
+                    return None
+                return cls(data["vocab"], data["indptr"], data["indices"], digest)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def candidates(self, term: str) -> Optional[np.ndarray]:
+        """
+        返回可能包含 ``term`` 的文本编号。
+
+        ``term`` 中的每个词都必须是文本中某个词的子串，因此结果是各词的候选
+        文本的交集；``term`` 不含任何词（例如只有标点）时返回 None，表示需要全量确认。
+        """
+        tokens = set(_TOKEN.findall(term))
+        if not tokens:
+            return None
+        result = None
+        # 先处理长词，候选通常更少，交集可以尽早变空
+        for token in sorted(tokens, key=len, reverse=True):
+            vocab_ids = self._vocab_haystack.find(token)
+            if len(vocab_ids) == 0:
+                return np.array([], dtype=np.int64)
+            ids = np.unique(
+                np.concatenate(
+                    [
+                        self.indices[self.indptr[v] : self.indptr[v + 1]]
+                        for v in vocab_ids
+                    ]
+                )
+            )
+            result = ids if result is None else np.intersect1d(result, ids, True)
+            if len(result) <= _VERIFY_DIRECTLY:
+                break
+        return result
+
+
+class DiseaseMatcher:
+    """对一列疾病文本做多关键词子串匹配。
+
+    Args:
+        texts (pd.Series): 疾病文本列，缺失值永远不会被匹配。
+        index_paths (Sequence[str | Path], optional): 倒排词索引文件的候选位置。
+            查询时依次尝试加载，都不可用时构建索引并保存到第一个可写的位置。
+            为 None 时不使用索引，每次查询扫描全部文本。
+    """
+
+    def __init__(
+        self,
+        texts: pd.Series,
+        index_paths: Optional[Sequence[Union[str, Path]]] = None,
+    ):
+        values = texts.to_numpy(dtype=object)
+        present = pd.notna(values)
+        # 相同文本只需要匹配一次，codes 把去重后的结果映射回每一行
+        self.codes, uniques = pd.factorize(
+            pd.Series(values[present]).astype(str).map(normalize_text)
+        )
+        self.rows = np.flatnonzero(present)
+        self.uniques = np.asarray(uniques, dtype=object)
+        self.index_paths = [Path(p) for p in index_paths] if index_paths else None
+        self._index = None
+
+    @property
+    def index(self) -> Optional[TokenIndex]:
+        """倒排词索引，首次访问时加载或构建；未启用索引时为 None。"""
+        if self._index is None and self.index_paths:
+            texts = self.uniques.tolist()
+            digest = TokenIndex.digest_of(texts)
+            for path in self.index_paths:
+                self._index = TokenIndex.load(path, digest)
+                if self._index is not None:
+                    logger.debug(f"Loaded token index {path}")
+                    return self._index
+            self._index = TokenIndex.build(texts)
+            for path in self.index_paths:
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    self._index.save(path)
+                except OSError:
+                    continue
+                logger.info(f"Saved token index {path}")
+                break
+        return self._index
+
+    def _scan(self, terms: List[str]) -> List[np.ndarray]:
+        """无索引时：交替式扫描一次得到候选，再逐个关键词确认。"""
+        non_empty = sorted({t for t in terms if t}, key=len, reverse=True)
+        candidates = np.array([], dtype=np.int64)
+        if non_empty:
+            # 长关键词在前，交替式匹配时优先尝试
+            pattern = "|".join(re.escape(term) for term in non_empty)
+            hit = pd.Series(self.uniques, dtype=object).str.contains(pattern)
+            candidates = np.flatnonzero(hit.to_numpy(dtype=bool))
+        haystack = _Haystack(self.uniques[candidates].tolist())
+        return [candidates[haystack.find(term)] if term else None for term in terms]
+
+    def _lookup(self, terms: List[str]) -> List[np.ndarray]:
+        """有索引时：每个关键词取倒排表交集，再在候选上确认。"""
+        results = []
+        for term in terms:
+            candidates = self.index.candidates(term) if term else None
+            if candidates is None:
+                candidates = np.arange(len(self.uniques))
+            texts = self.uniques[candidates]
+            results.append(
+                candidates[np.array([term in text for text in texts], dtype=bool)]
+                if len(candidates)
+                else candidates
+            )
+        return results
+
+    def match(self, terms: Union[str, Iterable[str]]) -> pd.DataFrame:
+        """
+        返回每个关键词命中的行。
+
+        Args:
+            terms (str | Iterable[str]): 一个或多个关键词。
+
+        Returns:
+            pd.DataFrame: ``row``（原表中的位置）和 ``term``（原始关键词）两列，
+            按关键词顺序、再按行顺序排列；一行被多个关键词命中时出现多次。
+        """
+        raw_terms = [terms] if isinstance(terms, str) else list(terms)
+        norm_terms = _normalize_terms(raw_terms)
+        empty = pd.DataFrame({"row": np.array([], dtype=np.int64), "term": []})
+        if not norm_terms or len(self.uniques) == 0:
+            return empty
+
+        hits = self._lookup(norm_terms) if self.index_paths else self._scan(norm_terms)
+        row_parts, term_ids = [], []
+        for i, ids in enumerate(hits):
+            if ids is None:
+                # 与 str.contains("") 一致，空关键词命中所有非空行
+                rows = self.rows
+            else:
+                mask = np.zeros(len(self.uniques), dtype=bool)
+                mask[ids] = True
+                rows = self.rows[mask[self.codes]]
+            row_parts.append(rows)
+            term_ids.append(np.full(len(rows), i))
+        rows = np.concatenate(row_parts)
+        if len(rows) == 0:
+            return empty
+        terms = np.asarray(raw_terms, dtype=object)[np.concatenate(term_ids)]
+        return pd.DataFrame({"row": rows, "term": terms})
@@ -4,6 +4,7 @@ import pandas as pd
 from playwright.sync_api import sync_playwright
 
 from biorange.logger import get_logger
+from biorange.utils.lazy_loader import LazyMethod
 from biorange.utils.package_fileload import get_data_file_path
 
 logger = get_logger(__name__)
@@ -121,14 +122,15 @@ class GenecardsDiseaseScraper:
             df = self.read_local_file()
         result = pd.DataFrame()
         if df.empty:
-            return pd.DataFrame(cloumns=["disease", "gene_name", "source"])
+            return pd.DataFrame(columns=["disease", "gene_name", "source"])
         result["disease"] = [diseases] * len(df)
         result["gene_name"] = df["Gene Symbol"].values
         result["source"] = "GeneCards"
         return result
 
 
-genecards_disease_target = GenecardsDiseaseScraper().search
+# 构造时可能启动 Playwright，延迟到首次调用
+genecards_disease_target = LazyMethod(GenecardsDiseaseScraper, "search")
 
 # 使用示例
 if __name__ == "__main__":
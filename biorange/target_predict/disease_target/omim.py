@@ -1,6 +1,11 @@
 import pandas as pd
 
-from biorange.utils.package_fileload import get_data_file_path
+from biorange.target_predict.disease_target.disease_matcher import (
+    DiseaseMatcher,
+    default_index_paths,
+)
+from biorange.utils.lazy_loader import LazyMethod
+from biorange.utils.package_fileload import load_data_file
 
 
 class OmimDiseaseScraper:
@@ -8,49 +13,61 @@ class OmimDiseaseScraper:
     def __init__(
         self,
         file_path="morbidmap.txt",
+        use_index=True,
     ):
-        self.df = pd.read_table(get_data_file_path(file_path))
-
-    def search(self, diseases):
-        # 如果输入是字符串，则将其转换为包含一个元素的列表
-        if isinstance(diseases, str):
-            diseases = [diseases]
-        # 创建一个空的DataFrame来存储匹配结果
-        filtered_df = pd.DataFrame()
-
-        # 遍历输入的Phenotype列表，进行部分匹配
-        for phenotype in diseases:
-            # 使用str.contains进行部分匹配，忽略大小写
-            matches = self.df[
-                self.df["Phenotype"].str.contains(phenotype, case=False, na=False)
-            ]
-            # 将匹配结果追加到filtered_df中
-            filtered_df = pd.concat([filtered_df, matches])
-
-        # 拆分“Gene Symbols”列中的多个基因名
-        filtered_df["Gene Symbols"] = filtered_df["Gene Symbols"].str.split(",")
-
-        # 使用explode方法将每行的列表元素拆分成多行
-        exploded_df = filtered_df.explode("Gene Symbols")
+        self.df = load_data_file(file_path, sep="\t")
+        # Phenotype 列在加载时规范化一次，之后所有查询共用倒排词索引
+        self.matcher = DiseaseMatcher(
+            self.df["Phenotype"],
+            index_paths=(
+                default_index_paths(file_path, "Phenotype") if use_index else None
+            ),
+        )
+
+    def search(self, diseases, with_term=False):
+        """
+        按疾病名（不区分大小写的子串）检索 OMIM 疾病靶点。
+
+        Args:
+            diseases (str | list): 疾病名或疾病名列表。
+            with_term (bool): 是否增加 ``term`` 列，记录命中该行的检索词。
+
+        Returns:
+            pd.DataFrame: disease、gene_name、source（以及 term）列。
+        """
+        # 所有疾病名一次匹配，结果按疾病名顺序排列
+        hits = self.matcher.match(diseases)
+        filtered_df = self.df.iloc[hits["row"].to_numpy()].assign(
+            term=hits["term"].to_numpy()
+        )
+
+        # 拆分“Gene Symbols”列中的多个基因名，并展开成多行
+        exploded_df = filtered_df.assign(
+            **{"Gene Symbols": filtered_df["Gene Symbols"].str.split(",")}
+        ).explode("Gene Symbols")
 
         # 去除前后空格
         exploded_df["Gene Symbols"] = exploded_df["Gene Symbols"].str.strip()
 
         # 对“Gene Symbols”列进行去重
         exploded_df = exploded_df.drop_duplicates(subset=["Gene Symbols"])
+        columns = ["disease", "gene_name", "source"] + (["term"] if with_term else [])
         if exploded_df.empty:
             print("No matches found for the given phenotypes.")
-            return pd.DataFrame(columns=["disease", "gene_name", "source"])
+            return pd.DataFrame(columns=columns)
         # 创建一个新的表格，并在第一列增加“data_source”列，内容为“OMIM”
-        new_df = pd.DataFrame()
-        new_df["disease"] = exploded_df["Phenotype"].values
-        new_df["gene_name"] = exploded_df["Gene Symbols"].values
-        new_df["source"] = ["OMIM"] * len(exploded_df)
-
-        return new_df
+        new_df = pd.DataFrame(
+            {
+                "disease": exploded_df["Phenotype"].to_numpy(),
+                "gene_name": exploded_df["Gene Symbols"].to_numpy(),
+                "source": "OMIM",
+                "term": exploded_df["term"].to_numpy(),
+            }
+        )
+        return new_df[columns]
 
 
-omim_disease_target = OmimDiseaseScraper().search
+omim_disease_target = LazyMethod(OmimDiseaseScraper, "search")
 
 if __name__ == "__main__":
     searcher = OmimDiseaseScraper()
@@ -1,61 +1,63 @@
 import pandas as pd
-from biorange.utils.package_fileload import get_data_file_path
+from biorange.target_predict.disease_target.disease_matcher import (
+    DiseaseMatcher,
+    default_index_paths,
+)
+from biorange.utils.lazy_loader import LazyMethod
+from biorange.utils.package_fileload import load_data_file
 
 
 class TTDDiseaseScraper:
 
-    def __init__(self, file_path="TTD_combinez_data.csv"):
-        self.df = pd.read_csv(get_data_file_path(file_path))
+    def __init__(self, file_path="TTD_combinez_data.csv", use_index=True):
+        self.df = load_data_file(file_path)
+        # Disease Entry 列在加载时规范化一次，之后所有查询共用倒排词索引
+        self.matcher = DiseaseMatcher(
+            self.df["Disease Entry"],
+            index_paths=(
+                default_index_paths(file_path, "Disease Entry") if use_index else None
+            ),
+        )
 
-    def search(self, diseases):
-        # 如果输入是字符串，则将其转换为包含一个元素的列表
-        if isinstance(diseases, str):
-            diseases = [diseases]
+    def search(self, diseases, with_term=False):
+        """
+        按疾病名（不区分大小写的子串）检索 TTD 疾病靶点。
 
-        # 创建一个空的DataFrame来存储匹配结果
-        filtered_df = pd.DataFrame()
+        Args:
+            diseases (str | list): 疾病名或疾病名列表。
+            with_term (bool): 是否增加 ``term`` 列，记录命中该行的检索词。
 
-        # 遍历输入的diseases列表，进行部分匹配
-        for disease in diseases:
-            # 使用str.contains进行部分匹配，忽略大小写
-            matches = self.df[
-                self.df["Disease Entry"].str.contains(disease, case=False, na=False)
-            ]
-            # 将匹配结果追加到filtered_df中
-            filtered_df = pd.concat([filtered_df, matches])
+        Returns:
+            pd.DataFrame: disease、gene_name、source（以及 term）列。
+        """
+        columns = ["disease", "gene_name", "source"] + (["term"] if with_term else [])
+        # 所有疾病名一次匹配，结果按疾病名顺序排列
+        hits = self.matcher.match(diseases)
+        if hits.empty:
+            return pd.DataFrame(columns=columns)
 
+        rows = hits["row"].to_numpy()
         # 创建一个新的表格，并在第一列增加“data_source”列，内容为“TTD”
-        if filtered_df.empty:
-            return pd.DataFrame(columns=["disease", "gene_name", "source"])
-
-        new_df = pd.DataFrame()
-        new_df["disease"] = filtered_df["Disease Entry"].values
-        new_df["gene_name"] = filtered_df["GENENAME"].values
-        new_df["source"] = ["TTD"] * len(filtered_df)
-
-        # 将所有非字符串类型的值转换为空字符串
-        new_df["gene_name"] = new_df["gene_name"].astype(str)
+        new_df = pd.DataFrame(
+            {
+                "disease": self.df["Disease Entry"].to_numpy()[rows],
+                # 将所有非字符串类型的值转换为字符串
+                "gene_name": self.df["GENENAME"].to_numpy()[rows].astype(str),
+                "source": "TTD",
+                "term": hits["term"].to_numpy(),
+            }
+        )
 
         # 拆分“gene_name”列中包含多个基因的行
-        split_rows = []
-        for _, row in new_df.iterrows():
-            genes = row["gene_name"].split(";")
-            for gene in genes:
-                split_rows.append(
-                    {
-                        "disease": row["disease"],
-                        "gene_name": gene.strip(),
-                        "source": row["source"],
-                    }
-                )
-
-        # 创建一个新的DataFrame来存储拆分后的结果
-        split_df = pd.DataFrame(split_rows)
+        split_df = new_df.assign(gene_name=new_df["gene_name"].str.split(";")).explode(
+            "gene_name", ignore_index=True
+        )
+        split_df["gene_name"] = split_df["gene_name"].str.strip()
 
-        return split_df
+        return split_df[columns]
 
 
-ttd_disease_target = TTDDiseaseScraper().search
+ttd_disease_target = LazyMethod(TTDDiseaseScraper, "search")
 
 if __name__ == "__main__":
     searcher = TTDDiseaseScraper()
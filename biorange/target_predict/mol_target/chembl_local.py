@@ -1,37 +1,196 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
 import pandas as pd
-from biorange.utils.package_fileload import get_data_file_path
-
-
-def chembl_inchikey_target(
-    compound_input,
-    organism="Homo sapiens",
-    confidence_column="confidence80",
-    confidence_types=("active", "both"),
-    threshold=5,
-):
-
-    # 读取大表数据
-    chembl_large = get_data_file_path(
-        "chembl_25_targets_internal_data_homo_202410.csv.gz"
-    )
-    chembl_large_table = pd.read_csv(chembl_large)
-
-    # 进行inchikeys筛选
-    inchikey_list = compound_input
-    chembl_targets = chembl_large_table[
-        chembl_large_table["inchikey"].isin(inchikey_list)
-    ]
-
-    # 增加筛选条件
-    if organism is not None:
-        chembl_targets = chembl_targets[chembl_targets["organism"] == organism]
-
-    chembl_targets = chembl_targets[
-        (chembl_targets[confidence_column].isin(confidence_types))
-        & (chembl_targets["threshold"] >= threshold)
-    ]
-
-    return chembl_targets
+
+from biorange.logger import get_logger
+from biorange.utils.columnar_index import ColumnarIndex, sorted_range_positions
+from biorange.utils.lazy_loader import LazyMethod
+from biorange.utils.package_fileload import get_cache_dir, get_data_file_path
+
+logger = get_logger(__name__)
+
+CHEMBL_TABLE = "chembl_25_targets_internal_data_homo_202410.csv.gz"
+
+
+def _categorical_columns(columns: Iterable[str]) -> List[str]:
+    """取值重复度高的文本列（物种、各置信度分类）按 category 读取。"""
+    return [c for c in columns if c == "organism" or c.startswith("confidence")]
+
+
+@lru_cache(maxsize=4)
+def _load_chembl_table(file_path: str, mtime: float) -> pd.DataFrame:
+    """读取 ChEMBL 大表（每个进程、每个文件版本只读一次）。"""
+    header = pd.read_csv(file_path, nrows=0).columns
+    dtype = {c: "category" for c in _categorical_columns(header)}
+    logger.info(f"Loading ChEMBL table {file_path}")
+    return pd.read_csv(file_path, dtype=dtype)
+
+
+@lru_cache(maxsize=4)
+def _load_chembl_index(file_path: str, mtime: float):
+    """返回 (表, 排序后的行号, 排序后的 inchikey)，同样按文件版本缓存。"""
+    table = _load_chembl_table(file_path, mtime)
+    keys = table["inchikey"].to_numpy(dtype=object).astype(str)
+    order = np.argsort(keys, kind="stable")
+    return table, order, keys[order]
+
+
+class ChemblTargetScraper:
+    """基于本地 ChEMBL 靶点表的成分靶点查询。
+
+    表只在首次使用时读取一次（同一进程内的多个实例共享），并按 inchikey
+    建立排序索引，查询时直接定位匹配行。
+
+    Args:
+        file_path (str, optional): ChEMBL 表路径，默认为内置的 ``CHEMBL_TABLE``。
+        use_binary_cache (bool): 是否把表转换为列式二进制缓存并以内存映射方式
+            查询。首次使用时构建，之后的进程无需再解压 gz。
+        cache_dir (str, optional): 二进制缓存目录，默认为 ``get_cache_dir("chembl")``。
+    """
+
+    def __init__(
+        self,
+        file_path: Optional[str] = None,
+        use_binary_cache: bool = False,
+        cache_dir: Optional[str] = None,
+    ):
+        self.file_path = str(file_path or get_data_file_path(CHEMBL_TABLE))
+        self.use_binary_cache = use_binary_cache
+        self.cache_dir = cache_dir
+        self._table = None
+        self._order = None
+        self._sorted_keys = None
+        self._binary_index = None
+
+    def _build_memory_index(self):
+        self._table, self._order, self._sorted_keys = _load_chembl_index(
+            self.file_path, os.path.getmtime(self.file_path)
+        )
+
+    def _build_binary_index(self):
+        index_dir = (
+            Path(self.cache_dir) if self.cache_dir else get_cache_dir("chembl")
+        ) / f"{Path(self.file_path).name}.inchikey"
+        if not ColumnarIndex.is_fresh(index_dir, self.file_path):
+            table = _load_chembl_table(self.file_path, os.path.getmtime(self.file_path))
+            ColumnarIndex.build(
+                [table],
+                index_dir,
+                key="inchikey",
+                columns=list(table.columns),
+                source=self.file_path,
+            )
+        self._binary_index = ColumnarIndex(index_dir, mmap=True)
+
+    def lookup(self, inchikeys: Iterable[str]) -> pd.DataFrame:
+        """返回 inchikey 在 ``inchikeys`` 中的所有靶点记录（未过滤）。"""
+        inchikeys = pd.unique(pd.Series(list(inchikeys), dtype=object).dropna())
+        if self.use_binary_cache:
+            if self._binary_index is None:
+                self._build_binary_index()
+            # 与内存路径一致：原表行顺序与行号，缺失值为 NaN，category 类别不变
+            return self._binary_index.lookup(inchikeys, source_order=True)
+
+        if self._table is None:
+            self._build_memory_index()
+        query = np.sort(np.asarray(inchikeys, dtype=str))
+        positions = sorted_range_positions(self._sorted_keys, query)
+        # 还原为原表中的行顺序
+        return self._table.iloc[np.sort(self._order[positions])]
+
+    @staticmethod
+    def _filter(
+        targets: pd.DataFrame,
+        organism: Optional[str],
+        confidence_column: str,
+        confidence_types: Sequence[str],
+        threshold: float,
+    ) -> pd.DataFrame:
+        """物种、置信度和阈值条件合并成一个布尔掩码一次过滤。"""
+        mask = targets[confidence_column].isin(confidence_types).to_numpy()
+        mask &= targets["threshold"].to_numpy() >= threshold
+        if organism is not None:
+            mask &= (targets["organism"] == organism).to_numpy()
+        return targets[mask]
+
+    def search(
+        self,
+        compound_input: Union[str, Iterable[str]],
+        organism: Optional[str] = "Homo sapiens",
+        confidence_column: str = "confidence80",
+        confidence_types: Sequence[str] = ("active", "both"),
+        threshold: float = 5,
+    ) -> pd.DataFrame:
+        """
+        查询一组成分（InChIKey）的 ChEMBL 靶点。
+
+        Args:
+            compound_input (str | Iterable[str]): InChIKey 或 InChIKey 列表。
+            organism (Optional[str]): 只保留该物种的靶点，为 None 时不过滤。
+            confidence_column (str): 用于过滤的置信度列。默认为 "confidence80"。
+            confidence_types (Sequence[str]): 保留的置信度类别。
+            threshold (float): 最低阈值。默认为 5。
+
+        Returns:
+            pd.DataFrame: 过滤后的靶点记录。
+        """
+        if isinstance(compound_input, str):
+            compound_input = [compound_input]
+        elif isinstance(compound_input, pd.DataFrame):
+            compound_input = compound_input["inchikey"]
+        return self._filter(
+            self.lookup(compound_input),
+            organism,
+            confidence_column,
+            confidence_types,
+            threshold,
+        )
+
+    def search_batches(
+        self,
+        batches: Union[Dict[str, Iterable[str]], Sequence[Iterable[str]]],
+        organism: Optional[str] = "Homo sapiens",
+        confidence_column: str = "confidence80",
+        confidence_types: Sequence[str] = ("active", "both"),
+        threshold: float = 5,
+    ) -> pd.DataFrame:
+        """
+        一次查询多批成分，所有批次合并成一次索引查找。
+
+        Args:
+            batches (Dict[str, Iterable[str]] | Sequence[Iterable[str]]): 批次名 →
+                InChIKey 列表；传入列表时批次名为其序号。
+            其余参数同 ``search``。
+
+        Returns:
+            pd.DataFrame: 过滤后的靶点记录，首列 ``batch`` 标明所属批次。
+        """
+        if not isinstance(batches, dict):
+            batches = dict(enumerate(batches))
+        membership = pd.DataFrame(
+            [
+                (name, key)
+                for name, keys in batches.items()
+                for key in ([keys] if isinstance(keys, str) else keys)
+            ],
+            columns=["batch", "inchikey"],
+        ).drop_duplicates()
+
+        targets = self.search(
+            membership["inchikey"],
+            organism=organism,
+            confidence_column=confidence_column,
+            confidence_types=confidence_types,
+            threshold=threshold,
+        )
+        return membership.merge(targets, on="inchikey", how="inner")
+
+
+chembl_inchikey_target = LazyMethod(ChemblTargetScraper, "search")
 
 
 # 示例调用
@@ -0,0 +1,138 @@
+"""Ensembl 蛋白 ID（ENSP）→ 基因名的本地持久化映射表
+
+STITCH 结果里的蛋白以 ENSP 表示，以前每次检索都要把所有 ENSP（含重复）交给
+mygene 在线转换。这里维护一个本地 TSV 映射表：先用内置或用户提供的映射文件
+初始化，查询时只把缺失的 ID 分批发给远程服务，并把新结果追加回映射表。
+"""
+
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from biorange.logger import get_logger
+from biorange.utils.package_fileload import get_cache_dir, get_data_file_path
+
+logger = get_logger(__name__)
+
+# 可选的内置映射文件（两列：ENSP, gene_name），存在时自动用于初始化
+BUNDLED_MAPPING_FILE = "ensp_gene_symbol.tsv"
+NOT_FOUND = "N/A"
+
+
+class GeneSymbolCache:
+    """ENSP → 基因名映射表，未命中的 ID 才会查询远程服务。
+
+    Args:
+        cache_file (str | Path, optional): 持久化映射表路径，默认为
+            ``get_cache_dir("gene_symbol")/ensp_symbol_<species>.tsv``。
+        seed_file (str | Path, optional): 用户提供的初始映射文件（ENSP, gene_name 两列 TSV）。
+        query_func (Callable, optional): 远程查询函数，签名与
+            ``mygene.MyGeneInfo().querymany`` 相同。为 None 时首次需要时才创建 mygene 客户端；
+            离线或测试时可以传入本地替身。
+        batch_size (int): 每次远程查询的 ID 数量，默认为 1000。
+        species (str): 物种，默认为 "human"。
+    """
+
+    def __init__(
+        self,
+        cache_file: Optional[Union[str, Path]] = None,
+        seed_file: Optional[Union[str, Path]] = None,
+        query_func: Optional[Callable] = None,
+        batch_size: int = 1000,
+        species: str = "human",
+    ):
+        self.species = species
+        self.batch_size = batch_size
+        self.cache_file = Path(
+            cache_file or get_cache_dir("gene_symbol") / f"ensp_symbol_{species}.tsv"
+        )
+        self._query_func = query_func
+        self._lock = Lock()
+        self.mapping: Dict[str, str] = {}
+        self.stats = {"hits": 0, "misses": 0, "remote_queries": 0}
+
+        bundled = get_data_file_path(BUNDLED_MAPPING_FILE)
+        for path in (bundled, seed_file, self.cache_file):
+            if path is not None and os.path.exists(path):
+                self.load(path)
+
+    @property
+    def query_func(self) -> Callable:
+        if self._query_func is None:
+            import mygene  # 依赖重，只有真正需要远程查询时才导入
+
+            self._query_func = mygene.MyGeneInfo().querymany
+        return self._query_func
+
+    def load(self, path: Union[str, Path]) -> int:
+        """从 TSV 映射文件合并 ENSP → 基因名，返回读取的条目数。"""
+        # 关闭默认缺失值识别，避免 "NA"、"NAN" 之类的基因名被读成空值
+        df = pd.read_csv(
+            path, sep="\t", dtype=str, keep_default_na=False, na_values=[""]
+        ).dropna(subset=["ENSP"])
+        df["gene_name"] = df["gene_name"].fillna(NOT_FOUND)
+        self.mapping.update(zip(df["ENSP"], df["gene_name"]))
+        logger.debug(f"Loaded {len(df)} ENSP mappings from {path}")
+        return len(df)
+
+    def _append(self, new_items: Dict[str, str]):
+        """把新查询到的映射追加到持久化文件。"""
+        if not new_items:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        write_header = not self.cache_file.exists()
+        pd.DataFrame(
+            {"ENSP": list(new_items), "gene_name": list(new_items.values())}
+        ).to_csv(self.cache_file, sep="\t", index=False, mode="a", header=write_header)
+
+    def _fetch(self, ensembl_ids: List[str]) -> Dict[str, str]:
+        """分批查询远程服务；网络失败时停止查询，已获得的结果照常返回。"""
+        fetched: Dict[str, str] = {}
+        for start in range(0, len(ensembl_ids), self.batch_size):
+            batch = ensembl_ids[start : start + self.batch_size]
+            try:
+                gene_info = self.query_func(
+                    batch,
+                    scopes="ensembl.protein",
+                    fields="symbol",
+                    species=self.species,
+                )
+            except Exception as e:
+                logger.error(
+                    f"Remote gene symbol lookup failed, using cached names only: {e}"
+                )
+                break
+            self.stats["remote_queries"] += 1
+            for gene in gene_info:
+                # 同一个 ID 可能返回多条记录，保留第一条
+                if gene["query"] not in fetched:
+                    fetched[gene["query"]] = gene.get("symbol", NOT_FOUND)
+        return fetched
+
+    def lookup(self, ensembl_ids: Iterable[str]) -> Dict[str, str]:
+        """把 ENSP 转换为基因名。
+
+        Args:
+            ensembl_ids (Iterable[str]): ENSP 列表，可包含重复和缺失值。
+
+        Returns:
+            Dict[str, str]: 去重后的 ENSP → 基因名；远程服务确认不存在的记为 "N/A"，
+            因网络问题未能解析的 ID 不出现在结果中。
+        """
+        unique_ids = pd.unique(pd.Series(list(ensembl_ids), dtype=object).dropna())
+        with self._lock:
+            misses = [i for i in unique_ids if i not in self.mapping]
+            self.stats["hits"] += len(unique_ids) - len(misses)
+            self.stats["misses"] += len(misses)
+            if misses:
+                logger.info(
+                    f"{len(unique_ids) - len(misses)} ENSP IDs found in local cache, "
+                    f"querying {len(misses)} remotely"
+                )
+                fetched = self._fetch(misses)
+                self.mapping.update(fetched)
+                self._append(fetched)
+            return {i: self.mapping[i] for i in unique_ids if i in self.mapping}
@@ -1,20 +1,60 @@
 import os
 import pandas as pd
-import gzip
 import mygene  # 这些包依赖重ing
-from typing import Generator, Union, List, Dict
+from pathlib import Path
+from typing import Union, List, Dict, Optional
 import tempfile
 from biorange.logger import get_logger
-from biorange.utils.package_fileload import get_data_file_path
+from biorange.target_predict.mol_target.gene_symbol_cache import GeneSymbolCache
+from biorange.utils.columnar_index import ColumnarIndex
+from biorange.utils.lazy_loader import LazyMethod
+from biorange.utils.package_fileload import (
+    get_cache_dir,
+    get_data_file_path,
+    load_data_file,
+)
+from biorange.utils.parallel_reader import (
+    RowFilter,
+    read_gzipped_tsv_parallel,
+    read_gzipped_tsv_serial,
+)
 
 # 设置日志记录
 logger = get_logger(__name__)
 
 
+# 各 gz 表建立索引时使用的键列和需要保存的列
+INDEX_LAYOUTS = {
+    "chemical": ("inchikey", ["flat_chemical_id"]),
+    "protein": ("chemical", ["protein", "combined_score"]),
+}
+
+
 class TCMDataProcessor:
-    def __init__(self):
+    def __init__(
+        self,
+        use_index: bool = True,
+        index_dir: Optional[str] = None,
+        gene_cache: Optional[GeneSymbolCache] = None,
+        n_workers: int = 1,
+    ):
+        """
+        Args:
+            use_index (bool): 是否使用预先构建的列式索引查询 gz 大表。首次使用时
+                自动构建，构建失败时回退到逐块扫描 gz 文件。
+            index_dir (Optional[str]): 索引存放目录，默认为 ``get_cache_dir("stitch_index")``。
+            gene_cache (Optional[GeneSymbolCache]): ENSP → 基因名映射表，默认使用
+                本地持久化映射表并通过 mygene 补全缺失项。
+            n_workers (int): 扫描 gz 大表时的解析进程数，默认为 1（串行）。
+                大于 1 时由进程池并行解析和过滤，较小的文件仍然串行读取。
+        """
         self.mg = mygene.MyGeneInfo()
+        self.gene_cache = gene_cache or GeneSymbolCache(query_func=self.mg.querymany)
         self.temp_dir = tempfile.TemporaryDirectory()
+        self.use_index = use_index
+        self.index_dir = index_dir
+        self._indexes: Dict[str, Optional[ColumnarIndex]] = {}
+        self.n_workers = n_workers
 
     def _read_csv(self, file_path: str, sep: str = ",") -> pd.DataFrame:
         """读取 CSV 文件并处理可能的空文件错误。"""
@@ -32,20 +72,79 @@ class TCMDataProcessor:
             logger.error(f"Error reading {file_path}: {e}")
             return pd.DataFrame()
 
-    def _read_large_gzipped_tsv(
-        self, file_path: str, chunksize: int = 100000
-    ) -> Generator[pd.DataFrame, None, None]:
-        """读取大型 gzipped TSV 文件，并处理可能的空文件错误。"""
+    def _scan_gzipped_tsv(
+        self, file_path: str, usecols: List[str], row_filter: RowFilter
+    ) -> pd.DataFrame:
+        """单次流式扫描 gz 大表，每个分块先过滤再保留，内存占用只与结果大小有关。
+
+        串行和并行都走 ``parallel_reader``，两条路径返回的 DataFrame 完全一致
+        （没有匹配行时为带 ``usecols`` 列名的空表）。
+        """
         try:
-            with gzip.open(file_path, "rt") as f:
-                for chunk in pd.read_csv(f, sep="\t", chunksize=chunksize):
-                    yield chunk
-        except pd.errors.EmptyDataError:
-            logger.error(
-                f"No data found in {file_path}. Please check the file content."
-            )
+            if self.n_workers > 1:
+                return read_gzipped_tsv_parallel(
+                    file_path, usecols, row_filter, n_workers=self.n_workers
+                )
+            return read_gzipped_tsv_serial(file_path, usecols, row_filter)
         except Exception as e:
             logger.error(f"Error reading {file_path}: {e}")
+            return pd.DataFrame()
+
+    def _index_path(self, file_path: str, key: str) -> Path:
+        index_root = (
+            Path(self.index_dir) if self.index_dir else get_cache_dir("stitch_index")
+        )
+        return index_root / f"{Path(file_path).name}.{key}"
+
+    def build_index(self, file_path: str, layout: str) -> ColumnarIndex:
+        """为 gz 大表构建（或重建）按键排序的列式索引。
+
+        Args:
+            file_path (str): gz 文件路径。
+            layout (str): ``"chemical"``（按 inchikey）或 ``"protein"``（按 chemical）。
+
+        Returns:
+            ColumnarIndex: 构建好的索引。
+        """
+        key, columns = INDEX_LAYOUTS[layout]
+        logger.info(f"Building {key} index for {file_path}, this only happens once.")
+        chunks = pd.read_csv(
+            file_path,
+            sep="\t",
+            usecols=[key, *columns],
+            chunksize=1000000,
+            compression="gzip",
+        )
+        index = ColumnarIndex.build(
+            chunks, self._index_path(file_path, key), key, columns, source=file_path
+        )
+        self._indexes[str(file_path)] = index
+        return index
+
+    def _get_index(self, file_path: str, layout: str) -> Optional[ColumnarIndex]:
+        """返回 gz 大表对应的索引，不可用时返回 None（调用方回退到扫描 gz）。"""
+        if not self.use_index:
+            return None
+        file_path = str(file_path)
+        if file_path in self._indexes:
+            return self._indexes[file_path]
+        if not os.path.exists(file_path):
+            return None
+
+        key, _ = INDEX_LAYOUTS[layout]
+        index_path = self._index_path(file_path, key)
+        try:
+            if ColumnarIndex.is_fresh(index_path, file_path):
+                index = ColumnarIndex(index_path)
+            else:
+                index = self.build_index(file_path, layout)
+        except Exception as e:
+            logger.warning(
+                f"Index for {file_path} unavailable, scanning gz instead: {e}"
+            )
+            index = None
+        self._indexes[file_path] = index
+        return index
 
     def _merge_files(
         self, df1: pd.DataFrame, df2: pd.DataFrame, on: str, how: str = "left"
@@ -77,39 +176,56 @@ class TCMDataProcessor:
             logger.error(f"InChIKey list is empty. Skipping this merge step.")
             return pd.DataFrame()
 
-        results = [
-            pd.merge(
-                input_df,
-                chunk[["flat_chemical_id", "inchikey"]],
-                on="inchikey",
-                how="inner",
+        index = self._get_index(gzipped_file, "chemical")
+        if index is not None:
+            matched = index.lookup(
+                input_df["inchikey"], ["flat_chemical_id", "inchikey"]
             )
-            for chunk in self._read_large_gzipped_tsv(gzipped_file)
-        ]
+            return pd.merge(input_df, matched, on="inchikey", how="inner")
 
-        result_df = pd.concat(results, ignore_index=True)
-        return result_df
+        matched = self._scan_gzipped_tsv(
+            gzipped_file,
+            ["flat_chemical_id", "inchikey"],
+            RowFilter("inchikey", frozenset(input_df["inchikey"])),
+        )
+        if matched.empty:
+            return pd.DataFrame()
+        return pd.merge(input_df, matched, on="inchikey", how="inner")
 
     def _map_chemical_to_protein(
-        self, chemical_df: pd.DataFrame, protein_file: str
+        self,
+        chemical_df: pd.DataFrame,
+        protein_file: str,
+        combined_score_threshold: Optional[int] = None,
     ) -> pd.DataFrame:
-        """将化学物质 ID 映射到蛋白质，并输出中间结果。"""
+        """将化学物质 ID 映射到蛋白质，并输出中间结果。
+
+        只保留 combined_score 大于 ``combined_score_threshold`` 的记录（为 None 时不过滤）。
+        未命中的化学物质在后续步骤也会被丢弃，因此这里直接做内连接。
+        """
         if chemical_df.empty:
             logger.error(f"Chemical DataFrame is empty. Skipping this mapping step.")
             return pd.DataFrame()
 
-        results = [
-            chemical_df.merge(
-                chunk[["chemical", "protein", "combined_score"]],
-                left_on="flat_chemical_id",
-                right_on="chemical",
-                how="left",
-            )
-            for chunk in self._read_large_gzipped_tsv(protein_file)
-        ]
+        link_columns = ["chemical", "protein", "combined_score"]
+        row_filter = RowFilter(
+            "chemical",
+            frozenset(chemical_df["flat_chemical_id"]),
+            "combined_score",
+            combined_score_threshold,
+        )
 
-        result_df = pd.concat(results, ignore_index=True)
-        return result_df
+        index = self._get_index(protein_file, "protein")
+        if index is not None:
+            links = row_filter(index.lookup(row_filter.keys, link_columns))
+        else:
+            links = self._scan_gzipped_tsv(protein_file, link_columns, row_filter)
+            if links.empty:
+                return pd.DataFrame()
+
+        return chemical_df.merge(
+            links, left_on="flat_chemical_id", right_on="chemical", how="inner"
+        )
 
     def _convert_protein_to_gene_names(self, protein_df: pd.DataFrame) -> pd.DataFrame:
         """将 protein ID 转换为基因名，并包含 combined_score 列。"""
@@ -118,17 +234,13 @@ class TCMDataProcessor:
             return pd.DataFrame()
 
         protein_df["ENSP"] = protein_df["protein"].str.split(".").str[1]
-        ensembl_ids = protein_df["ENSP"].tolist()
 
-        gene_info = self.mg.querymany(
-            ensembl_ids, scopes="ensembl.protein", fields="symbol", species="human"
+        # 去重后先查本地映射表，只有缺失的 ID 才分批查询 mygene
+        symbols = self.gene_cache.lookup(protein_df["ENSP"])
+        gene_df = pd.DataFrame(
+            {"ENSP": list(symbols), "gene_name": list(symbols.values())},
+            columns=["ENSP", "gene_name"],
         )
-        results = [
-            {"ENSP": gene["query"], "gene_name": gene.get("symbol", "N/A")}
-            for gene in gene_info
-        ]
-
-        gene_df = pd.DataFrame(results)
         final_df = protein_df.merge(gene_df, on="ENSP", how="left")
         final_df["source"] = "STITCH"
         final_df = final_df[
@@ -157,9 +269,7 @@ class TCMDataProcessor:
         protein_file: str = get_data_file_path(
             "9606.protein_chemical.links.transfer.v5.0.tsv.gz"
         ),
-        internal_data_file: str = get_data_file_path(
-            "TCM_NGM_inchikey_isosmile_12184.csv"
-        ),
+        internal_data_file: str = "TCM_NGM_inchikey_isosmile_12184.csv",
         combined_score_threshold: int = 300,
     ) -> pd.DataFrame:
         """主接口：根据 InChIKey 查找对应的基因名。"""
@@ -171,7 +281,10 @@ class TCMDataProcessor:
             )
             return pd.DataFrame()
 
-        protein_df = self._map_chemical_to_protein(chemical_df, protein_file)
+        # 分数阈值在扫描时就应用，后续只需转换命中的蛋白
+        protein_df = self._map_chemical_to_protein(
+            chemical_df, protein_file, combined_score_threshold
+        )
         if protein_df.empty:
             logger.error("Failed to map chemicals to proteins. Aborting search.")
             return pd.DataFrame()
@@ -188,9 +301,7 @@ class TCMDataProcessor:
         ].drop_duplicates()  # 去除重复行
 
         # 加载内置数据
-        internal_data_df = pd.read_csv(
-            internal_data_file  # , sep="\t"
-        )  # 根据实际文件格式调整
+        internal_data_df = load_data_file(internal_data_file)
         # 合并内置数据
         merged_df = pd.merge(filtered_df, internal_data_df, on="inchikey", how="left")
         return merged_df  # filtered_df
@@ -228,8 +339,9 @@ class TCMDataProcessor:
         return final_df
 
 
-stich_inchikey_target = TCMDataProcessor().search
-stich_inchikey_rawdate = TCMDataProcessor().get_rawdata
+# 首次调用时才构建 TCMDataProcessor，导入本模块不会初始化 mygene 客户端
+stich_inchikey_target = LazyMethod(TCMDataProcessor, "search")
+stich_inchikey_rawdate = LazyMethod(TCMDataProcessor, "get_rawdata")
 
 # 使用示例
 if __name__ == "__main__":
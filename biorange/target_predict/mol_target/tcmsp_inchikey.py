@@ -1,14 +1,15 @@
 import pandas as pd
 from biorange.logger import get_logger
-from biorange.utils.package_fileload import get_data_file_path
+from biorange.utils.lazy_loader import LazyMethod
+from biorange.utils.package_fileload import load_data_file
 
 logger = get_logger(__name__)
 
 
 class TCMSPTargetScraper:
     def __init__(self, molecules_csv="TCMSP_mol.csv", targets_csv="TCMSP_tar.csv"):
-        self.molecules_df = pd.read_csv(get_data_file_path(molecules_csv))
-        self.targets_df = pd.read_csv(get_data_file_path(targets_csv))
+        self.molecules_df = load_data_file(molecules_csv)
+        self.targets_df = load_data_file(targets_csv)
         self.merged_df = self._merge_dataframes()
 
     def _merge_dataframes(self):
@@ -21,9 +22,7 @@ class TCMSPTargetScraper:
     def search_inchikeys(
         self,
         inchikeys,
-        internal_data_file: str = get_data_file_path(
-            "TCM_NGM_inchike_isosmile_12184.csv"
-        ),
+        internal_data_file: str = "TCM_NGM_inchikey_isosmile_12184.csv",
     ):
         logger.info(f"Searching for InChIKeys: {inchikeys}")
 
@@ -50,15 +49,13 @@ class TCMSPTargetScraper:
             results_df = results_df.dropna(subset=["gene_name"])
 
         # 加载内置数据
-        internal_data_df = pd.read_csv(
-            internal_data_file  # , sep="\t"
-        )  # 根据实际文件格式调整
+        internal_data_df = load_data_file(internal_data_file)
         # 合并内置数据
         merged_df = pd.merge(results_df, internal_data_df, on="inchikey", how="left")
         return merged_df
 
 
-tcmsp_inchikey_target = TCMSPTargetScraper().search_inchikeys
+tcmsp_inchikey_target = LazyMethod(TCMSPTargetScraper, "search_inchikeys")
 
 # 示例使用
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+"""原子写文件
+
+先写到目标目录下唯一命名的临时文件（``tempfile.mkstemp``），写完再
+``os.replace`` 到目标路径：读者要么看到旧文件，要么看到完整的新文件；多个
+进程同时写同一路径时各自使用不同的临时文件，不会发布写了一半的内容。
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union
+
+# 进程的 umask 只能通过先设置再恢复来读取，这期间其他线程创建的文件会拿到错误的
+# 权限；因此只在导入时读取一次
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_write(
+    path: Union[str, Path],
+    mode: str = "wb",
+    encoding: Optional[str] = None,
+    permissions: int = 0o644,
+) -> Iterator[IO]:
+    """
+    以原子替换的方式写文件，``with`` 块正常结束才替换目标文件。
+
+    Args:
+        path (str | Path): 目标路径，所在目录需已存在。
+        mode (str): 临时文件的打开模式，"wb"（默认）或 "wt"。
+        encoding (str, optional): 文本模式的编码。
+        permissions (int): 目标文件的权限（再去掉导入本模块时 umask 屏蔽的位），
+            默认为 0o644。
+            ``mkstemp`` 创建的文件只有本人可读，共享目录中的其他用户需要读权限。
+
+    Yields:
+        IO: 打开的临时文件对象。出错时删除临时文件，目标文件保持不变。
+    """
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.chmod(tmp, permissions & ~_UMASK)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
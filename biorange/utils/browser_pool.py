@@ -0,0 +1,220 @@
+"""可复用的 Playwright 浏览器池
+
+每次查询都 ``sync_playwright()`` → 启动/连接 Chromium → 新建页面 → 全部关闭，
+启动开销远大于查询本身。``BrowserPool`` 只启动一次浏览器（本地启动或连接
+``ws://`` 远程服务），预先打开 ``size`` 个独立的浏览器上下文和页面放在队列中，
+各查询借出一个页面、用完归还：
+
+- Playwright 的同步接口只能在创建它的线程中使用，这里改用异步接口，浏览器和
+  所有页面都运行在一个后台线程的事件循环里；``run`` 可以从任意线程调用，
+  多个线程同时调用时最多 ``size`` 个查询并行；
+- 查询出错的页面连同其上下文一起关闭并重建（浏览器断开时先重新启动/连接），
+  不会把异常状态的页面还回池中；重建也失败时只归还空位，下次借出时再新建；
+- 批量任务可以用 ``run_async`` 把整个协程放到池的事件循环中，在其中并发
+  调用 ``with_page``；
+- 支持 ``with`` 语句，退出时确定性地关闭页面、浏览器和后台线程；未关闭的池在
+  解释器退出时自动关闭。
+"""
+
+import asyncio
+import atexit
+import threading
+from typing import Any, Awaitable, Callable, Optional
+
+from biorange.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BrowserPool:
+    """固定大小的浏览器页面池。
+
+    Args:
+        size (int): 同时打开的页面数，即最大并行查询数，默认为 4。
+        remote_url (str, optional): 远程 Playwright 服务器的 WebSocket URL
+            （``playwright run-server``）；为 None 时在本地启动 Chromium。
+        headless (bool): 本地启动时是否无界面，默认为 True。
+        browser_factory (Callable[[], Awaitable], optional): 自定义的异步浏览器
+            构造函数（返回带 ``new_context`` 的浏览器对象），给出时不启动 Playwright。
+        **launch_kwargs: 本地启动时传给 ``chromium.launch`` 的其他参数。
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        remote_url: Optional[str] = None,
+        headless: bool = True,
+        browser_factory: Optional[Callable[[], Awaitable[Any]]] = None,
+        **launch_kwargs,
+    ):
+        if size < 1:
+            raise ValueError("size 至少为 1")
+        self.size = size
+        self.remote_url = remote_url
+        self.headless = headless
+        self.browser_factory = browser_factory
+        self.launch_kwargs = launch_kwargs
+
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._pages = None
+        self._lock = threading.Lock()
+        self.recycled = 0
+
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> "BrowserPool":
+        """启动后台事件循环、浏览器和全部页面；已启动时直接返回。"""
+        with self._lock:
+            if self.started:
+                return self
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="biorange-browser-pool", daemon=True
+            )
+            thread.start()
+            try:
+                asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+            except BaseException:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result()
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                raise
+            self._loop, self._thread = loop, thread
+            atexit.register(self.close)
+        logger.info(f"浏览器池已启动：{self.size} 个页面")
+        return self
+
+    async def _launch(self):
+        if self.browser_factory is not None:
+            return await self.browser_factory()
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+        if self.remote_url:
+            return await self._playwright.chromium.connect(self.remote_url)
+        return await self._playwright.chromium.launch(
+            headless=self.headless, **self.launch_kwargs
+        )
+
+    async def _new_page(self):
+        if self._browser is None or not self._browser.is_connected():
+            self._browser = await self._launch()
+        context = await self._browser.new_context()
+        return await context.new_page()
+
+    async def _open(self):
+        self._pages = asyncio.Queue()
+        pages = await asyncio.gather(*(self._new_page() for _ in range(self.size)))
+        for page in pages:
+            self._pages.put_nowait(page)
+
+    async def _recycle(self, page):
+        """关闭出错的页面及其上下文，换一个新页面。"""
+        self.recycled += 1
+        try:
+            await page.context.close()
+        except Exception:
+            pass
+        return await self._new_page()
+
+    async def with_page(self, func: Callable[[Any], Awaitable[Any]], retries: int = 0):
+        """
+        在池的事件循环内借出一个页面执行 ``func``（供 ``run_async`` 中的协程使用）。
+
+        页面全部借出时等待归还；参数与返回值同 ``run``。
+        """
+        page = await self._pages.get()
+        try:
+            if page is None:
+                page = await self._new_page()
+            for attempt in range(retries + 1):
+                try:
+                    return await func(page)
+                except Exception as e:
+                    logger.warning(
+                        f"页面查询失败（第 {attempt + 1} 次），重建页面：{e}"
+                    )
+                    dead, page = page, None
+                    page = await self._recycle(dead)
+                    if attempt == retries:
+                        raise
+        finally:
+            # 重建失败时 page 为 None：只归还空位，下次借出时再新建页面，
+            # 不会把上下文已关闭的页面放回池中
+            self._pages.put_nowait(page)
+
+    def run(
+        self,
+        func: Callable[[Any], Awaitable[Any]],
+        retries: int = 0,
+        timeout: Optional[float] = None,
+    ):
+        """
+        借出一个页面执行 ``func``，阻塞到完成并返回其结果。
+
+        Args:
+            func (Callable): 以页面为参数的异步函数。
+            retries (int): 失败后换新页面重试的次数，默认为 0。
+            timeout (float, optional): 等待结果的秒数，默认不限。
+
+        Returns:
+            ``func`` 的返回值；最后一次尝试的异常原样抛出。
+        """
+        return self.run_async(self.with_page(func, retries), timeout)
+
+    def run_async(self, coro: Awaitable[Any], timeout: Optional[float] = None):
+        """在池的事件循环中运行协程 ``coro``（可在其中并发调用 ``with_page``），阻塞到完成。"""
+        try:
+            self.start()
+        except BaseException:
+            coro.close()
+            raise
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    async def _shutdown(self):
+        if self._pages is not None:
+            while not self._pages.empty():
+                page = self._pages.get_nowait()
+                if page is None:
+                    continue
+                try:
+                    await page.context.close()
+                except Exception:
+                    pass
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._pages = self._browser = self._playwright = None
+
+    def close(self):
+        """关闭所有页面、浏览器和后台线程；可重复调用，关闭后再次使用会重新启动。"""
+        with self._lock:
+            if not self.started:
+                return
+            loop, thread = self._loop, self._thread
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result()
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
+                self._loop = self._thread = None
+                atexit.unregister(self.close)
+        logger.info("浏览器池已关闭")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
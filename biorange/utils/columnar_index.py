@@ -0,0 +1,267 @@
+"""按键排序的列式磁盘索引
+
+把大表转换成一个目录：每列一个 ``.npy`` 文件，所有行按键列排序，另存
+``meta.json`` 记录列信息和源文件签名。查询时对键列做二分查找，直接定位到
+匹配行，不需要再解压、解析整张原始表。文本列存为定长字节/Unicode 数组，
+因此所有列都可以用 ``mmap_mode="r"`` 内存映射打开：
+
+- 文本列的缺失值另存为 ``<列名>.missing.npy`` 布尔数组，取出时还原为 NaN；
+- category 列存为整数编码，类别列表记录在 ``meta.json`` 中；
+- ``rows.npy`` 记录每行在原始表中的行号，``lookup(source_order=True)``
+  据此按原表顺序返回。
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from biorange.logger import get_logger
+
+logger = get_logger(__name__)
+
+META_FILE = "meta.json"
+ROWS_FILE = "rows.npy"
+INDEX_VERSION = 2
+
+
+def source_signature(source: Union[str, Path]) -> Dict:
+    """返回源文件的签名（路径、大小、修改时间），用于判断索引是否过期。"""
+    stat = os.stat(source)
+    return {
+        "path": str(Path(source).resolve()),
+        "size": stat.st_size,
+        "mtime": int(stat.st_mtime),
+    }
+
+
+def sorted_range_positions(sorted_keys: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """在已排序的键数组中查找所有等于 ``query`` 中任一元素的位置。
+
+    Args:
+        sorted_keys (np.ndarray): 升序排列的键。
+        query (np.ndarray): 要查找的键（需去重，类型与 ``sorted_keys`` 一致）。
+
+    Returns:
+        np.ndarray: 升序排列的匹配位置。
+    """
+    if len(query) == 0 or len(sorted_keys) == 0:
+        return np.array([], dtype=np.int64)
+    left = np.searchsorted(sorted_keys, query, side="left")
+    right = np.searchsorted(sorted_keys, query, side="right")
+    counts = right - left
+    total = int(counts.sum())
+    if total == 0:
+        return np.array([], dtype=np.int64)
+    # 把每个 [left, right) 区间展开成连续位置，避免 Python 循环
+    starts = np.repeat(left, counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.sort(starts + offsets)
+
+
+def _to_fixed_width(values: np.ndarray) -> np.ndarray:
+    """把 object 文本列转换成可内存映射的定长数组，缺失值记为空字符串（由缺失掩码区分）。"""
+    series = pd.Series(values, dtype=object)
+    text = series.where(series.notna(), "").astype(str)
+    try:
+        return np.array(text.tolist(), dtype="S")
+    except UnicodeEncodeError:
+        return np.array(text.tolist(), dtype="U")
+
+
+class ColumnarIndex:
+    """只读的列式排序索引。
+
+    Args:
+        index_dir (str | Path): ``build`` 生成的索引目录。
+        mmap (bool): 是否以内存映射方式打开列文件，默认为 True。
+    """
+
+    def __init__(self, index_dir: Union[str, Path], mmap: bool = True):
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / META_FILE, "rt", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.key = self.meta["key"]
+        self.columns: List[str] = self.meta["columns"]
+        mmap_mode = "r" if mmap else None
+        self._arrays = {
+            col: np.load(self.index_dir / f"{col}.npy", mmap_mode=mmap_mode)
+            for col in self.columns
+        }
+        self._missing = {
+            col: np.load(self.index_dir / f"{col}.missing.npy", mmap_mode=mmap_mode)
+            for col in self.meta["missing"]
+        }
+        self._categories = self.meta["categories"]
+        self._rows = np.load(self.index_dir / ROWS_FILE, mmap_mode=mmap_mode)
+        self._keys = self._arrays[self.key]
+
+    def __len__(self):
+        return int(self.meta["rows"])
+
+    @staticmethod
+    def is_fresh(
+        index_dir: Union[str, Path], source: Optional[Union[str, Path]] = None
+    ) -> bool:
+        """索引目录是否存在、版本匹配，且（若给出 source）与源文件签名一致。"""
+        meta_path = Path(index_dir) / META_FILE
+        if not meta_path.is_file():
+            return False
+        try:
+            with open(meta_path, "rt", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get("version") != INDEX_VERSION:
+            return False
+        if source is not None:
+            return meta.get("source") == source_signature(source)
+        return True
+
+    @classmethod
+    def build(
+        cls,
+        chunks: Iterable[pd.DataFrame],
+        index_dir: Union[str, Path],
+        key: str,
+        columns: Sequence[str],
+        source: Optional[Union[str, Path]] = None,
+    ) -> "ColumnarIndex":
+        """从 DataFrame 分块流构建索引。
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): 原始表的分块，例如 ``pd.read_csv(chunksize=...)``。
+            index_dir (str | Path): 输出目录，已存在时会被整体替换。
+            key (str): 排序和查询所用的键列。
+            columns (Sequence[str]): 需要保存的列（自动包含键列）。
+            source (str | Path, optional): 源文件路径，用于记录签名。
+
+        Returns:
+            ColumnarIndex: 构建好的索引。
+        """
+        columns = [key] + [c for c in columns if c != key]
+        parts: Dict[str, List] = {c: [] for c in columns}
+        missing_parts: Dict[str, List[np.ndarray]] = {}
+        for chunk in chunks:
+            for col in columns:
+                if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                    parts[col].append(chunk[col].array)
+                    continue
+                values = chunk[col].to_numpy()
+                if values.dtype == object:
+                    missing_parts.setdefault(col, []).append(pd.isna(values))
+                    values = _to_fixed_width(values)
+                parts[col].append(values)
+
+        arrays, categories = {}, {}
+        for col, vals in parts.items():
+            if vals and isinstance(vals[0], pd.Categorical):
+                merged = union_categoricals(vals)
+                arrays[col] = merged.codes
+                categories[col] = merged.categories.tolist()
+            else:
+                arrays[col] = np.concatenate(vals) if vals else np.array([], dtype="S1")
+        for col, masks in missing_parts.items():
+            arrays[f"{col}.missing"] = np.concatenate(masks)
+        if key in categories:
+            raise ValueError(f"键列 {key} 不能是 category 类型")
+        order = np.argsort(arrays[key], kind="stable")
+
+        index_dir = Path(index_dir)
+        index_dir.parent.mkdir(parents=True, exist_ok=True)
+        # 先写到临时目录再整体替换，避免并发进程读到写了一半的索引
+        tmp_dir = Path(tempfile.mkdtemp(dir=index_dir.parent, prefix=".building-"))
+        try:
+            for col, values in arrays.items():
+                np.save(tmp_dir / f"{col}.npy", values[order])
+            np.save(tmp_dir / ROWS_FILE, order.astype(np.int64))
+            meta = {
+                "version": INDEX_VERSION,
+                "key": key,
+                "columns": columns,
+                "missing": list(missing_parts),
+                "categories": categories,
+                "rows": int(len(order)),
+                "source": source_signature(source) if source is not None else None,
+            }
+            with open(tmp_dir / META_FILE, "wt", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+            if index_dir.exists():
+                shutil.rmtree(index_dir)
+            os.replace(tmp_dir, index_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Built columnar index {index_dir} ({len(order)} rows)")
+        return cls(index_dir)
+
+    def _encode_keys(self, keys: Iterable) -> np.ndarray:
+        """把查询键转换成与键列相同的定长类型，过长或无法编码的键直接丢弃。"""
+        width = self._keys.dtype.itemsize
+        if self._keys.dtype.kind == "U":
+            width //= 4
+        elif self._keys.dtype.kind != "S":
+            return np.asarray(list(keys), dtype=self._keys.dtype)
+
+        query = (
+            pd.Series(list(keys), dtype=object).dropna().astype(str).drop_duplicates()
+        )
+        # numpy 会静默截断过长的字符串，必须提前排除，否则会误命中前缀
+        query = query[query.str.len() <= width]
+        if self._keys.dtype.kind == "S":
+            query = query[query.map(str.isascii)]
+        return np.array(query.tolist(), dtype=self._keys.dtype)
+
+    def positions(self, keys: Iterable) -> np.ndarray:
+        """返回所有匹配 ``keys`` 的行号（按键排序的行号）。"""
+        return sorted_range_positions(self._keys, self._encode_keys(keys))
+
+    def take(self, positions: np.ndarray, columns: Optional[Sequence[str]] = None):
+        """按行号取出若干列，文本列解码成 Python 字符串，缺失值和 category 类型还原。"""
+        columns = columns or self.columns
+        data = {}
+        for col in columns:
+            values = np.asarray(self._arrays[col][positions])
+            if col in self._categories:
+                values = pd.Categorical.from_codes(values, self._categories[col])
+            elif values.dtype.kind == "S":
+                values = values.astype("U").astype(object)
+            elif values.dtype.kind == "U":
+                values = values.astype(object)
+            if col in self._missing:
+                values[np.asarray(self._missing[col][positions])] = np.nan
+            data[col] = values
+        return pd.DataFrame(data, columns=list(columns))
+
+    def lookup(
+        self,
+        keys: Iterable,
+        columns: Optional[Sequence[str]] = None,
+        source_order: bool = False,
+    ) -> pd.DataFrame:
+        """返回键在 ``keys`` 中的所有行。
+
+        Args:
+            keys (Iterable): 要查询的键。
+            columns (Sequence[str], optional): 需要返回的列，默认返回全部列。
+            source_order (bool): 为 True 时按原始表中的顺序返回，索引为原始行号；
+                默认按键排序，索引从 0 开始。
+
+        Returns:
+            pd.DataFrame: 匹配的行。
+        """
+        positions = self.positions(keys)
+        if not source_order:
+            return self.take(positions, columns)
+        rows = np.asarray(self._rows[positions])
+        order = np.argsort(rows, kind="stable")
+        frame = self.take(positions[order], columns)
+        frame.index = rows[order]
+        return frame
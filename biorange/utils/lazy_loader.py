@@ -0,0 +1,66 @@
+"""延迟构建的模块级接口
+
+包内很多模块在导入时就执行 ``XXX().search`` 之类的单例构建，会读取大表、
+初始化 mygene 客户端甚至启动 Playwright。``LazyMethod`` 把这类接口包装成
+轻量代理：导入时只记录类和构造参数，第一次调用时才真正实例化。
+"""
+
+from threading import Lock
+
+
+class LazyMethod:
+    """首次调用时才实例化 ``cls`` 并绑定 ``method_name`` 的可调用代理。
+
+    Args:
+        cls (type): 需要延迟构建的类。
+        method_name (str): 要代理的实例方法名。
+        *args: 传给 ``cls`` 构造函数的位置参数。
+        **kwargs: 传给 ``cls`` 构造函数的关键字参数。
+    """
+
+    def __init__(self, cls, method_name, *args, **kwargs):
+        self._cls = cls
+        self._method_name = method_name
+        self._args = args
+        self._kwargs = kwargs
+        self._instance = None
+        self._lock = Lock()  # 多线程首次调用时只构建一次
+
+        method = getattr(cls, method_name)
+        self.__doc__ = method.__doc__
+        self.__name__ = method_name
+        self.__qualname__ = f"{cls.__name__}.{method_name}"
+        self.__module__ = cls.__module__
+        self.__wrapped__ = method
+
+    @property
+    def loaded(self):
+        """后端对象是否已经构建。"""
+        return self._instance is not None
+
+    @property
+    def instance(self):
+        """返回后端对象，必要时先构建。"""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._cls(*self._args, **self._kwargs)
+        return self._instance
+
+    def reset(self):
+        """丢弃已构建的后端对象，下次调用时重新构建。"""
+        with self._lock:
+            self._instance = None
+
+    def __call__(self, *args, **kwargs):
+        return getattr(self.instance, self._method_name)(*args, **kwargs)
+
+    def __getattr__(self, name):
+        # 转发到绑定方法上，例如 lru_cache 包装后的 cache_clear
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(getattr(self.instance, self._method_name), name)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy {self.__qualname__} ({state})>"
@@ -1,9 +1,52 @@
+import time
+from collections import OrderedDict
 from importlib import resources
+from threading import RLock
+
+import numpy as np
+import pandas as pd
 
 from biorange.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 内置数据文件的读取参数，声明 dtype 以免每次推断（与推断结果保持一致）
+DATA_FILE_SPECS = {
+    "TCM_NGM_inchikey_isosmile_12184.csv": {
+        "dtype": {"inchikey": str, "smiles": str, "Name": str},
+    },
+    "TCMSP_mol.csv": {
+        "dtype": {
+            "pubchem_cid": "float64",
+            "MOL_ID": str,
+            "molecule_ID": "int64",
+            "molecule_name": str,
+            "inchikey": str,
+            "smiles": str,
+        },
+    },
+    "TCMSP_tar.csv": {
+        "dtype": {
+            "molecule_ID": "int64",
+            "target_ID": "int64",
+            "target_name": str,
+            "drugbank_ID": str,
+            "Gene Names": str,
+        },
+    },
+    "morbidmap.txt": {
+        "sep": "\t",
+        "dtype": {
+            "Phenotype": str,
+            "Gene Symbols": str,
+            "MIM Number": "float64",
+            "Cyto Location": str,
+        },
+    },
+    "TTD_combinez_data.csv": {"dtype": str},
+    "chembl_uniport_gene25_clean.csv": {"dtype": str},
+}
+
 
 def get_data_file_path(filename):
     """
@@ -23,9 +66,30 @@ def get_data_file_path(filename):
 
 
 import os
+from pathlib import Path
 from shutil import copyfile
 
 
+def get_cache_dir(*parts):
+    """
+    获取 biorange 的本地缓存目录（索引、映射表等派生文件）。
+
+    默认位于 ``~/.cache/biorange``，可通过环境变量 ``BIORANGE_CACHE_DIR`` 修改。
+
+    Args:
+        *parts (str): 缓存目录下的子目录名。
+
+    Returns:
+        pathlib.Path: 已创建好的缓存目录路径。
+    """
+    root = os.getenv("BIORANGE_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "biorange"
+    )
+    path = Path(root, *parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
 def copy_config_if_not_exists(target_dir=".", filename="config.yaml"):
     """
     如果目标目录不存在指定文件，则从包内复制该文件。
@@ -40,3 +104,185 @@ def copy_config_if_not_exists(target_dir=".", filename="config.yaml"):
         with resources.path("biorange.data", filename) as path:
             copyfile(path, target_file)
             logger.info(f"{filename} 配置成功")
+
+
+def resolve_data_file(name):
+    """
+    解析数据文件路径：已存在的文件和带目录的路径原样使用，其余不带目录的文件名
+    视为包内数据文件。
+
+    Args:
+        name (str | pathlib.Path): 文件名或路径。
+
+    Returns:
+        pathlib.Path: 数据文件路径。
+    """
+    if os.path.dirname(str(name)) or os.path.exists(name):
+        return Path(name)
+    return get_data_file_path(name)
+
+
+def _freeze(df):
+    """把 DataFrame 的底层 numpy 数组设为只读，防止共享的数据被原地修改。"""
+    try:
+        arrays = df._mgr.arrays  # pandas 内部接口，不可用时退化为不冻结
+    except AttributeError:
+        return df
+    for values in arrays:
+        if isinstance(values, np.ndarray):
+            values.flags.writeable = False
+    return df
+
+
+class DataRegistry:
+    """
+    内置数据表的进程级共享缓存。
+
+    每个文件在一个进程内只读取一次，之后返回共享数据的浅拷贝：调用方可以
+    增删列，但底层数组是只读的，原地修改单元格会抛出 ValueError。需要就地修改
+    （或统计 ``memory_usage(deep=True)``）时先 ``.copy()``。
+
+    Args:
+        max_bytes (int, optional): 缓存总内存上限（字节），超出时按最近最少使用淘汰。
+            为 None 时不限制。
+    """
+
+    def __init__(self, max_bytes=None):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._sizes = {}
+        self._file_stats = {}
+        self._lock = RLock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "load_time": 0.0}
+
+    def _read(self, path, read_kwargs):
+        kwargs = dict(DATA_FILE_SPECS.get(Path(path).name, {}))
+        kwargs.update(read_kwargs)
+        return pd.read_csv(path, **kwargs)
+
+    @staticmethod
+    def _extra_kwargs(path, read_kwargs):
+        """去掉与 ``DATA_FILE_SPECS`` 相同的参数，避免同一文件因重复声明而缓存两份。"""
+        spec = DATA_FILE_SPECS.get(Path(path).name, {})
+        return {k: v for k, v in read_kwargs.items() if k not in spec or spec[k] != v}
+
+    def get(self, name, **read_kwargs):
+        """
+        返回数据文件对应的只读共享 DataFrame。
+
+        Args:
+            name (str | pathlib.Path): 包内数据文件名，或任意数据文件路径。
+            **read_kwargs: 额外传给 ``pd.read_csv`` 的参数，会覆盖 ``DATA_FILE_SPECS``。
+
+        Returns:
+            pd.DataFrame: 共享数据的浅拷贝。
+        """
+        path = resolve_data_file(name)
+        read_kwargs = self._extra_kwargs(path, read_kwargs)
+        key = str(path)
+        if read_kwargs:
+            key = f"{key}|{sorted(read_kwargs.items())!r}"
+
+        with self._lock:
+            file_stats = self._file_stats.setdefault(
+                key, {"hits": 0, "misses": 0, "load_time": 0.0}
+            )
+            if key in self._frames:
+                self._frames.move_to_end(key)
+                self.stats["hits"] += 1
+                file_stats["hits"] += 1
+                return self._frames[key].copy(deep=False)
+
+            start = time.perf_counter()
+            df = self._read(path, read_kwargs)
+            # 冻结前统计内存，pandas 统计 object 列时需要可写缓冲区
+            size = int(df.memory_usage(deep=True).sum())
+            _freeze(df)
+            elapsed = time.perf_counter() - start
+            self.stats["misses"] += 1
+            self.stats["load_time"] += elapsed
+            file_stats["misses"] += 1
+            file_stats["load_time"] += elapsed
+            logger.debug(f"Loaded {path} in {elapsed:.3f}s")
+
+            self._frames[key] = df
+            self._sizes[key] = size
+            self._enforce_budget(keep=key)
+            return df.copy(deep=False)
+
+    def _enforce_budget(self, keep=None):
+        if self.max_bytes is None:
+            return
+        while sum(self._sizes.values()) > self.max_bytes and len(self._frames) > 1:
+            oldest = next(iter(self._frames))
+            if oldest == keep:
+                break
+            self._drop(oldest)
+            self.stats["evictions"] += 1
+
+    def _drop(self, key):
+        self._frames.pop(key, None)
+        self._sizes.pop(key, None)
+
+    def evict(self, name=None):
+        """
+        从缓存中移除数据。
+
+        Args:
+            name (str, optional): 要移除的文件名或路径，为 None 时清空全部缓存。
+        """
+        with self._lock:
+            if name is None:
+                self._frames.clear()
+                self._sizes.clear()
+                return
+            prefix = str(resolve_data_file(name))
+            for key in [k for k in self._frames if k.split("|")[0] == prefix]:
+                self._drop(key)
+
+    def set_max_bytes(self, max_bytes):
+        """修改缓存内存上限并立即按新上限淘汰。"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._enforce_budget()
+
+    def info(self):
+        """返回每个文件的命中/未命中次数、累计读取耗时和当前占用内存。"""
+        with self._lock:
+            rows = [
+                {
+                    "file": key,
+                    "cached": key in self._frames,
+                    "bytes": self._sizes.get(key, 0),
+                    **stats,
+                }
+                for key, stats in self._file_stats.items()
+            ]
+        return pd.DataFrame(
+            rows,
+            columns=["file", "cached", "bytes", "hits", "misses", "load_time"],
+        )
+
+
+# 进程级默认缓存，可通过环境变量 BIORANGE_DATA_CACHE_BYTES 设置内存上限
+data_registry = DataRegistry(
+    max_bytes=(
+        int(os.environ["BIORANGE_DATA_CACHE_BYTES"])
+        if os.getenv("BIORANGE_DATA_CACHE_BYTES")
+        else None
+    )
+)
+
+
+def load_data_file(name, **read_kwargs):
+    """
+    从默认缓存读取数据文件，见 ``DataRegistry.get``。
+
+    Args:
+        name (str | pathlib.Path): 包内数据文件名，或任意数据文件路径。
+        **read_kwargs: 额外传给 ``pd.read_csv`` 的参数。
+
+    Returns:
+        pd.DataFrame: 只读共享数据的浅拷贝。
+    """
+    return data_registry.get(name, **read_kwargs)
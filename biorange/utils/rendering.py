@@ -0,0 +1,172 @@
+"""无界面、批量友好的绘图输出
+
+原来的绘图函数每次都调用 ``plt.show()``（在无显示环境中阻塞或报警告），
+同时以最高 900 dpi 写 PNG 和 PDF，并且从不关闭图形，批量绘制几百张图时
+内存持续增长。这里统一处理：
+
+- ``headless()`` 切换到 Agg 后端，之后 ``show`` 默认为 False；环境变量
+  ``BIORANGE_HEADLESS=1`` 在首次绘图时自动开启；
+- ``new_figure(name)`` 按名字复用同一个图形（清空后调整尺寸），无界面模式下
+  同一类图始终只占一个图形对象；
+- ``finish_figure`` 按 ``formats`` 和 ``dpi`` 写出文件；需要显示时调用
+  ``plt.show()``，否则清空（复用的图形）或关闭图形；
+- ``render_many`` 在进程池中批量调用绘图函数，每个子进程都是无界面模式。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import matplotlib
+
+from biorange.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_FORMATS = ("png", "pdf")
+
+_state = {"headless": None}
+
+
+def headless(enabled: bool = True):
+    """
+    开启或关闭无界面模式。
+
+    开启时切换到 Agg 后端，绘图函数不再调用 ``plt.show()``，图形用完即清空复用。
+    """
+    import matplotlib.pyplot as plt
+
+    _state["headless"] = enabled
+    if enabled and matplotlib.get_backend().lower() != "agg":
+        plt.switch_backend("Agg")
+
+
+def is_headless() -> bool:
+    if _state["headless"] is None:
+        flag = os.environ.get("BIORANGE_HEADLESS", "").strip().lower()
+        if flag in ("1", "true", "yes"):
+            headless(True)
+        else:
+            _state["headless"] = False
+    return _state["headless"]
+
+
+def _should_show(show: Optional[bool]) -> bool:
+    """``show`` 为 None 时：无界面模式或非交互后端不显示。"""
+    if show is not None:
+        return show
+    if is_headless():
+        return False
+    backend = matplotlib.get_backend().lower()
+    return backend not in ("agg", "pdf", "ps", "svg", "cairo", "template")
+
+
+def new_figure(name: str, figsize: Tuple[float, float], dpi: Optional[float] = None):
+    """
+    取得名为 ``name`` 的图形并设为当前图形。
+
+    无界面模式下复用已有的同名图形（清空内容、重设尺寸），否则新建。
+    """
+    import matplotlib.pyplot as plt
+
+    if is_headless():
+        fig = plt.figure(num=f"biorange:{name}", clear=True)
+        fig.set_size_inches(figsize, forward=False)
+        fig.set_dpi(dpi or plt.rcParams["figure.dpi"])
+        return fig
+    return plt.figure(figsize=figsize, dpi=dpi)
+
+
+def finish_figure(
+    fig,
+    output_dir: str,
+    name: str,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    dpi: Optional[float] = None,
+    show: Optional[bool] = None,
+    **savefig_kwargs,
+) -> List[str]:
+    """
+    保存并收尾一个图形。
+
+    Args:
+        fig: matplotlib 图形。
+        output_dir (str): 输出目录，不存在时创建。
+        name (str): 文件名（不含扩展名）。
+        formats (Sequence[str]): 输出格式，默认为 ("png", "pdf")；为空时不保存。
+        dpi (float, optional): 保存分辨率，默认使用图形自身的 dpi。
+        show (bool, optional): 是否显示，默认在交互后端且非无界面模式时显示。
+        **savefig_kwargs: 传给 ``savefig`` 的其他参数。
+
+    Returns:
+        List[str]: 按 ``formats`` 顺序的文件路径。
+    """
+    import matplotlib.pyplot as plt
+
+    paths = []
+    if formats:
+        os.makedirs(output_dir, exist_ok=True)
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{name}.{fmt}")
+        fig.savefig(path, format=fmt, dpi=dpi or "figure", **savefig_kwargs)
+        paths.append(path)
+    if _should_show(show):
+        plt.show()
+    elif is_headless() and str(fig.get_label()).startswith("biorange:"):
+        # 复用的图形只清空内容，下次同名绘图直接使用
+        fig.clear()
+    else:
+        plt.close(fig)
+    return paths
+
+
+def save_ggplot(
+    plot,
+    output_dir: str,
+    name: str,
+    formats: Sequence[str] = DEFAULT_FORMATS,
+    dpi: Optional[float] = None,
+    show: Optional[bool] = None,
+) -> List[str]:
+    """保存 plotnine 图（如 ``barplot_go`` 的返回值），保存后关闭其图形。"""
+    fig = plot.draw()
+    return finish_figure(fig, output_dir, name, formats, dpi, show)
+
+
+def _init_worker():
+    headless(True)
+
+
+def _render(job: Tuple[Callable, Dict[str, Any]]):
+    func, kwargs = job
+    return func(**kwargs)
+
+
+def render_many(
+    func: Callable,
+    jobs: Iterable[Dict[str, Any]],
+    n_workers: int = 1,
+) -> List[Any]:
+    """
+    批量绘图。
+
+    Args:
+        func (Callable): 模块级的绘图函数（多进程时需要可以序列化）。
+        jobs (Iterable[Dict]): 每张图的关键字参数。
+        n_workers (int): 进程数，默认为 1（在当前进程中串行绘制，不显示、用完即清空）。
+
+    Returns:
+        List: 各次调用的返回值，顺序与 ``jobs`` 一致。
+    """
+    jobs = [(func, dict(kwargs, show=False)) for kwargs in jobs]
+    if n_workers <= 1 or len(jobs) <= 1:
+        # 当前进程只打开复用和关闭图形的行为，不切换后端
+        previous = is_headless()
+        _state["headless"] = True
+        try:
+            return [_render(job) for job in jobs]
+        finally:
+            _state["headless"] = previous
+    logger.info(f"Rendering {len(jobs)} figures with {n_workers} processes")
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker) as pool:
+        return list(pool.map(_render, jobs, chunksize=max(1, len(jobs) // n_workers)))
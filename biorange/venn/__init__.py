@@ -1 +1,2 @@
 from .venn_plot import vennplot, VennPlotter
+from .set_engine import SetIntersection
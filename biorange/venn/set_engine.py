@@ -0,0 +1,219 @@
+"""N 个集合的交集统计（UpSet 风格）
+
+所有元素先用 ``pd.factorize`` 编号，每个元素的归属编码成一个 uint64 位掩码
+（第 i 位表示属于第 i 个集合），之后的统计都在整数数组上完成：
+
+- 独占计数（恰好属于这些集合的元素数）：对掩码做一次 ``np.bincount``；
+- 包含计数（至少属于这些集合的元素数）：对独占计数做超集和变换，
+  n 个集合只需 n 次向量化的加法，得到全部 2^n 个区域；
+- 集合数超过 ``DENSE_MAX_SETS`` 时 2^n 的稠密数组过大，改为只统计实际出现的
+  区域，包含计数按块比较掩码得到，开销与不同归属模式数的平方成正比。
+
+``counts()`` 返回每个区域一行的长表（各集合的布尔列、区域名、集合数、两种计数），
+``membership_matrix()`` 返回元素 × 集合的布尔矩阵，可直接用于 UpSet 图
+（如 ``upsetplot.from_indicators``）。
+"""
+
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MAX_SETS = 64
+DENSE_MAX_SETS = 20
+
+
+def _popcount(masks: np.ndarray) -> np.ndarray:
+    """每个掩码中置位的个数。"""
+    masks = np.asarray(masks, dtype=np.uint64)
+    bytes_ = masks.view(np.uint8).reshape(len(masks), 8)
+    return np.unpackbits(bytes_, axis=1).sum(axis=1).astype(np.int64)
+
+
+class SetIntersection:
+    """多个集合的交集统计。
+
+    Args:
+        groups (Sequence[Iterable]): 各集合的元素，重复元素和缺失值被忽略。
+        labels (Sequence[str]): 集合名称，与 ``groups`` 等长。
+    """
+
+    def __init__(self, groups: Sequence[Iterable], labels: Sequence[str]):
+        if len(groups) != len(labels):
+            raise ValueError("groups 与 labels 的长度不一致")
+        if not 1 <= len(groups) <= MAX_SETS:
+            raise ValueError(f"集合数需要在 1 到 {MAX_SETS} 之间")
+        self.labels = [str(label) for label in labels]
+        groups = [np.asarray(list(group), dtype=object) for group in groups]
+        codes, self.elements = pd.factorize(np.concatenate(groups))
+        self.elements = np.asarray(self.elements, dtype=object)
+        self.masks = np.zeros(len(self.elements), dtype=np.uint64)
+        start = 0
+        for bit, group in enumerate(groups):
+            group_codes = codes[start : start + len(group)]
+            start += len(group)
+            self.masks[group_codes[group_codes >= 0]] |= np.uint64(1) << np.uint64(bit)
+
+    @property
+    def n_sets(self) -> int:
+        return len(self.labels)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def _dense_counts(self):
+        """全部 2^n 个区域的独占计数和包含计数。"""
+        exclusive = np.bincount(
+            self.masks.astype(np.int64), minlength=1 << self.n_sets
+        ).astype(np.int64)
+        inclusive = exclusive.copy()
+        for bit in range(self.n_sets):
+            # 下标按第 bit 位拆开：不含该位的区域加上对应的含该位的区域
+            view = inclusive.reshape(-1, 2, 1 << bit)
+            view[:, 0, :] += view[:, 1, :]
+        return np.arange(1 << self.n_sets, dtype=np.uint64), exclusive, inclusive
+
+    def _sparse_counts(self, block_size: int = 1024):
+        """只统计出现过的区域；包含计数按块与所有区域比较得到。"""
+        regions, exclusive = np.unique(self.masks, return_counts=True)
+        inclusive = np.empty(len(regions), dtype=np.int64)
+        for start in range(0, len(regions), block_size):
+            block = regions[start : start + block_size]
+            covers = (regions[None, :] & block[:, None]) == block[:, None]
+            inclusive[start : start + block_size] = covers.astype(np.int64) @ exclusive
+        return regions, exclusive.astype(np.int64), inclusive
+
+    def region_name(self, mask: int) -> str:
+        """区域名：所含集合的名称以 "&" 连接。"""
+        return "&".join(
+            label for bit, label in enumerate(self.labels) if int(mask) >> bit & 1
+        )
+
+    def region_names(self, regions: np.ndarray) -> np.ndarray:
+        """批量生成区域名：每 8 个集合一张 256 项的名称表，逐段查表后拼接。"""
+        regions = np.asarray(regions, dtype=np.uint64)
+        names = np.full(len(regions), "", dtype=object)
+        for start in range(0, self.n_sets, 8):
+            table = np.array(
+                [self.region_name(value << start) for value in range(256)], dtype=object
+            )
+            part = table[
+                ((regions >> np.uint64(start)) & np.uint64(255)).astype(np.intp)
+            ]
+            both = (names != "") & (part != "")
+            names = np.where(both, names + "&" + part, names + part)
+        return names
+
+    def _region_frame(self, regions: np.ndarray) -> pd.DataFrame:
+        bits = (regions[:, None] >> np.arange(self.n_sets, dtype=np.uint64)) & 1
+        frame = pd.DataFrame(bits.astype(bool), columns=self.labels)
+        frame["region"] = self.region_names(regions)
+        frame["degree"] = _popcount(regions)
+        return frame
+
+    def _regions(self, include_empty: bool = False):
+        """非空区域的掩码、独占计数和包含计数，按集合数、掩码排序。"""
+        if self.n_sets <= DENSE_MAX_SETS:
+            regions, exclusive, inclusive = self._dense_counts()
+            keep = np.ones(len(regions), dtype=bool) if include_empty else inclusive > 0
+            keep[0] = False
+        else:
+            regions, exclusive, inclusive = self._sparse_counts()
+            keep = regions != 0
+        regions, exclusive, inclusive = regions[keep], exclusive[keep], inclusive[keep]
+        order = np.lexsort((regions, _popcount(regions)))
+        return regions[order], exclusive[order], inclusive[order]
+
+    def counts(self, include_empty: bool = False) -> pd.DataFrame:
+        """
+        各区域的元素数。
+
+        Args:
+            include_empty (bool): 是否保留包含计数为 0 的区域，默认为 False。
+                集合数不超过 ``DENSE_MAX_SETS`` 时可以得到全部 2^n - 1 个区域，
+                更多集合时只返回实际出现的区域。
+
+        Returns:
+            pd.DataFrame: 每个区域一行，列为各集合名（布尔）、``region``（集合名以
+            "&" 连接）、``degree``（集合数）、``exclusive``（恰好属于这些集合的
+            元素数）、``inclusive``（至少属于这些集合的元素数）；按 ``degree``、
+            区域掩码排序。
+        """
+        regions, exclusive, inclusive = self._regions(include_empty)
+        frame = self._region_frame(regions)
+        frame["exclusive"] = exclusive
+        frame["inclusive"] = inclusive
+        return frame
+
+    def membership_matrix(self) -> pd.DataFrame:
+        """元素 × 集合的布尔矩阵，索引为元素（按首次出现的顺序）。"""
+        bits = (self.masks[:, None] >> np.arange(self.n_sets, dtype=np.uint64)) & 1
+        return pd.DataFrame(
+            bits.astype(bool),
+            index=pd.Index(self.elements, name="element"),
+            columns=self.labels,
+        )
+
+    def _mask_of(self, labels: Iterable[str]) -> np.uint64:
+        mask = 0
+        for label in labels:
+            mask |= 1 << self.labels.index(label)
+        return np.uint64(mask)
+
+    def elements_in(self, labels: Iterable[str], exclusive: bool = False) -> List:
+        """属于 ``labels`` 中所有集合的元素；``exclusive`` 为 True 时不属于其他集合。"""
+        mask = self._mask_of(labels)
+        hit = self.masks == mask if exclusive else (self.masks & mask) == mask
+        return self.elements[hit].tolist()
+
+    def members(
+        self,
+        exclusive: bool = False,
+        min_degree: int = 1,
+        max_regions: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        元素与区域的长表。
+
+        Args:
+            exclusive (bool): 为 True 时每个元素只出现在它恰好所属的区域中（行数与
+                元素数相同）；为 False 时出现在它所属集合的每个组合中。
+            min_degree (int): 只输出至少由这么多集合构成的区域，默认为 1。
+            max_regions (int, optional): 包含模式下最多输出的区域数（按
+                ``counts()`` 的顺序），默认不限制。
+
+        Returns:
+            pd.DataFrame: ``region``、``degree``、``element`` 三列。
+        """
+        if exclusive:
+            regions, inverse = np.unique(self.masks, return_inverse=True)
+            names = self.region_names(regions)
+            degree = _popcount(regions)
+            keep = degree[inverse] >= min_degree
+            # 与 counts() 相同的区域顺序，区域内保持元素的首次出现顺序
+            rank = np.empty(len(regions), dtype=np.int64)
+            rank[np.lexsort((regions, degree))] = np.arange(len(regions))
+            order = np.flatnonzero(keep)[np.argsort(rank[inverse[keep]], kind="stable")]
+            return pd.DataFrame(
+                {
+                    "region": names[inverse[order]],
+                    "degree": degree[inverse[order]],
+                    "element": self.elements[order],
+                }
+            )
+
+        regions, _, _ = self._regions()
+        regions = regions[_popcount(regions) >= min_degree][:max_regions]
+        parts = [
+            pd.DataFrame(
+                {
+                    "region": self.region_name(mask),
+                    "degree": _popcount(np.array([mask]))[0],
+                    "element": self.elements[(self.masks & mask) == mask],
+                }
+            )
+            for mask in regions
+        ]
+        if not parts:
+            return pd.DataFrame(columns=["region", "degree", "element"])
+        return pd.concat(parts, ignore_index=True)
@@ -1,8 +1,12 @@
 import os
+import re
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib_venn import venn2, venn2_circles, venn3, venn3_circles
+from biorange.venn.set_engine import SetIntersection
 from biorange.venn.venn_config import VennPlotConfig
+from biorange.utils.lazy_loader import LazyMethod
+from biorange.utils.rendering import finish_figure, new_figure
 
 
 class VennPlotter:
@@ -10,9 +14,29 @@ class VennPlotter:
         self.config = config or VennPlotConfig()
         plt.rcParams["font.family"] = [self.config.font_family]
 
-    def plot_venn(self, groups, labels, title, filename=None, **kwargs):
+    def plot_venn(
+        self, groups, labels, title, filename=None, formats=None, show=None, **kwargs
+    ):
+        """
+        绘制 2 或 3 组的韦恩图。
+
+        ``filename`` 的扩展名决定输出格式（没有扩展名时为 png），也可以用
+        ``formats`` 同时输出多种格式（没有 ``filename`` 时以 ``title`` 命名）；
+        ``show`` 见 ``finish_figure``。
+        """
+        name, ext = os.path.splitext(filename or "")
+        if formats is None:
+            formats = (ext.lstrip(".") or "png",) if filename else ()
+        if formats and not name:
+            # 只给 formats 时用标题作为文件名
+            name = re.sub(r"[^\w\-]+", "_", str(title or "")).strip("_")
+            if not name:
+                raise ValueError("保存韦恩图需要 filename 或非空的 title")
+        output_dir = os.path.join("results", "venn")
+
         self.config.update(**kwargs)  # Update config with any additional kwargs
-        fig, ax = plt.subplots(figsize=self.config.figsize, dpi=self.config.dpi)
+        fig = new_figure("venn", self.config.figsize, self.config.dpi)
+        ax = fig.add_subplot()
 
         if len(groups) == 2:
             vee = venn2(
@@ -66,39 +90,33 @@ class VennPlotter:
             style=self.config.title_style,
         )
 
-        if filename:
-            output_dir = os.path.join("results", "venn")
-            os.makedirs(output_dir, exist_ok=True)
-            filepath = os.path.join(output_dir, f"venn-{filename}")
+        paths = finish_figure(fig, output_dir, f"venn-{name}", formats, show=show)
+        for filepath in paths:
             print(f"Saving plot to {filepath}")
-            plt.savefig(filepath)
+        if filename:
             self.intersection(groups, labels, filename)
         self.intersection(groups, labels)
-        plt.show()
-
-    def intersection(self, groups, labels, filename=None):
-        sets = [set(group) for group in groups]
-        intersections = {}
-
-        if len(sets) == 2:
-            intersections[f"{labels[0]}&{labels[1]}"] = sets[0] & sets[1]
-        elif len(sets) == 3:
-            intersections[f"{labels[0]}&{labels[1]}"] = sets[0] & sets[1]
-            intersections[f"{labels[0]}&{labels[2]}"] = sets[0] & sets[2]
-            intersections[f"{labels[1]}&{labels[2]}"] = sets[1] & sets[2]
-            intersections[f"{labels[0]}&{labels[1]}&{labels[2]}"] = (
-                sets[0] & sets[1] & sets[2]
-            )
 
-        # 将交集转换为 pandas DataFrame，交集名称作为列名
-        df = pd.DataFrame(
-            dict(
-                [(key, pd.Series(list(value))) for key, value in intersections.items()]
-            )
-        )
+    def intersection(self, groups, labels, filename=None, exclusive=False):
+        """
+        统计任意多组之间的交集，返回元素与交集的长表。
+
+        Args:
+            groups: 各组元素。
+            labels: 各组名称。
+            filename (str, optional): 给定时把结果写入 ``results/venn/venn-data-<名称>.csv``，
+                否则打印。
+            exclusive (bool): 为 False（默认）时列出每个至少两组的组合共有的元素；
+                为 True 时每个元素只列在它恰好所属的组合中。
+
+        Returns:
+            pd.DataFrame: ``region``（组名以 "&" 连接）、``degree``、``element`` 三列。
+        """
+        df = SetIntersection(groups, labels).members(exclusive=exclusive, min_degree=2)
 
         if filename:
             output_dir = os.path.join("results", "venn")
+            os.makedirs(output_dir, exist_ok=True)
             filepath = os.path.join(
                 output_dir, f"venn-data-{os.path.splitext(filename)[0]}.csv"
             )
@@ -106,9 +124,11 @@ class VennPlotter:
             print(f"Intersection data saved to {filepath}")
         else:
             print(df)
+        return df
 
 
-vennplot = VennPlotter().plot_venn
+# VennPlotter 构造时会修改全局 rcParams，延迟到首次绘图
+vennplot = LazyMethod(VennPlotter, "plot_venn")
 
 # Usage Example
 if __name__ == "__main__":
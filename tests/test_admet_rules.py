@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from biorange.target_predict.data_processing.admet_rules import (
+    ADMETRuleEngine,
+    AllOf,
+    AnyOf,
+    Rule,
+    compile_rules,
+)
+from biorange.target_predict.data_processing.ingredient_input import ADMETFilter
+
+ADMET = pd.DataFrame(
+    {
+        "inchikey": [f"KEY{i}" for i in range(8)],
+        "smiles": ["C", "CC", "CCC", "CCCC", "CO", "CCO", "CCCO", "CN"],
+        "Name": [f"compound{i}" for i in range(8)],
+        "Lipinski": [4, 4, 3, 4, 4, 2, 4, 4],
+        "QED": [0.9, 0.4, 0.8, np.nan, 0.6, 0.7, 0.55, 0.51],
+        "Bioavailability_Ma": [0.5, 0.9, 0.9, 0.8, 0.1, 0.6, 0.35, np.nan],
+        "logP": [1.0, 6.0, 2.0, 5.5, -1.0, 3.0, 4.9, 0.0],
+        "class": ["a", "b", "a", None, "a", "b", "c", "a"],
+    }
+)
+
+
+def test_compile_nesting():
+    compiled = compile_rules(
+        ["QED > 0.5", {"any": ["logP < 2", {"all": ["Lipinski == 4", "class == 'c'"]}]}]
+    )
+    assert compiled == AllOf(
+        (
+            Rule("QED", ">", 0.5),
+            AnyOf(
+                (
+                    Rule("logP", "<", 2.0),
+                    AllOf((Rule("Lipinski", "==", 4.0), Rule("class", "==", "c"))),
+                )
+            ),
+        )
+    )
+    assert [str(leaf) for leaf in compiled.leaves()] == [
+        "QED > 0.5",
+        "logP < 2",
+        "Lipinski == 4",
+        "class == 'c'",
+    ]
+    # 单条规则的组不再包一层
+    assert compile_rules({"any": ["QED > 0.5"]}) == Rule("QED", ">", 0.5)
+
+    engine = ADMETRuleEngine(ADMET)
+    mask = engine.evaluate(compiled).mask
+    expected = (ADMET["QED"] > 0.5) & (
+        (ADMET["logP"] < 2) | ((ADMET["Lipinski"] == 4) & (ADMET["class"] == "c"))
+    )
+    assert mask.tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize(
+    "spec",
+    ["QED ~ 0.5", "QED", {"none": ["QED > 0.5"]}, {"all": []}, []],
+)
+def test_invalid_rules(spec):
+    with pytest.raises(ValueError):
+        compile_rules(spec)
+
+
+def test_unknown_operator_and_column():
+    with pytest.raises(ValueError):
+        Rule("QED", "=>", 0.5)
+    with pytest.raises(ValueError, match="没有列"):
+        ADMETRuleEngine(ADMET).evaluate("TPSA < 140")
+
+
+def test_missing_values_fail_every_comparison():
+    engine = ADMETRuleEngine(ADMET)
+    assert not engine.evaluate("QED != 0.5").mask[3]
+    assert not engine.evaluate("class != 'a'").mask[3]
+    # 查不到的键（行号 -1）同样不满足任何规则
+    positions = engine.positions(["KEY0", "UNKNOWN", "KEY3", None])
+    assert positions.tolist() == [0, -1, 3, -1]
+    result = engine.evaluate(["QED >= 0", "class != 'x'"], positions)
+    assert result.mask.tolist() == [True, False, False, False]
+
+
+def test_per_rule_counts():
+    result = ADMETRuleEngine(ADMET).evaluate(
+        {"any": ["QED > 0.5", "Bioavailability_Ma > 0.8", "QED > 0.5"]}
+    )
+    assert result.counts.to_dict() == {
+        "QED > 0.5": 6,
+        "Bioavailability_Ma > 0.8": 2,
+        "all": 7,
+    }
+    assert result.counts.name == "passed"
+
+
+def _legacy_filter(data, admet, lipinski, qed, bioavailability):
+    """改写前 ``process_dataframe`` 的过滤：先整表合并，再按阈值过滤。"""
+    merged = pd.merge(data, admet, on="inchikey", how="left")
+    return merged[
+        (merged["Lipinski"] == lipinski)
+        & (merged["QED"] > qed)
+        & (merged["Bioavailability_Ma"] > bioavailability)
+    ]
+
+
+@pytest.mark.parametrize("thresholds", [(4, 0.5, 0.3), (4, 0.55, 0.0), (3, 0.1, 0.5)])
+def test_filter_matches_legacy(tmp_path, thresholds):
+    path = tmp_path / "admet.csv"
+    ADMET.drop(columns="class").to_csv(path, index=False)
+    data = pd.DataFrame(
+        {"inchikey": ["KEY6", "KEY0", "UNKNOWN", "KEY2", "KEY0", "KEY7", "KEY4"]}
+    )
+    admet_filter = ADMETFilter(*thresholds, admet_file=str(path))
+    result = admet_filter.process_dataframe(data)
+
+    expected = _legacy_filter(data, pd.read_csv(path), *thresholds)
+    # 旧实现合并时查不到的键产生 NaN，整数列被升为 float，取值相同
+    pd.testing.assert_frame_equal(
+        result.reset_index(drop=True),
+        expected[result.columns].reset_index(drop=True),
+        check_dtype=False,
+    )
+    assert admet_filter.rule_counts["all"] == len(expected)
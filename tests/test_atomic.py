@@ -0,0 +1,46 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from biorange.utils.atomic import atomic_write
+
+
+def test_replaces_target_with_readable_file(tmp_path):
+    path = tmp_path / "library.gmt"
+    path.write_text("old")
+    with atomic_write(path, "wt", encoding="utf-8") as f:
+        f.write("new")
+        # 写入过程中目标文件仍是旧内容
+        assert path.read_text() == "old"
+    assert path.read_text() == "new"
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert path.stat().st_mode & 0o777 == 0o644 & ~umask
+    assert os.listdir(tmp_path) == ["library.gmt"]
+
+
+def test_failed_write_keeps_target_and_removes_temp_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write(b"partial")
+            raise RuntimeError("boom")
+    assert path.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["data.bin"]
+
+
+def test_concurrent_writers_publish_whole_files(tmp_path):
+    path = tmp_path / "shared.txt"
+    contents = [str(i) * 100000 for i in range(8)]
+
+    def write(text):
+        with atomic_write(path, "wt", encoding="utf-8") as f:
+            for start in range(0, len(text), 1000):
+                f.write(text[start : start + 1000])
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(write, contents))
+    assert path.read_text() in contents
+    assert os.listdir(tmp_path) == ["shared.txt"]
@@ -0,0 +1,171 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from biorange.component.tcmsp_component import TCMSPComponentLocalScraper
+from biorange.utils.browser_pool import BrowserPool
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = None
+
+    async def goto(self, url):
+        self.url = url
+
+    async def fill(self, selector, value):
+        self.term = value
+
+    async def click(self, selector):
+        pass
+
+    async def wait_for_selector(self, selector):
+        await asyncio.sleep(0.01)
+
+    async def get_attribute(self, selector, name):
+        return f"molecule.php?qn={self.term}"
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self):
+        self.contexts.append(FakeContext(self))
+        return self.contexts[-1]
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def browsers():
+    launched = []
+
+    async def factory():
+        launched.append(FakeBrowser())
+        return launched[-1]
+
+    return launched, factory
+
+
+def test_pages_are_reused_and_bounded(browsers):
+    launched, factory = browsers
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    async def job(page):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return id(page)
+
+    with BrowserPool(3, browser_factory=factory) as pool:
+        with ThreadPoolExecutor(8) as executor:
+            pages = list(executor.map(lambda _: pool.run(job), range(24)))
+    assert len(launched) == 1 and len(launched[0].contexts) == 3
+    assert len(set(pages)) == 3
+    assert peak[0] == 3
+    assert launched[0].closed and all(c.closed for c in launched[0].contexts)
+    assert not pool.started
+
+
+def test_failed_page_is_recycled(browsers):
+    launched, factory = browsers
+    failures = []
+
+    async def flaky(page):
+        if not failures:
+            failures.append(page)
+            raise RuntimeError("page crashed")
+        return page
+
+    with BrowserPool(1, browser_factory=factory) as pool:
+        page = pool.run(flaky, retries=1)
+        assert page is not failures[0] and failures[0].context.closed
+        assert pool.recycled == 1
+
+        async def broken(page):
+            raise RuntimeError("still broken")
+
+        with pytest.raises(RuntimeError, match="still broken"):
+            pool.run(broken)
+        # 出错的页面已被替换，池中仍有一个可用页面
+        assert pool.run(lambda page: asyncio.sleep(0, page)) is not page
+
+        # 浏览器断开后重新启动
+        launched[0].closed = True
+        with pytest.raises(RuntimeError):
+            pool.run(broken)
+        assert len(launched) == 2
+
+
+def test_scraper_uses_pool(browsers):
+    _, factory = browsers
+    with TCMSPComponentLocalScraper(pool_size=2) as scraper:
+        scraper.pool.browser_factory = factory
+        with ThreadPoolExecutor(4) as executor:
+            urls = list(executor.map(scraper.get_search_result_url, ["大枣", "人参"]))
+        assert urls == [
+            "https://old.tcmsp-e.com/molecule.php?qn=大枣",
+            "https://old.tcmsp-e.com/molecule.php?qn=人参",
+        ]
+        assert scraper.pool.started
+    assert not scraper.pool.started
+
+
+def test_failed_recycle_releases_slot(browsers):
+    launched, factory = browsers
+    pages = []
+
+    async def record(page):
+        pages.append(page)
+        return page.context.closed
+
+    async def broken(page):
+        pages.append(page)
+        # 浏览器此后无法新建上下文，页面重建失败
+        page.context.browser.new_context = failing_context
+        raise RuntimeError("page crashed")
+
+    async def failing_context():
+        raise ConnectionError("relaunch failed")
+
+    with BrowserPool(size=1, browser_factory=factory) as pool:
+        with pytest.raises(ConnectionError):
+            pool.run(broken, retries=1)
+        assert pages[0].context.closed
+        assert pool.recycled == 1
+
+        # 新建页面再次失败时同样只归还空位
+        with pytest.raises(ConnectionError):
+            pool.run(record)
+        del launched[0].new_context
+
+        assert pool.run(record) is False
+        assert pages[-1] is not pages[0]
+        assert pool.run(record) is False
+        assert pages[-1] is pages[-2]
+    assert launched[0].closed
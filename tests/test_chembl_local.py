@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from biorange.target_predict.mol_target.chembl_local import ChemblTargetScraper
+
+
+@pytest.fixture
+def chembl_file(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 400
+    keys = np.array([f"KEY{i:02d}-UHFFFAOYSA-N" for i in range(40)])
+    frame = pd.DataFrame(
+        {
+            "inchikey": rng.choice(keys, n),
+            "targetChemblId": [f"CHEMBL{i}" for i in rng.integers(0, 80, n)],
+            "pref_name": rng.choice(["EGFR kinase", "Tumor necrosis factor", None], n),
+            "organism": rng.choice(["Homo sapiens", "Mus musculus", None], n),
+            "confidence80": rng.choice(["active", "both", "inactive", None], n),
+            "threshold": rng.choice([5, 6, 7, np.nan], n),
+        }
+    )
+    path = tmp_path / "chembl.csv.gz"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def test_binary_cache_returns_same_frames(tmp_path, chembl_file):
+    memory = ChemblTargetScraper(chembl_file)
+    binary = ChemblTargetScraper(
+        chembl_file, use_binary_cache=True, cache_dir=str(tmp_path / "cache")
+    )
+    query = [
+        "KEY07-UHFFFAOYSA-N",
+        "KEY01-UHFFFAOYSA-N",
+        "MISSING",
+        "KEY33-UHFFFAOYSA-N",
+    ]
+
+    rows = memory.lookup(query)
+    assert rows["pref_name"].isna().any()
+    assert list(rows.index) == sorted(rows.index)
+    assert_frame_equal(binary.lookup(query), rows)
+    assert_frame_equal(binary.search(query), memory.search(query))
+    assert_frame_equal(
+        binary.search(query, organism=None, confidence_types=("inactive",)),
+        memory.search(query, organism=None, confidence_types=("inactive",)),
+    )
+    assert_frame_equal(
+        binary.search_batches({"a": query[:2], "b": query[1:]}),
+        memory.search_batches({"a": query[:2], "b": query[1:]}),
+    )
+
+    # 重新打开已构建的缓存结果不变
+    reopened = ChemblTargetScraper(
+        chembl_file, use_binary_cache=True, cache_dir=str(tmp_path / "cache")
+    )
+    assert_frame_equal(reopened.lookup(query), rows)
+    assert binary.lookup(["MISSING"]).empty
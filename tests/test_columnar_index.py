@@ -0,0 +1,128 @@
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from biorange.target_predict.mol_target.gene_symbol_cache import GeneSymbolCache
+from biorange.target_predict.mol_target.stitch_inchikey import TCMDataProcessor
+from biorange.utils.columnar_index import ColumnarIndex
+
+CHEMICALS = pd.DataFrame(
+    {
+        "flat_chemical_id": ["CIDm1", "CIDm2", "CIDm3", "CIDm4", "CIDm5", "CIDm6"],
+        "inchikey": ["KEY-C", "KEY-A", "KEY-B", "KEY-A", "KEY-D", "KEY-C"],
+    }
+)
+LINKS = pd.DataFrame(
+    {
+        "chemical": ["CIDm3", "CIDm1", "CIDm2", "CIDm1", "CIDm4", "CIDm9"],
+        "protein": [f"9606.ENSP{i}" for i in range(6)],
+        "combined_score": [900, 250, 500, 700, 301, 999],
+    }
+)
+
+
+def _write_gz(frame, path):
+    with gzip.open(path, "wt") as f:
+        frame.to_csv(f, sep="\t", index=False)
+    return str(path)
+
+
+def test_build_lookup_round_trip(tmp_path):
+    index = ColumnarIndex.build(
+        [CHEMICALS.iloc[:3], CHEMICALS.iloc[3:]],
+        tmp_path / "idx",
+        key="inchikey",
+        columns=["flat_chemical_id"],
+    )
+    assert len(index) == 6 and index.columns == ["inchikey", "flat_chemical_id"]
+
+    # 重复键全部返回，同一键内保持原表顺序；缺失的键、缺失值和超长的键被忽略
+    result = index.lookup(["KEY-C", "KEY-A", "NOPE", None, "KEY-A-TOO-LONG"])
+    assert list(zip(result["inchikey"], result["flat_chemical_id"])) == [
+        ("KEY-A", "CIDm2"),
+        ("KEY-A", "CIDm4"),
+        ("KEY-C", "CIDm1"),
+        ("KEY-C", "CIDm6"),
+    ]
+    assert index.lookup(["NOPE"]).empty
+    assert list(index.lookup([]).columns) == ["inchikey", "flat_chemical_id"]
+
+    reopened = ColumnarIndex(tmp_path / "idx", mmap=False)
+    assert_frame_equal(reopened.lookup(["KEY-B"]), index.lookup(["KEY-B"]))
+
+
+def test_missing_values_categories_and_source_order(tmp_path):
+    frame = CHEMICALS.assign(
+        name=["a", None, "c", np.nan, "é", "f"],
+        kind=pd.Categorical(["x", "y", None, "x", "z", "y"]),
+    )
+    index = ColumnarIndex.build(
+        [frame.iloc[:2], frame.iloc[2:]],
+        tmp_path / "idx",
+        key="inchikey",
+        columns=["flat_chemical_id", "name", "kind"],
+    )
+    result = index.lookup(["KEY-C", "KEY-A", "KEY-D"], source_order=True)
+    expected = frame.iloc[[0, 1, 3, 4, 5]][index.columns]
+    assert_frame_equal(result, expected, check_index_type=False)
+    assert result["kind"].cat.categories.tolist() == ["x", "y", "z"]
+
+
+def test_is_fresh_tracks_source(tmp_path):
+    source = _write_gz(CHEMICALS, tmp_path / "chemicals.tsv.gz")
+    index_dir = tmp_path / "idx"
+    assert not ColumnarIndex.is_fresh(index_dir, source)
+    ColumnarIndex.build(
+        [CHEMICALS], index_dir, "inchikey", ["flat_chemical_id"], source=source
+    )
+    assert ColumnarIndex.is_fresh(index_dir, source)
+
+    _write_gz(pd.concat([CHEMICALS, CHEMICALS]), source)
+    stat = os.stat(source)
+    os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+    assert not ColumnarIndex.is_fresh(index_dir, source)
+
+    (index_dir / "meta.json").write_text("{broken")
+    assert not ColumnarIndex.is_fresh(index_dir)
+
+
+@pytest.fixture
+def processors(tmp_path):
+    def make(use_index):
+        cache = GeneSymbolCache(
+            cache_file=tmp_path / "symbols.tsv", query_func=lambda *a, **k: []
+        )
+        return TCMDataProcessor(
+            use_index=use_index, index_dir=str(tmp_path / "index"), gene_cache=cache
+        )
+
+    return make(True), make(False)
+
+
+def test_index_matches_gz_scan(tmp_path, processors):
+    chemical_file = _write_gz(CHEMICALS, tmp_path / "chemicals.tsv.gz")
+    protein_file = _write_gz(LINKS, tmp_path / "links.tsv.gz")
+    indexed, scanned = processors
+    query = ["KEY-C", "KEY-A", "KEY-Z"]
+
+    chem_index = indexed._merge_with_large_chemical_data(query, chemical_file)
+    chem_scan = scanned._merge_with_large_chemical_data(query, chemical_file)
+    assert indexed._indexes[chemical_file] is not None
+    assert_frame_equal(chem_index, chem_scan)
+    assert list(chem_index["flat_chemical_id"]) == ["CIDm1", "CIDm6", "CIDm2", "CIDm4"]
+
+    for threshold in (None, 300):
+        links_index = indexed._map_chemical_to_protein(
+            chem_index, protein_file, threshold
+        )
+        links_scan = scanned._map_chemical_to_protein(
+            chem_scan, protein_file, threshold
+        )
+        assert_frame_equal(
+            links_index.reset_index(drop=True), links_scan.reset_index(drop=True)
+        )
+    assert np.all(links_index["combined_score"] > 300)
@@ -0,0 +1,192 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from biorange.target_predict.disease_target.disease_matcher import DiseaseMatcher
+from biorange.target_predict.disease_target.omim import OmimDiseaseScraper
+from biorange.target_predict.disease_target.ttd import TTDDiseaseScraper
+
+TEXTS = pd.Series(
+    [
+        "Osteoarthritis, susceptibility to",
+        None,
+        "Type 2  DIABETES mellitus",
+        "osteoarthritis of hip",
+        "Alzheimer disease (late onset)",
+        "Diabetes mellitus, type 2",
+        "Lupus [SLE] + nephritis",
+    ]
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("BIORANGE_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def _legacy(texts, terms):
+    """逐个关键词按字面 ``str.contains`` 后拼接的参考结果。"""
+    parts = [
+        pd.DataFrame(
+            {
+                "row": np.flatnonzero(
+                    texts.str.contains(term, case=False, regex=False, na=False)
+                ),
+                "term": term,
+            }
+        )
+        for term in terms
+    ]
+    return pd.concat(parts, ignore_index=True)
+
+
+def test_match_orders_by_term_then_row():
+    hits = DiseaseMatcher(TEXTS).match(["diabetes", "OSTEOARTHRITIS", "missing"])
+    assert hits["row"].tolist() == [2, 5, 0, 3]
+    assert hits["term"].tolist() == ["diabetes", "diabetes"] + ["OSTEOARTHRITIS"] * 2
+
+    # 同一行被多个关键词命中时出现多次；空白按原样匹配
+    terms = ["type 2 diabetes", "TYPE 2  diabetes", "mellitus", "type 2"]
+    hits = DiseaseMatcher(TEXTS).match(terms)
+    assert list(zip(hits["term"], hits["row"])) == [
+        ("TYPE 2  diabetes", 2),
+        ("mellitus", 2),
+        ("mellitus", 5),
+        ("type 2", 2),
+        ("type 2", 5),
+    ]
+    pd.testing.assert_frame_equal(hits, _legacy(TEXTS, terms))
+
+
+def test_regex_metacharacters_match_literally():
+    matcher = DiseaseMatcher(TEXTS)
+    terms = ["(late onset)", "[sle] +", ".*", "disease (", "s?"]
+    hits = matcher.match(terms)
+    assert hits["row"].tolist() == [4, 6, 4]
+    assert hits["term"].tolist() == ["(late onset)", "[sle] +", "disease ("]
+    pd.testing.assert_frame_equal(hits, _legacy(TEXTS, terms))
+    assert matcher.match([]).empty and matcher.match("xyz").empty
+
+
+@pytest.fixture
+def omim_file(tmp_path):
+    path = tmp_path / "morbidmap.txt"
+    pd.DataFrame(
+        {
+            "Phenotype": [
+                "Osteoarthritis, hip",
+                "Diabetes (type 2)",
+                "Osteoarthritis of knee",
+                "Gout",
+            ],
+            "Gene Symbols": ["COL2A1, GDF5", "TCF7L2", "GDF5, ASPN", "SLC2A9"],
+            "MIM Number": [1.0, 2.0, 3.0, 4.0],
+            "Cyto Location": ["1p", "2q", "3p", "4q"],
+        }
+    ).to_csv(path, sep="\t", index=False)
+    return str(path)
+
+
+def test_omim_search_order_and_with_term(omim_file):
+    scraper = OmimDiseaseScraper(omim_file)
+    result = scraper.search(["diabetes (type", "osteoarthritis"], with_term=True)
+    assert result.columns.tolist() == ["disease", "gene_name", "source", "term"]
+    # 按关键词、再按行排列，重复的基因只保留第一次出现
+    assert result["gene_name"].tolist() == ["TCF7L2", "COL2A1", "GDF5", "ASPN"]
+    assert result["term"].tolist() == ["diabetes (type"] + ["osteoarthritis"] * 3
+    assert (result["source"] == "OMIM").all()
+
+    plain = scraper.search("osteoarthritis")
+    assert plain.columns.tolist() == ["disease", "gene_name", "source"]
+    assert scraper.search("nothing").columns.tolist() == plain.columns.tolist()
+
+
+def test_ttd_search_explodes_genes(tmp_path):
+    path = tmp_path / "ttd.csv"
+    pd.DataFrame(
+        {
+            "Disease Entry": ["Asthma", "Severe asthma", "Gout", "Asthma"],
+            "GENENAME": ["IL5; IL13", "TSLP", "XDH", np.nan],
+        }
+    ).to_csv(path, index=False)
+    result = TTDDiseaseScraper(str(path)).search(["gout", "asthma"], with_term=True)
+
+    # 参考实现：逐行拆分“;”分隔的基因名
+    expected = []
+    for term in ["gout", "asthma"]:
+        for disease, genes in [
+            ("Asthma", "IL5; IL13"),
+            ("Severe asthma", "TSLP"),
+            ("Gout", "XDH"),
+            ("Asthma", "nan"),
+        ]:
+            if term in disease.lower():
+                for gene in genes.split(";"):
+                    expected.append((disease, gene.strip(), "TTD", term))
+    assert list(result.itertuples(index=False, name=None)) == expected
+    assert result.index.tolist() == list(range(len(expected)))
+    assert TTDDiseaseScraper(str(path)).search("none").columns.tolist() == [
+        "disease",
+        "gene_name",
+        "source",
+    ]
+
+
+INDEX_TEXTS = pd.Series(
+    [
+        "Alzheimer disease 4",
+        "Breast-ovarian cancer, familial, 1",
+        "Cancer susceptibility (BRCA1-related)",
+        None,
+        "Diabetes mellitus, type II",
+        "alzheimer's disease, late-onset",
+        "Spinocerebellar ataxia 3",
+        "ataxia-telangiectasia",
+        "Leukemia, acute myeloid",
+        "",
+    ]
+    * 3
+)
+INDEX_TERMS = [
+    "alzheimer disease",
+    "alzheimer's",
+    "ovarian cancer, familial",
+    "(brca1-",
+    "late-onset",
+    ", type ii",
+    "cerebellar",
+    "taxi",
+    "myeloid leuk",
+    "ataxia",
+    "-",
+    "   ",
+    "",
+    "not present",
+]
+
+
+def test_index_matches_scan(tmp_path):
+    index_path = tmp_path / "texts.tokens.npz"
+    scan = DiseaseMatcher(INDEX_TEXTS).match(INDEX_TERMS)
+    pd.testing.assert_frame_equal(scan, _legacy(INDEX_TEXTS, INDEX_TERMS))
+    built = DiseaseMatcher(INDEX_TEXTS, index_paths=[index_path])
+    pd.testing.assert_frame_equal(built.match(INDEX_TERMS), scan)
+
+    # 第二个实例直接加载已保存的索引
+    assert index_path.is_file()
+    loaded = DiseaseMatcher(INDEX_TEXTS, index_paths=[index_path])
+    pd.testing.assert_frame_equal(loaded.match(INDEX_TERMS), scan)
+    for term in INDEX_TERMS:
+        pd.testing.assert_frame_equal(
+            loaded.match(term), DiseaseMatcher(INDEX_TEXTS).match(term)
+        )
+
+
+def test_saved_index_is_readable_by_others(tmp_path):
+    index_path = tmp_path / "texts.tokens.npz"
+    DiseaseMatcher(INDEX_TEXTS, index_paths=[index_path]).match("ataxia")
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert index_path.stat().st_mode & 0o777 == 0o644 & ~umask
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+from biorange.enrich_analysis.enrich_gokegg import perform_enrichment_analysis
+from biorange.enrich_analysis.local_enrich import write_gmt
+from biorange.enrich_analysis.result_cache import EnrichmentCache
+
+GENES = [f"G{i}" for i in range(40)]
+
+
+def _write_library(gmt_dir, shift):
+    write_gmt(
+        {f"pathway {i}": GENES[i + shift : i + shift + 8] for i in range(0, 30, 3)},
+        gmt_dir / "KEGG_toy.gmt",
+    )
+
+
+def _analyse(gmt_dir, **kwargs):
+    return perform_enrichment_analysis(
+        GENES[:10],
+        analysis_type="kegg",
+        kegg_database="KEGG_toy",
+        p_value_cutoff=1.1,
+        backend="local",
+        gmt_dir=str(gmt_dir),
+        **kwargs,
+    )
+
+
+def test_local_cache_tracks_library_files(tmp_path):
+    _write_library(tmp_path, 0)
+    cache = EnrichmentCache(tmp_path / "cache", ttl=None)
+    # numpy 整数的背景基因数与 int 等价
+    first = _analyse(tmp_path, background=np.int64(20000), cache=cache)
+    second = _analyse(tmp_path, background=20000, cache=cache)
+    assert not first.attrs["cache_hit"] and second.attrs["cache_hit"]
+    assert second["Term"].tolist() == first["Term"].tolist()
+
+    # 更新基因集库后缓存失效
+    _write_library(tmp_path, 5)
+    path = tmp_path / "KEGG_toy.gmt"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    refreshed = _analyse(tmp_path, background=20000, cache=cache)
+    assert not refreshed.attrs["cache_hit"]
+    assert refreshed["Overlap"].tolist() != first["Overlap"].tolist()
+
+
+def test_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("BIORANGE_CACHE_DIR", str(tmp_path / "cache"))
+    _write_library(tmp_path, 0)
+    assert not _analyse(tmp_path).attrs["cache_hit"]
+    assert not _analyse(tmp_path).attrs["cache_hit"]
+    assert not (tmp_path / "cache" / "enrichment").exists()
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from biorange.enrich_analysis.enrichr_client import EXPORT_COLUMNS, EnrichrClient
+
+EXPORT_DELAY = 0.3
+TSV_HEADER = (
+    "Term\tOverlap\tP-value\tAdjusted P-value\tOdds Ratio\tCombined Score\tGenes"
+)
+
+
+class _StubEnrichr(BaseHTTPRequestHandler):
+    failures = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self._reply(200, json.dumps({"userListId": 42, "shortId": "x"}).encode())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        library = parse_qs(url.query)["backgroundType"][0]
+        if self.failures.get(library, 0) > 0:
+            self.failures[library] -= 1
+            self._reply(503, b"busy")
+            return
+        if library == "EMPTY":
+            self._reply(200, b"", "text/plain")
+            return
+        time.sleep(EXPORT_DELAY)
+        body = f"{TSV_HEADER}\n{library}_term\t1/5\t0.01\t0.02\t3.0\t9.0\tSTAT3\n"
+        self._reply(200, body.encode(), "text/plain")
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubEnrichr)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/Enrichr"
+    server.shutdown()
+    _StubEnrichr.failures.clear()
+
+
+def test_libraries_are_fetched_concurrently(stub_url):
+    libraries = ["GO_BP", "GO_MF", "GO_CC", "KEGG"]
+    client = EnrichrClient(base_url=stub_url, max_workers=4)
+    start = time.perf_counter()
+    results = client.enrich(["STAT3", "IL6"], libraries)
+    elapsed = time.perf_counter() - start
+    assert list(results) == libraries
+    assert elapsed < EXPORT_DELAY * len(libraries) / 2
+    result = results["KEGG"]
+    assert list(result.columns[:2]) == ["Gene_set", "Term"]
+    assert result.loc[0, "Term"] == "KEGG_term"
+
+
+def test_retries_with_backoff(stub_url):
+    _StubEnrichr.failures["KEGG"] = 2
+    client = EnrichrClient(base_url=stub_url, retries=2, backoff=0.01)
+    assert len(client.enrich(["STAT3"], ["KEGG"])["KEGG"]) == 1
+
+    _StubEnrichr.failures["KEGG"] = 3
+    with pytest.raises(requests.HTTPError, match="503"):
+        client.enrich(["STAT3"], ["KEGG"])
+
+
+def test_empty_export_returns_empty_frame(stub_url):
+    client = EnrichrClient(base_url=stub_url)
+    result = client.enrich(["STAT3"], ["EMPTY", "KEGG"])
+    assert result["EMPTY"].empty
+    assert list(result["EMPTY"].columns) == ["Gene_set"] + EXPORT_COLUMNS
+    assert len(result["KEGG"]) == 1
@@ -0,0 +1,99 @@
+import pandas as pd
+import pytest
+
+from biorange.target_predict.mol_target.gene_symbol_cache import GeneSymbolCache
+
+
+class FakeMyGene:
+    """记录每次调用的 ``querymany`` 替身。"""
+
+    def __init__(self, symbols, fail_after=None):
+        self.symbols = symbols
+        self.calls = []
+        self.fail_after = fail_after
+
+    def __call__(self, ids, scopes, fields, species):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise ConnectionError("offline")
+        self.calls.append(list(ids))
+        result = []
+        for i in ids:
+            if i in self.symbols:
+                # 同一个 ID 返回多条记录时只保留第一条
+                result += [{"query": i, "symbol": self.symbols[i]}]
+                result += [{"query": i, "symbol": "DUPLICATE"}]
+            else:
+                result.append({"query": i, "notfound": True})
+        return result
+
+
+@pytest.fixture
+def seed_file(tmp_path):
+    path = tmp_path / "seed.tsv"
+    pd.DataFrame({"ENSP": ["ENSP1", "ENSP2"], "gene_name": ["TP53", "NA"]}).to_csv(
+        path, sep="\t", index=False
+    )
+    return path
+
+
+def test_only_unique_misses_are_queried_in_batches(tmp_path, seed_file):
+    remote = FakeMyGene({f"ENSP{i}": f"G{i}" for i in range(3, 10)})
+    cache = GeneSymbolCache(
+        cache_file=tmp_path / "cache.tsv",
+        seed_file=seed_file,
+        query_func=remote,
+        batch_size=3,
+    )
+    ids = ["ENSP1", "ENSP3", "ENSP3", None, "ENSP2"] + [
+        f"ENSP{i}" for i in range(4, 11)
+    ]
+    result = cache.lookup(ids)
+
+    # 种子文件里的 ID 不查询，重复 ID 只查询一次，按 batch_size 分批
+    assert remote.calls == [
+        ["ENSP3", "ENSP4", "ENSP5"],
+        ["ENSP6", "ENSP7", "ENSP8"],
+        ["ENSP9", "ENSP10"],
+    ]
+    assert result["ENSP1"] == "TP53" and result["ENSP2"] == "NA"
+    assert result["ENSP3"] == "G3" and result["ENSP10"] == "N/A"
+    assert list(result) == ["ENSP1", "ENSP3", "ENSP2"] + [
+        f"ENSP{i}" for i in range(4, 11)
+    ]
+    assert cache.stats == {"hits": 2, "misses": 8, "remote_queries": 3}
+
+    assert cache.lookup(["ENSP3", "ENSP10"]) == {"ENSP3": "G3", "ENSP10": "N/A"}
+    assert len(remote.calls) == 3
+
+
+def test_new_results_are_persisted(tmp_path):
+    cache_file = tmp_path / "cache.tsv"
+    first = GeneSymbolCache(
+        cache_file=cache_file, query_func=FakeMyGene({"ENSP1": "A"})
+    )
+    first.lookup(["ENSP1", "ENSP2"])
+    first.lookup(["ENSP3"])
+    saved = pd.read_csv(cache_file, sep="\t")
+    assert list(saved["ENSP"]) == ["ENSP1", "ENSP2", "ENSP3"]
+
+    remote = FakeMyGene({})
+    second = GeneSymbolCache(cache_file=cache_file, query_func=remote)
+    assert second.lookup(["ENSP1", "ENSP2", "ENSP3"]) == {
+        "ENSP1": "A",
+        "ENSP2": "N/A",
+        "ENSP3": "N/A",
+    }
+    assert remote.calls == []
+
+
+def test_remote_failure_keeps_partial_results(tmp_path):
+    remote = FakeMyGene({"ENSP1": "A", "ENSP3": "C"}, fail_after=1)
+    cache = GeneSymbolCache(
+        cache_file=tmp_path / "cache.tsv", query_func=remote, batch_size=2
+    )
+    # 第二批失败：第一批的结果照常返回并保存，失败的 ID 不出现在结果中
+    assert cache.lookup(["ENSP1", "ENSP2", "ENSP3"]) == {"ENSP1": "A", "ENSP2": "N/A"}
+    assert list(pd.read_csv(tmp_path / "cache.tsv", sep="\t")["ENSP"]) == [
+        "ENSP1",
+        "ENSP2",
+    ]
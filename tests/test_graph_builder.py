@@ -0,0 +1,39 @@
+import networkx as nx
+import pandas as pd
+
+from biorange.ppi.graph_builder import NetworkGraph
+
+
+def test_matches_row_by_row_networkx():
+    edges = pd.DataFrame(
+        {
+            "node1": ["C1", "T1", "C1", "T2", "T1", "T3", "T2", None],
+            "node2": ["T1", "C1", "T2", "P1", "P1", "T3", "T1", "T9"],
+        }
+    )
+    reference = nx.Graph()
+    for a, b in edges.dropna().itertuples(index=False):
+        reference.add_edge(a, b)
+
+    graph = NetworkGraph.from_frame(edges)
+    assert list(graph.names) == list(reference.nodes)
+    assert graph.n_edges == reference.number_of_edges()
+    assert graph.degree_dict() == dict(reference.degree())
+    assert graph.to_networkx() is graph.to_networkx()
+    assert graph.top_nodes(2) == ["T1", "T2"]
+    assert list(graph.degree_frame()["node"][:3]) == ["T1", "T2", "C1"]
+
+
+def test_nodes_by_type():
+    graph = NetworkGraph(["C1", "C2", "T1"], ["T1", "T2", "P1"])
+    types = pd.DataFrame(
+        {
+            "node": ["T1", "T2", "C1", "C2", "P1"],
+            "type": ["target", "target", "compound", "compound", "pathway"],
+        }
+    )
+    assert graph.nodes_by_type(types, ["compound", "target", "pathway"]) == {
+        "compound": ["C1", "C2"],
+        "target": ["T1", "T2"],
+        "pathway": ["P1"],
+    }
@@ -0,0 +1,73 @@
+"""导入耗时基准：``import biorange`` 不应读取内置数据或初始化重依赖。
+
+预算可通过环境变量覆盖，例如在较慢的机器上：
+BIORANGE_IMPORT_BUDGET=1.0 BIORANGE_SUBPACKAGE_IMPORT_BUDGET=5 pytest tests
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_BUDGET = float(os.getenv("BIORANGE_IMPORT_BUDGET", "0.5"))
+SUBPACKAGE_IMPORT_BUDGET = float(os.getenv("BIORANGE_SUBPACKAGE_IMPORT_BUDGET", "3.0"))
+
+
+def _run(code, tmp_path):
+    # 每次都在全新的解释器里测，避免 sys.modules 缓存影响结果
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_bare_import_is_lazy(tmp_path):
+    report = _run(
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import biorange\n"
+        "elapsed = time.perf_counter() - start\n"
+        "heavy = [m for m in ('pandas', 'mygene', 'playwright', 'gseapy', 'matplotlib')"
+        " if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n",
+        tmp_path,
+    )
+    assert report["heavy"] == []
+    assert report["elapsed"] < IMPORT_BUDGET, report
+
+
+def test_subpackage_import_does_not_load_tables(tmp_path):
+    report = _run(
+        "import json, time\n"
+        "import pandas as pd\n"
+        "reads = []\n"
+        "for name in ('read_csv', 'read_table'):\n"
+        "    orig = getattr(pd, name)\n"
+        "    def wrapper(*a, _orig=orig, **k):\n"
+        "        reads.append(str(a[0]) if a else '')\n"
+        "        return _orig(*a, **k)\n"
+        "    setattr(pd, name, wrapper)\n"
+        "start = time.perf_counter()\n"
+        "import biorange.target_predict as tp\n"
+        "import biorange.component as comp\n"
+        "elapsed = time.perf_counter() - start\n"
+        "proxies = [tp.stich_inchikey_target, tp.tcmsp_inchikey_target,\n"
+        "           tp.omim_disease_target, tp.ttd_disease_target,\n"
+        "           tp.genecards_disease_target, tp.admet_filter,\n"
+        "           tp.chembl_inchikey_target,\n"
+        "           comp.tcmsp_raw_component]\n"
+        "print(json.dumps({'elapsed': elapsed, 'reads': reads,\n"
+        "                  'loaded': [p.loaded for p in proxies]}))\n",
+        tmp_path,
+    )
+    assert report["reads"] == []
+    assert not any(report["loaded"])
+    assert report["elapsed"] < SUBPACKAGE_IMPORT_BUDGET, report
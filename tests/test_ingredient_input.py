@@ -0,0 +1,75 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from biorange.target_predict.data_processing.ingredient_input import ADMETFilter
+
+
+def test_sweep_matches_refiltering_each_combination(tmp_path):
+    rng = np.random.default_rng(3)
+    n = 300
+    admet = pd.DataFrame(
+        {
+            "inchikey": [f"KEY{i:03d}" for i in range(n)],
+            "Lipinski": rng.integers(2, 5, n),
+            # 阈值恰好等于 QED 的情形（> 不含等号）也要覆盖
+            "QED": np.where(
+                rng.random(n) < 0.1, np.nan, rng.choice(np.linspace(0, 1, 21), n)
+            ),
+            "Bioavailability_Ma": np.where(
+                rng.random(n) < 0.1, np.nan, rng.choice([0.1, 0.3, 0.55, 0.85], n)
+            ),
+        }
+    )
+    path = tmp_path / "admet.csv"
+    admet.to_csv(path, index=False)
+    keys = list(rng.choice(admet["inchikey"], 200)) + ["UNKNOWN", None]
+    data = pd.DataFrame({"inchikey": keys})
+
+    grid = ((3, 4), (0.0, 0.3, 0.5, 0.75), (0.1, 0.3, 0.6))
+    sweep = ADMETFilter(admet_file=str(path)).sweep(data, *grid)
+    assert len(sweep) == 2 * 4 * 3
+
+    for row, (lipinski, qed, bio) in zip(
+        sweep.itertuples(index=False), itertools.product(*grid)
+    ):
+        assert (
+            row.lipinski_threshold,
+            row.qed_threshold,
+            row.bioavailability_threshold,
+        ) == (lipinski, qed, bio)
+        kept = (
+            ADMETFilter(lipinski, qed, bio, admet_file=str(path))
+            .process_dataframe(data)["inchikey"]
+            .drop_duplicates()
+            .tolist()
+        )
+        assert row.n_compounds == len(kept)
+        assert row.inchikeys.tolist() == kept
+
+    counts_only = ADMETFilter(admet_file=str(path)).sweep(data, *grid, return_ids=False)
+    assert "inchikeys" not in counts_only.columns
+    assert counts_only["n_compounds"].tolist() == sweep["n_compounds"].tolist()
+
+
+def test_duplicate_admet_keys_do_not_multiply_rows(tmp_path):
+    admet = pd.DataFrame(
+        {
+            "inchikey": ["KEY1", "KEY1", "KEY2"],
+            "Name": ["first", "second", "other"],
+            "Lipinski": [4, 4, 4],
+            "QED": [0.9, 0.9, 0.8],
+            "Bioavailability_Ma": [0.55, 0.55, 0.55],
+        }
+    )
+    path = tmp_path / "admet.csv"
+    admet.to_csv(path, index=False)
+    data = pd.DataFrame({"inchikey": ["KEY1", "KEY2", "KEY1"]})
+
+    admet_filter = ADMETFilter(admet_file=str(path))
+    for apply_filter in (True, False):
+        result = admet_filter.process_dataframe(data, apply_filter=apply_filter)
+        # 每个输入行只对应一行，取 ADMET 表中第一次出现的记录
+        assert result["inchikey"].tolist() == ["KEY1", "KEY2", "KEY1"]
+        assert result["Name"].tolist() == ["first", "other", "first"]
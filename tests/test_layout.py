@@ -0,0 +1,50 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from biorange.ppi.graph_builder import NetworkGraph
+from biorange.ppi.layout import compute_layout, graph_digest
+
+
+def _graph(n, seed=0):
+    edges = np.array(nx.barabasi_albert_graph(n, 2, seed=seed).edges())
+    return NetworkGraph([f"G{a}" for a in edges[:, 0]], [f"G{b}" for b in edges[:, 1]])
+
+
+def test_digest_ignores_edge_order():
+    a = NetworkGraph(["A", "B", "C"], ["B", "C", "A"])
+    b = NetworkGraph(["A", "C", "B"], ["C", "B", "A"])
+    assert graph_digest(a) == graph_digest(b)
+    assert graph_digest(a) != graph_digest(NetworkGraph(["A", "B"], ["B", "C"]))
+
+
+@pytest.mark.parametrize("method, bound", [("spectral", 0.8), ("force", 0.5)])
+def test_layout_is_finite_and_keeps_edges_short(method, bound):
+    graph = _graph(1000)
+    layout = compute_layout(graph, method, cache=False)
+    pos = np.array([layout[name] for name in graph.names.tolist()])
+    assert pos.shape == (1000, 2) and np.isfinite(pos).all()
+    assert np.abs(pos).max() == pytest.approx(1.0)
+    edges = np.linalg.norm(pos[graph.u] - pos[graph.v], axis=1).mean()
+    i, j = np.random.default_rng(0).integers(0, 1000, (2, 5000))
+    assert edges < bound * np.linalg.norm(pos[i] - pos[j], axis=1).mean()
+
+
+def test_cache_round_trip(monkeypatch, tmp_path):
+    monkeypatch.setenv("BIORANGE_CACHE_DIR", str(tmp_path))
+    graph = _graph(400)
+    first = compute_layout(graph)
+    assert len(list((tmp_path / "layout").glob("*.npy"))) == 1
+    # 同一个网络换一种边的顺序，从缓存读取到相同的坐标
+    reordered = NetworkGraph(graph.names[graph.v][::-1], graph.names[graph.u][::-1])
+    second = compute_layout(reordered)
+    assert all(np.allclose(first[name], second[name]) for name in first)
+
+
+def test_auto_uses_kamada_kawai_for_small_graphs():
+    graph = NetworkGraph(["A", "B", "C"], ["B", "C", "D"])
+    expected = nx.kamada_kawai_layout(graph.to_networkx())
+    layout = compute_layout(graph, cache=False)
+    assert all(np.allclose(layout[name], expected[name]) for name in expected)
+    with pytest.raises(ValueError):
+        compute_layout(graph, "circular")
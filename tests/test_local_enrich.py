@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import hypergeom
+
+from biorange.enrich_analysis.local_enrich import (
+    GeneSetLibrary,
+    benjamini_hochberg,
+    hypergeom_sf,
+)
+
+
+def test_hypergeom_sf_matches_scipy():
+    rng = np.random.default_rng(0)
+    for n_query in (1, 40, 900):
+        sizes = rng.integers(1, 500, 2000)
+        k = np.minimum(rng.integers(1, 30, 2000), np.minimum(sizes, n_query))
+        expected = hypergeom.sf(k - 1, 5000, sizes, n_query)
+        np.testing.assert_allclose(
+            hypergeom_sf(k, 5000, sizes, n_query), expected, rtol=1e-8, atol=1e-12
+        )
+
+
+def test_benjamini_hochberg_is_monotone_and_capped():
+    p = np.array([0.01, 0.04, 0.03, 0.5, 0.9])
+    adjusted = benjamini_hochberg(p)
+    np.testing.assert_allclose(adjusted, [0.05, 0.2 / 3, 0.2 / 3, 0.625, 0.9])
+
+
+def test_benjamini_hochberg_keeps_tiny_p_values_in_every_group():
+    p = np.tile([1e-300, 0.5], 3)
+    groups = np.repeat([0, 1, 2], 2)
+    np.testing.assert_allclose(
+        benjamini_hochberg(p, groups), np.tile([2e-300, 0.5], 3), rtol=1e-12
+    )
+    np.testing.assert_allclose(
+        benjamini_hochberg(p, groups, n_tests=4),
+        np.tile([4e-300, 1.0], 3),
+        rtol=1e-12,
+    )
+
+
+def test_enrich_batch_identical_lists_get_identical_results():
+    genes = [f"G{i}" for i in range(1000)]
+    library = GeneSetLibrary({"big": genes[:200], "other": genes[500:520]}, "toy")
+    batch = library.enrich_batch({"a": genes[:60], "b": genes[:60]}, background=20000)
+    a = batch[batch["list_id"] == "a"].drop(columns="list_id").reset_index(drop=True)
+    b = batch[batch["list_id"] == "b"].drop(columns="list_id").reset_index(drop=True)
+    pd.testing.assert_frame_equal(a, b)
+    assert 0 < a.loc[0, "Adjusted P-value"] < 1e-30
+
+
+def test_enrich_overlap_and_genes():
+    library = GeneSetLibrary(
+        {"A": ["G1", "G2", "G3", "G2"], "B": ["G3", "G4"], "C": ["G5"]}, "toy"
+    )
+    result = library.enrich(["G2", "G3", "G9"]).set_index("Term")
+    assert list(result.index) == ["A", "B"]
+    assert result.loc["A", "Overlap"] == "2/3"
+    assert set(result.loc["A", "Genes"].split(";")) == {"G2", "G3"}
+    assert result.loc["B", "Overlap"] == "1/2"
+    assert (result["Gene_set"] == "toy").all()
+
+
+def test_benjamini_hochberg_groups_are_independent():
+    rng = np.random.default_rng(1)
+    p = rng.random(300)
+    groups = rng.integers(0, 5, 300)
+    adjusted = benjamini_hochberg(p, groups)
+    for g in range(5):
+        np.testing.assert_allclose(
+            adjusted[groups == g], benjamini_hochberg(p[groups == g])
+        )
+
+
+def test_enrich_batch_matches_single_lists():
+    rng = np.random.default_rng(2)
+    genes = [f"G{i}" for i in range(300)]
+    library = GeneSetLibrary(
+        {f"T{i}": list(rng.choice(genes, rng.integers(3, 60))) for i in range(80)},
+        "toy",
+    )
+    gene_lists = {
+        ("a", 1): list(rng.choice(genes, 40)),
+        "b": list(rng.choice(genes, 5)),
+        "empty": ["NOT_IN_LIBRARY"],
+    }
+    for background in (None, 1000, genes[:200]):
+        batch = library.enrich_batch(gene_lists, background=background)
+        for list_id, gene_list in gene_lists.items():
+            single = library.enrich(gene_list, background=background)
+            part = batch[batch["list_id"].map(lambda x: x == list_id)]
+            if single.empty:
+                assert part.empty
+                continue
+            pd.testing.assert_frame_equal(
+                part.drop(columns="list_id").reset_index(drop=True), single
+            )
+
+
+def test_adjusted_p_values_do_not_depend_on_min_overlap():
+    rng = np.random.default_rng(3)
+    genes = [f"G{i}" for i in range(2000)]
+    library = GeneSetLibrary(
+        {f"T{i}": list(rng.choice(genes, rng.integers(5, 200))) for i in range(300)},
+        "toy",
+    )
+    gene_lists = {"a": list(rng.choice(genes, 60)), "b": list(rng.choice(genes, 25))}
+    full = library.enrich_batch(gene_lists).set_index(["list_id", "Term"])
+    for min_overlap in (2, 3, 5):
+        part = library.enrich_batch(gene_lists, min_overlap=min_overlap)
+        assert (part["Overlap"].str.split("/").str[0].astype(int) >= min_overlap).all()
+        part = part.set_index(["list_id", "Term"])
+        assert 0 < len(part) < len(full)
+        pd.testing.assert_frame_equal(part, full.loc[part.index])
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from biorange.utils.package_fileload import (
+    DataRegistry,
+    get_data_file_path,
+    resolve_data_file,
+)
+
+
+@pytest.fixture
+def tables(tmp_path):
+    paths = {}
+    for i, rows in enumerate([100, 200, 400]):
+        path = tmp_path / f"table{i}.csv"
+        pd.DataFrame(
+            {"name": [f"item{j}" for j in range(rows)], "value": np.arange(rows)}
+        ).to_csv(path, index=False)
+        paths[i] = str(path)
+    return paths
+
+
+def test_frames_are_shared_and_read_only(tables):
+    registry = DataRegistry()
+    first = registry.get(tables[0])
+    second = registry.get(tables[0])
+    assert first is not second
+    assert np.shares_memory(first["value"].to_numpy(), second["value"].to_numpy())
+
+    with pytest.raises(ValueError):
+        first.loc[0, "value"] = -1
+    # 增加列只影响调用方自己的浅拷贝
+    first["extra"] = 1
+    assert "extra" not in registry.get(tables[0]).columns
+    copied = second.copy()
+    copied.loc[0, "value"] = -1
+    assert registry.get(tables[0]).loc[0, "value"] == 0
+
+
+def test_counters_and_info(tables):
+    registry = DataRegistry()
+    registry.get(tables[0])
+    registry.get(tables[0])
+    registry.get(tables[1])
+    assert registry.stats["hits"] == 1
+    assert registry.stats["misses"] == 2
+    assert registry.stats["evictions"] == 0
+    assert registry.stats["load_time"] > 0
+
+    info = registry.info().set_index("file")
+    assert info.loc[tables[0], ["hits", "misses"]].tolist() == [1, 1]
+    assert info.loc[tables[1], ["hits", "misses"]].tolist() == [0, 1]
+    assert info["cached"].all() and (info["bytes"] > 0).all()
+    assert info["load_time"].sum() == pytest.approx(registry.stats["load_time"])
+
+    registry.evict(tables[0])
+    registry.get(tables[0])
+    assert registry.stats["misses"] == 3
+    registry.evict()
+    assert not registry.info()["cached"].any()
+
+
+def test_size_budget_evicts_least_recently_used(tables):
+    probe = DataRegistry()
+    for path in tables.values():
+        probe.get(path)
+    sizes = probe.info().set_index("file")["bytes"]
+
+    registry = DataRegistry(max_bytes=int(sizes[tables[0]] + sizes[tables[1]]))
+    registry.get(tables[0])
+    registry.get(tables[1])
+    registry.get(tables[0])  # table1 成为最久未使用
+    registry.get(tables[2])
+    cached = registry.info().set_index("file")["cached"]
+    assert not cached[tables[1]]
+    assert registry.stats["evictions"] >= 1
+    # 最新读取的表即使单独超出上限也保留
+    assert cached[tables[2]]
+
+    registry.set_max_bytes(0)
+    assert registry.info()["cached"].sum() == 1
+
+
+def test_kwargs_matching_specs_share_one_entry(tmp_path):
+    path = tmp_path / "morbidmap.txt"
+    pd.DataFrame(
+        {"Phenotype": ["a"], "Gene Symbols": ["TP53"], "MIM Number": [1.0]}
+    ).to_csv(path, sep="\t", index=False)
+    registry = DataRegistry()
+    plain = registry.get(path)
+    with_sep = registry.get(path, sep="\t")
+    assert (registry.stats["hits"], registry.stats["misses"]) == (1, 1)
+    pd.testing.assert_frame_equal(plain, with_sep)
+    assert len(registry.info()) == 1
+
+    # 与声明不同的参数仍然单独缓存
+    registry.get(path, usecols=["Phenotype"])
+    assert registry.stats["misses"] == 2
+
+
+def test_existing_bare_filename_is_a_path(tmp_path, monkeypatch):
+    name = "TCM_NGM_inchikey_isosmile_12184.csv"
+    assert resolve_data_file(name) == get_data_file_path(name)
+
+    # 当前目录下已存在同名文件时按路径读取，不再指向包内数据
+    monkeypatch.chdir(tmp_path)
+    pd.DataFrame({"inchikey": ["IK1"]}).to_csv(name, index=False)
+    assert resolve_data_file(name) == Path(name)
+    assert DataRegistry().get(name)["inchikey"].tolist() == ["IK1"]
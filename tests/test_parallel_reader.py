@@ -0,0 +1,89 @@
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from biorange.target_predict.mol_target.gene_symbol_cache import GeneSymbolCache
+from biorange.target_predict.mol_target.stitch_inchikey import TCMDataProcessor
+from biorange.utils.parallel_reader import (
+    RowFilter,
+    read_gzipped_tsv_parallel,
+    read_gzipped_tsv_serial,
+)
+
+USECOLS = ["chemical", "protein", "combined_score"]
+
+
+@pytest.fixture(scope="module")
+def links_file(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    n = 5000
+    frame = pd.DataFrame(
+        {
+            "chemical": [f"CIDm{i:08d}" for i in rng.integers(0, 200, n)],
+            "protein": [f"9606.ENSP{i:011d}" for i in rng.integers(0, 500, n)],
+            "experimental": rng.integers(0, 1000, n),
+            "combined_score": rng.integers(150, 1000, n),
+        }
+    )
+    path = tmp_path_factory.mktemp("stitch") / "links.tsv.gz"
+    with gzip.open(path, "wt") as f:
+        frame.to_csv(f, sep="\t", index=False)
+    return str(path)
+
+
+FILTERS = [
+    RowFilter(),
+    RowFilter("chemical", frozenset({"CIDm00000003", "CIDm00000150"})),
+    RowFilter(
+        "chemical",
+        frozenset(f"CIDm{i:08d}" for i in range(50)),
+        "combined_score",
+        700,
+    ),
+    # 没有匹配行
+    RowFilter("chemical", frozenset({"CIDm99999999"})),
+]
+
+
+@pytest.mark.parametrize("row_filter", FILTERS)
+def test_parallel_matches_serial(links_file, row_filter):
+    serial = read_gzipped_tsv_serial(links_file, USECOLS, row_filter)
+    parallel = read_gzipped_tsv_parallel(
+        links_file,
+        USECOLS,
+        row_filter,
+        n_workers=2,
+        block_size=4096,
+        min_parallel_bytes=0,
+    )
+    assert_frame_equal(parallel, serial)
+    assert list(serial.columns) == USECOLS
+
+
+def test_small_input_falls_back_to_serial(links_file):
+    row_filter = FILTERS[2]
+    serial = read_gzipped_tsv_serial(links_file, USECOLS, row_filter)
+    # 文件小于 min_parallel_bytes 或只有一个进程时走串行路径
+    for kwargs in ({"n_workers": 4}, {"n_workers": 1, "min_parallel_bytes": 0}):
+        assert_frame_equal(
+            read_gzipped_tsv_parallel(links_file, USECOLS, row_filter, **kwargs),
+            serial,
+        )
+
+
+@pytest.mark.parametrize("row_filter", FILTERS[1:])
+def test_processor_scan_same_for_any_worker_count(tmp_path, links_file, row_filter):
+    def scan(n_workers):
+        processor = TCMDataProcessor(
+            use_index=False,
+            gene_cache=GeneSymbolCache(
+                cache_file=tmp_path / "genes.tsv", query_func=lambda *a, **k: []
+            ),
+            n_workers=n_workers,
+        )
+        return processor._scan_gzipped_tsv(links_file, USECOLS, row_filter)
+
+    assert_frame_equal(scan(2), scan(1))
@@ -0,0 +1,301 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from biorange.pipeline import Pipeline, Stage, build_pipeline, load_config
+from biorange.utils.package_fileload import get_data_file_path
+
+calls = []
+
+
+def source(value):
+    calls.append("source")
+    return value
+
+
+def branch(source, scale, barrier=None):
+    calls.append(f"branch{scale}")
+    if barrier is not None:
+        # 两个分支都到达后才继续：串行执行会超时
+        barrier.wait(timeout=5)
+    time.sleep(0.05)
+    return source * scale
+
+
+def total(left, right):
+    calls.append("total")
+    return left + right
+
+
+def failing(source):
+    raise RuntimeError("boom")
+
+
+def make_pipeline(checkpoint_dir, value=1, barrier=None):
+    return Pipeline(
+        [
+            Stage("total", total, ["left", "right"]),
+            Stage("source", source, params={"value": value}),
+            Stage("left", branch, ["source"], {"scale": 2, "barrier": barrier}),
+            Stage("right", branch, ["source"], {"scale": 3, "barrier": barrier}),
+        ],
+        checkpoint_dir=checkpoint_dir,
+    )
+
+
+@pytest.fixture(autouse=True)
+def _reset_calls():
+    calls.clear()
+
+
+def test_branches_run_concurrently(tmp_path):
+    barrier = threading.Barrier(2)
+    outputs = make_pipeline(None, barrier=barrier).run(n_workers=2)
+    assert outputs["total"] == 5
+    assert calls[0] == "source" and calls[-1] == "total"
+
+
+def test_resume_from_first_changed_stage(tmp_path):
+    pipeline = make_pipeline(tmp_path)
+    assert pipeline.run()["total"] == 5
+    assert list(pipeline.report["status"]) == ["run"] * 4
+    assert list(pipeline.report["stage"]) == ["source", "left", "right", "total"]
+    assert (pipeline.report["seconds"] >= 0.05).sum() == 2
+
+    calls.clear()
+    pipeline = make_pipeline(tmp_path)
+    assert pipeline.run()["total"] == 5
+    assert calls == []
+    assert set(pipeline.report["status"]) == {"cached"}
+
+    # 只改变下游阶段的参数：上游读检查点
+    pipeline = make_pipeline(tmp_path)
+    pipeline.stages["right"].params["scale"] = 4
+    assert pipeline.run()["total"] == 6
+    assert sorted(calls) == ["branch4", "total"]
+    assert dict(zip(pipeline.report["stage"], pipeline.report["status"])) == {
+        "source": "cached",
+        "left": "cached",
+        "right": "run",
+        "total": "run",
+    }
+    assert len(list(tmp_path.glob("right.*.pkl"))) == 1
+
+    calls.clear()
+    assert make_pipeline(tmp_path, value=2).run(resume=True)["total"] == 10
+    assert len(calls) == 4
+
+
+def test_upstream_output_and_version_change_downstream_key(tmp_path):
+    data = tmp_path / "data.txt"
+    data.write_text("1")
+
+    def read(path):
+        calls.append("read")
+        return int(open(path).read())
+
+    def double(read):
+        calls.append("double")
+        return read * 2
+
+    def make(version=None):
+        return Pipeline(
+            [
+                # 不保存检查点：每次都重新读取外部数据
+                Stage("read", read, params={"path": str(data)}, checkpoint=False),
+                Stage("double", double, ["read"], version=version),
+            ],
+            checkpoint_dir=tmp_path / "ckpt",
+        )
+
+    assert make().run()["double"] == 2
+    calls.clear()
+    assert make().run()["double"] == 2
+    assert calls == ["read"]
+
+    # 阶段定义不变、上游输出改变：下游重新计算
+    data.write_text("5")
+    calls.clear()
+    pipeline = make()
+    assert pipeline.run()["double"] == 10
+    assert calls == ["read", "double"]
+    assert pipeline.keys() == make().keys()
+
+    # 修改实现后改变 version，使检查点失效
+    calls.clear()
+    assert make(version="2").run()["double"] == 10
+    assert calls == ["read", "double"]
+
+
+def test_targets_and_validation(tmp_path):
+    pipeline = make_pipeline(tmp_path)
+    assert set(pipeline.run(targets=["left"])) == {"source", "left"}
+
+    with pytest.raises(ValueError, match="环"):
+        Pipeline([Stage("a", source, ["b"]), Stage("b", source, ["a"])]).order()
+    with pytest.raises(ValueError, match="未定义"):
+        Pipeline([Stage("a", source, ["missing"])]).order()
+    with pytest.raises(ValueError, match="重复"):
+        Pipeline([Stage("a", source), Stage("a", source)])
+
+
+def test_failure_keeps_finished_checkpoints(tmp_path):
+    pipeline = make_pipeline(tmp_path)
+    pipeline.add(Stage("bad", failing, ["source"]))
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run(n_workers=1)
+    assert "source" in set(pipeline.report["stage"])
+    assert list(tmp_path.glob("source.*.pkl"))
+
+
+def test_workflow_graph(tmp_path):
+    config = load_config(get_data_file_path("config.yaml"))
+    assert config["drug_name"] == ["大枣", "人参", "陈皮"]
+    pipeline = build_pipeline(
+        dict(config, results_dir=str(tmp_path)), disease_sources=["omim", "ttd"]
+    )
+    order = pipeline.order()
+    assert order.index("admet") < order.index("chembl_targets")
+    assert pipeline.stages["disease_targets"].deps == ["omim_targets", "ttd_targets"]
+    assert pipeline.stages["network_type"].deps == ["enrichment", "compound_targets"]
+
+    # 疾病名改变时成分分支的键不变
+    keys = pipeline.keys()
+    other = build_pipeline(
+        dict(config, results_dir=str(tmp_path), disease_name="Asthma"),
+        disease_sources=["omim", "ttd"],
+    ).keys()
+    assert keys["compound_targets"] == other["compound_targets"]
+    assert keys["disease_targets"] != other["disease_targets"]
+    assert keys["venn"] != other["venn"]
+
+
+def test_run_pipeline_end_to_end(tmp_path, monkeypatch):
+    import biorange.component
+    import biorange.enrich_analysis
+    import biorange.ppi
+    import biorange.target_predict
+    from biorange.pipeline import run_pipeline
+    from biorange.utils import rendering
+
+    monkeypatch.setitem(rendering._state, "headless", None)
+    seen = {}
+
+    def herbs(drug_name, max_concurrency, requests_per_second):
+        seen["drug_name"] = drug_name
+        return pd.DataFrame(
+            {"herb": ["大枣", "大枣", "人参"], "inchikey": ["IK1", "IK2", "IK3"]}
+        )
+
+    def admet(keys):
+        passed = keys[keys["inchikey"] != "IK3"]
+        return passed.assign(Name=["compound one", None])
+
+    def chembl(inchikeys):
+        # 原始 ChEMBL 记录只有 targetChemblId，没有 gene_name
+        return pd.DataFrame(
+            {
+                "inchikey": ["IK1", "IK2", "IK2"],
+                "targetChemblId": ["CHEMBL1075317", "CHEMBL1163116", "CHEMBL_NONE"],
+                "pref_name": ["WDR5", "CETP", "unmapped"],
+            }
+        )
+
+    def genecards(disease_name):
+        raise AssertionError("默认流程不应调用 GeneCards")
+
+    def enrichment(genes, analysis_type, **kwargs):
+        seen["enrich_kwargs"] = kwargs
+        return pd.DataFrame(
+            {
+                "Gene_set": ["KEGG_2021_Human", "GO_Biological_Process_2021"],
+                "Term": ["Pathway A", "Process B"],
+                "Genes": [";".join(sorted(genes)), "WDR5"],
+                "Adjusted P-value": [0.01, 0.02],
+            }
+        )
+
+    def generate_type(kegg_df, targets):
+        node = kegg_df.assign(gene_name=kegg_df["gene_name"].str.split(";"))
+        node = node.explode("gene_name")
+        return node, pd.DataFrame({"node": ["Pathway A"], "type": ["pathway"]}), None
+
+    stubs = {
+        biorange.component: {"tcmsp_raw_component_batch": herbs},
+        biorange.target_predict: {
+            "admet_filter": admet,
+            "tcmsp_inchikey_target": lambda keys: pd.DataFrame(
+                {"inchikey": ["IK1"], "gene_name": ["TP53"], "source": ["TCMSP"]}
+            ),
+            "stich_inchikey_target": lambda keys, combined_score_threshold: (
+                pd.DataFrame(columns=["inchikey", "gene_name", "source"])
+            ),
+            "chembl_inchikey_target": chembl,
+            "omim_disease_target": lambda name: pd.DataFrame(
+                {"disease": [name], "gene_name": ["TP53"], "source": ["OMIM"]}
+            ),
+            "ttd_disease_target": lambda name: pd.DataFrame(
+                {"disease": [name] * 2, "gene_name": ["CETP", "EGFR"], "source": "TTD"}
+            ),
+            "genecards_disease_target": genecards,
+        },
+        biorange.ppi: {
+            "ppi_analysis": lambda genes, output_dir, show: pd.DataFrame(
+                {"preferredName_A": ["TP53"], "preferredName_B": ["CETP"]}
+            ),
+            "generate_type": generate_type,
+        },
+        biorange.enrich_analysis: {"enrich_gokegg": enrichment},
+    }
+    for module, attrs in stubs.items():
+        for name, func in attrs.items():
+            monkeypatch.setattr(module, name, func)
+
+    results_dir = tmp_path / "results"
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        f"disease_name: Lung cancer\ndrug_name: 大枣\nresults_dir: {results_dir}\n",
+        encoding="utf-8",
+    )
+    outputs = run_pipeline(config_path, n_workers=4)
+
+    assert seen["drug_name"] == ["大枣"]
+    # 未配置 enrich_backend 时使用 enrich_gokegg 的默认后端
+    assert seen["enrich_kwargs"] == {}
+    targets = outputs["compound_targets"]
+    assert list(targets.itertuples(index=False, name=None)) == [
+        ("TP53", "compound one", "TCMSP", "IK1"),
+        ("WDR5", "compound one", "ChEMBL", "IK1"),
+        ("CETP", "IK2", "ChEMBL", "IK2"),
+    ]
+    assert "genecards_targets" not in outputs
+    assert sorted(outputs["venn"]["shared_targets"]) == ["CETP", "TP53"]
+    assert outputs["network_type"]["node"]["gene_name"].tolist() == ["CETP", "TP53"]
+    for name in ("compound_targets", "disease_targets", "venn", "enrichment"):
+        assert (results_dir / f"{name}.csv").is_file()
+    assert (results_dir / "network_type-node.csv").is_file()
+    report = pd.read_csv(results_dir / "pipeline_report.csv")
+    assert set(report["status"]) == {"run"}
+
+    # 再次运行全部来自检查点
+    run_pipeline(config_path, n_workers=4)
+    report = pd.read_csv(results_dir / "pipeline_report.csv")
+    assert set(report["status"]) == {"cached"}
+
+
+def test_disease_sources_from_config(tmp_path):
+    config = {
+        "disease_name": "Asthma",
+        "drug_name": ["大枣"],
+        "results_dir": str(tmp_path),
+    }
+    assert "genecards_targets" not in build_pipeline(config).stages
+    pipeline = build_pipeline(
+        dict(config, disease_sources=["omim", "genecards"]),
+    )
+    assert pipeline.stages["disease_targets"].deps == [
+        "omim_targets",
+        "genecards_targets",
+    ]
@@ -0,0 +1,84 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import combinations
+from urllib.parse import parse_qs
+
+import pytest
+
+from biorange.ppi.ppi_client import StringClient
+
+GENES = [f"G{i}" for i in range(7)]
+EDGES = {(a, b) for a, b in combinations(GENES, 2) if (int(a[1:]) + int(b[1:])) % 3}
+
+
+class _StubString(BaseHTTPRequestHandler):
+    calls = []
+    delay = 0.0
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        form = parse_qs(self.rfile.read(int(self.headers["Content-Length"])).decode())
+        genes = set(form["identifiers"][0].split("\r"))
+        self.calls.append(genes)
+        time.sleep(self.delay)
+        lines = ["stringId_A\tstringId_B\tpreferredName_A\tpreferredName_B\tscore"]
+        for a, b in sorted(EDGES):
+            if a in genes and b in genes:
+                lines.append(f"9606.{a}\t9606.{b}\t{a}\t{b}\t0.9")
+        body = ("\n".join(lines) + "\n").encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubString)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/api"
+    server.shutdown()
+    _StubString.calls.clear()
+    _StubString.delay = 0.0
+
+
+def _edges(network):
+    return {
+        tuple(sorted(pair))
+        for pair in zip(network["preferredName_A"], network["preferredName_B"])
+    }
+
+
+def test_paged_result_matches_single_request(stub_url, tmp_path):
+    paged = StringClient(base_url=stub_url, page_size=2, cache_dir=tmp_path / "a")
+    single = StringClient(base_url=stub_url, page_size=100, cache_dir=tmp_path / "b")
+    result = paged.network(GENES + [" G1 ", None])
+    assert _edges(result) == _edges(single.network(GENES)) == EDGES
+    assert len(result) == len(EDGES)
+    assert all(len(genes) <= 4 for genes in _StubString.calls[:-1])
+
+
+def test_memory_and_disk_cache(stub_url, tmp_path):
+    client = StringClient(base_url=stub_url, cache_dir=tmp_path)
+    client.network(GENES)
+    client.network(reversed(GENES))
+    assert client.stats["requests"] == 1 and client.stats["hits"] == 1
+
+    fresh = StringClient(base_url=stub_url, cache_dir=tmp_path)
+    assert _edges(fresh.network(GENES)) == EDGES
+    assert fresh.stats["requests"] == 0 and len(_StubString.calls) == 1
+
+
+def test_identical_requests_are_coalesced(stub_url, tmp_path):
+    _StubString.delay = 0.3
+    client = StringClient(base_url=stub_url, cache_dir=tmp_path)
+    threads = [threading.Thread(target=client.network, args=(GENES,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(_StubString.calls) == 1
+    assert client.stats["coalesced"] == 3
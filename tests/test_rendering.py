@@ -0,0 +1,82 @@
+import os
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+
+from biorange.ppi.ppi_final import plot_ppi_network  # noqa: E402
+from biorange.utils import rendering  # noqa: E402
+
+NODES = pd.DataFrame(
+    {
+        "preferredName_A": ["A", "A", "B", "C", "D"],
+        "preferredName_B": ["B", "C", "C", "D", "E"],
+    }
+)
+
+
+@pytest.fixture(autouse=True)
+def _isolated(monkeypatch, tmp_path):
+    monkeypatch.setenv("BIORANGE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setitem(rendering._state, "headless", None)
+    yield
+    plt.close("all")
+
+
+def test_formats_and_no_figure_leak(tmp_path):
+    plt.close("all")
+    for _ in range(5):
+        paths = plot_ppi_network(
+            NODES, str(tmp_path), dpi=50, formats=("png", "svg"), show=False
+        )
+    assert [p.rsplit(".", 1)[1] for p in paths] == ["png", "svg"]
+    assert all((tmp_path / f"ppi_network.{fmt}").exists() for fmt in ("png", "svg"))
+    assert plt.get_fignums() == []
+
+
+def test_headless_reuses_one_figure(tmp_path):
+    rendering.headless(True)
+    plt.close("all")
+    results = rendering.render_many(
+        plot_ppi_network,
+        [
+            dict(nodes=NODES, output_dir=str(tmp_path / str(i)), dpi=50)
+            for i in range(3)
+        ],
+    )
+    assert len(plt.get_fignums()) == 1
+    assert results[2] == (
+        str(tmp_path / "2" / "ppi_network.png"),
+        str(tmp_path / "2" / "ppi_network.pdf"),
+    )
+
+
+def test_render_many_in_processes(tmp_path):
+    jobs = [
+        dict(nodes=NODES, output_dir=str(tmp_path / str(i)), formats=("png",), dpi=50)
+        for i in range(4)
+    ]
+    results = rendering.render_many(plot_ppi_network, jobs, n_workers=2)
+    assert results == [(str(tmp_path / str(i) / "ppi_network.png"),) for i in range(4)]
+    assert all((tmp_path / str(i) / "ppi_network.png").exists() for i in range(4))
+
+
+def test_venn_formats_without_filename_use_title(tmp_path, monkeypatch):
+    from biorange.venn import VennPlotter
+
+    monkeypatch.chdir(tmp_path)
+    groups, labels = [["A", "B", "C"], ["B", "C", "D"]], ["drug", "disease"]
+    plotter = VennPlotter()
+    plotter.plot_venn(groups, labels, "Drug / disease", formats=("png",), show=False)
+    assert sorted(os.listdir(tmp_path / "results" / "venn")) == [
+        "venn-Drug_disease.png"
+    ]
+    with pytest.raises(ValueError):
+        plotter.plot_venn(groups, labels, "", formats=("png",), show=False)
+    # 不保存时不需要文件名
+    plotter.plot_venn(groups, labels, "", show=False)
+    assert plt.get_fignums() == []
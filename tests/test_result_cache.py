@@ -0,0 +1,59 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from biorange.enrich_analysis.result_cache import EnrichmentCache, cache_key
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "Term": ["a", "b", None],
+            "P-value": [0.01, 0.2, 0.5],
+            "Overlap": ["1/3", "", "2/9"],
+        },
+        index=[7, 2, 5],
+    )
+
+
+def test_cache_key_ignores_gene_order_and_duplicates():
+    assert cache_key(["B", "A", "A"], organism="human") == cache_key(
+        ["A", "B"], organism="human"
+    )
+    assert cache_key(["A"], organism="human") != cache_key(["A"], organism="mouse")
+
+
+def test_round_trip_and_hit_flag(tmp_path):
+    cache = EnrichmentCache(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _frame()
+
+    first = cache.get_or_compute("k", compute)
+    second = cache.get_or_compute("k", compute)
+    assert len(calls) == 1
+    assert first.attrs["cache_hit"] is False and second.attrs["cache_hit"] is True
+    pd.testing.assert_frame_equal(second, _frame())
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    cache = EnrichmentCache(tmp_path, ttl=60)
+    cache.put("old", _frame())
+    created = time.time() - 120
+    os.utime(cache.path("old"), (created, created))
+    cache.put("new", _frame())
+    assert not cache.path("old").exists()
+
+    size = cache.path("new").stat().st_size
+    cache = EnrichmentCache(tmp_path, ttl=None, max_bytes=int(2.5 * size))
+    cache.put("second", _frame())
+    stale = time.time() - 10
+    os.utime(cache.path("new"), (stale, stale))
+    assert cache.get("second") is not None
+    cache.put("third", _frame())
+    assert sorted(p.stem for p in tmp_path.glob("*.npz")) == ["second", "third"]
+    assert np.isclose(cache.get("third")["P-value"].sum(), 0.71)
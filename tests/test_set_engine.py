@@ -0,0 +1,74 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from biorange.venn.set_engine import DENSE_MAX_SETS, SetIntersection
+
+
+def _random_groups(n_sets, n_genes=300, seed=0):
+    rng = np.random.default_rng(seed)
+    genes = np.array([f"G{i}" for i in range(n_genes)], dtype=object)
+    return [list(rng.choice(genes, rng.integers(20, 200))) for _ in range(n_sets)]
+
+
+@pytest.mark.parametrize("n_sets", [3, 6, DENSE_MAX_SETS + 2])
+def test_counts_match_python_sets(n_sets):
+    groups = _random_groups(n_sets)
+    labels = [f"S{i}" for i in range(n_sets)]
+    sets = [set(g) for g in groups]
+    universe = set().union(*sets)
+    counts = SetIntersection(groups, labels).counts()
+
+    for row in counts.itertuples(index=False):
+        inside = [i for i, label in enumerate(labels) if getattr(row, label)]
+        inclusive = set.intersection(*(sets[i] for i in inside))
+        outside = set().union(*(sets[i] for i in range(n_sets) if i not in inside))
+        assert row.region == "&".join(labels[i] for i in inside)
+        assert row.degree == len(inside)
+        assert row.inclusive == len(inclusive)
+        assert row.exclusive == len(inclusive - outside)
+    assert counts["exclusive"].sum() == len(universe)
+    if n_sets <= DENSE_MAX_SETS:
+        # 稠密路径覆盖所有非空的组合
+        expected = sum(
+            1
+            for k in range(1, n_sets + 1)
+            for combo in combinations(range(n_sets), k)
+            if set.intersection(*(sets[i] for i in combo))
+        )
+        assert len(counts) == expected
+
+
+def test_include_empty_lists_every_region():
+    engine = SetIntersection([["A", "B"], ["B"], ["C"]], ["x", "y", "z"])
+    counts = engine.counts(include_empty=True)
+    assert len(counts) == 7
+    assert counts.set_index("region").loc["x&y&z", "inclusive"] == 0
+
+
+def test_members_and_membership_matrix():
+    engine = SetIntersection(
+        [["A", "B", "C", "B", None], ["B", "C", "D"], ["C", "E"]], ["x", "y", "z"]
+    )
+    matrix = engine.membership_matrix()
+    assert list(matrix.index) == ["A", "B", "C", "D", "E"]
+    assert matrix.loc["C"].tolist() == [True, True, True]
+    assert matrix.loc["D"].tolist() == [False, True, False]
+
+    members = engine.members(min_degree=2)
+    assert members.groupby("region", sort=False)["element"].apply(list).to_dict() == {
+        "x&y": ["B", "C"],
+        "x&z": ["C"],
+        "y&z": ["C"],
+        "x&y&z": ["C"],
+    }
+    exclusive = engine.members(exclusive=True)
+    assert dict(zip(exclusive["element"], exclusive["region"])) == {
+        "A": "x",
+        "D": "y",
+        "E": "z",
+        "B": "x&y",
+        "C": "x&y&z",
+    }
+    assert engine.elements_in(["x", "y"], exclusive=True) == ["B"]
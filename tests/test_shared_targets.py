@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import hypergeom
+
+from biorange.target_predict.shared_targets import SharedTargetMatrix
+from biorange.utils.overlap_stats import benjamini_hochberg
+
+
+def _random_sets(prefix, n_sets, genes, rng):
+    return {
+        f"{prefix}{i}": list(rng.choice(genes, rng.integers(5, 80), replace=False))
+        for i in range(n_sets)
+    }
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    genes = np.array([f"G{i}" for i in range(400)], dtype=object)
+    return _random_sets("drug", 37, genes, rng), _random_sets("dis", 11, genes, rng)
+
+
+def test_pairs_match_python_sets(data):
+    drugs, diseases = data
+    # 与某个疾病几乎相同的药物靶点集：p 值极小，且不在各块的第一个药物
+    big = diseases["dis0"] = [f"G{i}" for i in range(150)]
+    drugs = dict(drugs)
+    for i in range(5):
+        drugs[f"near{i}"] = big[i:] + ["G399"]
+    engine = SharedTargetMatrix(drugs, diseases, background=1000)
+    pairs = engine.pairs(block_size=8).set_index(["drug", "disease"])
+
+    for drug, drug_genes in drugs.items():
+        a = set(drug_genes)
+        p_all = []
+        for disease, disease_genes in diseases.items():
+            b = set(disease_genes)
+            p_all.append(hypergeom.sf(len(a & b) - 1, 1000, len(b), len(a)))
+            if a & b:
+                row = pairs.loc[(drug, disease)]
+                assert row["shared"] == len(a & b)
+                assert row["jaccard"] == pytest.approx(len(a & b) / len(a | b))
+                assert row["P-value"] == pytest.approx(p_all[-1], rel=1e-8)
+            else:
+                assert (drug, disease) not in pairs.index
+        # BH 校正计入没有重叠的疾病
+        expected = benjamini_hochberg(np.array(p_all))
+        got = pairs.loc[drug, "Adjusted P-value"]
+        names = list(diseases)
+        for disease, value in got.items():
+            assert value == pytest.approx(expected[names.index(disease)], rel=1e-8)
+    assert (pairs["Adjusted P-value"] > 0).all()
+    assert pairs.loc[("near3", "dis0"), "Adjusted P-value"] < 1e-100
+
+
+def test_top_k_and_matrix(data):
+    drugs, diseases = data
+    engine = SharedTargetMatrix(drugs, diseases)
+    pairs = engine.pairs()
+    top = engine.top_k(3, by="jaccard", block_size=5)
+    assert (top.groupby("drug")["rank"].max() <= 3).all()
+    for drug, group in top.groupby("drug"):
+        expected = pairs[pairs["drug"] == drug].nlargest(3, "jaccard")["jaccard"]
+        assert np.allclose(group["jaccard"], expected)
+
+    matrix = engine.to_matrix("shared")
+    assert matrix.shape == (37, 11)
+    assert matrix.to_numpy().sum() == pairs["shared"].sum()
+
+
+def test_from_frames_and_background_filter():
+    drug_frame = pd.DataFrame(
+        {"drug": ["A", "A", "B", "B"], "target": ["TP53", "EGFR", "TP53", None]}
+    )
+    disease_frame = pd.DataFrame(
+        {"disease": ["X", "X", "Y"], "target": ["TP53", "EGFR ", "AKT1"]}
+    )
+    engine = SharedTargetMatrix.from_frames(drug_frame, disease_frame)
+    assert engine.to_matrix().loc["A"].tolist() == [2, 0]
+    filtered = SharedTargetMatrix.from_frames(
+        drug_frame, disease_frame, background=["TP53", "AKT1"]
+    )
+    assert filtered.to_matrix().loc["A"].tolist() == [1, 0]
+    assert filtered.n_background == 2
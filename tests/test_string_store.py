@@ -0,0 +1,50 @@
+import pandas as pd
+
+from biorange.ppi.string_store import StringStore
+
+
+def _write_dump(tmp_path):
+    info = pd.DataFrame(
+        {
+            "#string_protein_id": [f"9606.P{i}" for i in range(5)],
+            "preferred_name": ["TP53", "AKT1", "IL6", "STAT3", "EGFR"],
+            "protein_size": 100,
+            "annotation": "x",
+        }
+    )
+    info.to_csv(tmp_path / "info.txt.gz", sep="\t", index=False)
+    pairs = [(0, 1, 900), (0, 2, 300), (2, 3, 700), (3, 4, 999), (1, 3, 450)]
+    rows = [(a, b, s) for a, b, s in pairs] + [(b, a, s) for a, b, s in pairs]
+    links = pd.DataFrame(
+        {
+            "protein1": [f"9606.P{a}" for a, _, _ in rows],
+            "protein2": [f"9606.P{b}" for _, b, _ in rows],
+            "combined_score": [s for _, _, s in rows],
+        }
+    )
+    links.to_csv(tmp_path / "links.txt", sep=" ", index=False)
+
+
+def test_induced_subgraph(tmp_path):
+    _write_dump(tmp_path)
+    store = StringStore.build(
+        tmp_path / "links.txt", tmp_path / "info.txt.gz", tmp_path / "store"
+    )
+    assert StringStore.exists(tmp_path / "store")
+    assert store.species_id == 9606
+
+    network = store.network(["TP53", "AKT1", "IL6", "STAT3", "MISSING"])
+    edges = {
+        frozenset(pair)
+        for pair in zip(network["preferredName_A"], network["preferredName_B"])
+    }
+    # TP53-IL6 低于默认阈值，STAT3-EGFR 的 EGFR 不在集合内
+    assert edges == {
+        frozenset({"TP53", "AKT1"}),
+        frozenset({"IL6", "STAT3"}),
+        frozenset({"AKT1", "STAT3"}),
+    }
+    assert network["score"].max() == 0.9
+
+    assert len(store.network(["TP53", "IL6"], required_score=150)) == 1
+    assert store.network(["EGFR"]).empty
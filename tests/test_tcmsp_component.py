@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+import pytest
+import requests
+
+from biorange.component.tcmsp_component import TCMSPComponentLocalScraper
+
+REQUEST_DELAY = 0.05
+# 录制的结果页：#tabstrip 的第 6 个子元素是带成分列表的 script
+RESULT_PAGE = (
+    '<html><body><div id="tabstrip"><ul></ul><div></div><div></div><div></div>'
+    "<div></div><script>$('#grid').kendoGrid({{dataSource: {{data: {data}}}}});"
+    "</script></div></body></html>"
+)
+HERBS = {
+    "大枣": ["MOL000001", "MOL000002", "MOL000003"],
+    "人参": ["MOL000003", "MOL000005"],
+    "陈皮": ["MOL000008", "MOL999999"],
+}
+
+
+class _StubTCMSP(BaseHTTPRequestHandler):
+    log = []
+    active = [0, 0]  # 当前并发数、峰值
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body):
+        body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.lock:
+            self.log.append(time.monotonic())
+            self.active[0] += 1
+            self.active[1] = max(self.active)
+        time.sleep(REQUEST_DELAY)
+        url = urlparse(self.path)
+        herb = parse_qs(url.query).get("qn", [""])[0]
+        with self.lock:
+            self.active[0] -= 1
+        if herb not in HERBS:
+            self._reply(404, "not found")
+        elif url.path == "/search.php":
+            self._reply(200, f"molecule.php?qn={quote(herb)}")
+        else:
+            data = [{"MOL_ID": mol, "herb_cn_name": herb} for mol in HERBS[herb]]
+            self._reply(200, RESULT_PAGE.format(data=json.dumps(data)))
+
+
+class FakePage:
+    """代替浏览器页面：搜索结果的链接也从替身服务取得。"""
+
+    def __init__(self, context):
+        self.context = context
+
+    async def goto(self, url):
+        self.base_url = url.rsplit("/", 1)[0]
+
+    async def fill(self, selector, value):
+        self.term = value
+
+    async def click(self, selector):
+        pass
+
+    async def wait_for_selector(self, selector):
+        pass
+
+    async def get_attribute(self, selector, name):
+        response = await asyncio.to_thread(
+            requests.get, f"{self.base_url}/search.php", params={"qn": self.term}
+        )
+        if response.status_code == 404:
+            raise TimeoutError(f"no result for {self.term}")
+        return response.text
+
+
+class FakeContext:
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+    async def new_context(self):
+        return FakeContext()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def scraper():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubTCMSP)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _StubTCMSP.log.clear()
+    _StubTCMSP.active[:] = [0, 0]
+
+    async def factory():
+        return FakeBrowser()
+
+    with TCMSPComponentLocalScraper(
+        pool_size=4, retries=0, base_url=f"http://127.0.0.1:{server.server_port}"
+    ) as scraper:
+        scraper.pool.browser_factory = factory
+        yield scraper
+    server.shutdown()
+
+
+def test_search_herbs_merges_once(scraper):
+    result = scraper.search_herbs(
+        ["大枣", "人参", "未知", "陈皮", "大枣"], requests_per_second=None
+    )
+    assert list(result.columns[:2]) == ["herb", "MOL_ID"]
+    assert list(zip(result["herb"], result["MOL_ID"])) == [
+        ("大枣", "MOL000001"),
+        ("大枣", "MOL000002"),
+        ("大枣", "MOL000003"),
+        ("人参", "MOL000003"),
+        ("人参", "MOL000005"),
+        ("陈皮", "MOL000008"),
+    ]
+    assert result["molecule_name"].notna().all()
+
+    single = scraper.search_herb("人参")
+    batch = result[result["herb"] == "人参"].drop(columns="herb")
+    assert batch.reset_index(drop=True).equals(single)
+
+
+def test_concurrency_limit(scraper):
+    herbs = list(HERBS)
+    start = time.perf_counter()
+    scraper.search_herbs(herbs, max_concurrency=3, requests_per_second=None)
+    elapsed = time.perf_counter() - start
+    assert _StubTCMSP.active[1] == 3
+    # 3 个草药各两次请求，并发时约为两次请求的耗时
+    assert elapsed < 6 * REQUEST_DELAY
+
+    _StubTCMSP.active[:] = [0, 0]
+    scraper.search_herbs(herbs, max_concurrency=1, requests_per_second=None)
+    assert _StubTCMSP.active[1] == 1
+
+
+def test_rate_limit(scraper):
+    scraper.search_herbs(list(HERBS), max_concurrency=3, requests_per_second=20)
+    log = sorted(_StubTCMSP.log)
+    assert len(log) == 6
+    # 放行间隔 0.05s，到达服务端的时间有少量抖动
+    assert log[-1] - log[0] > 0.9 * 5 / 20
+    assert min(b - a for a, b in zip(log, log[1:])) > 0.02
+
+
+def test_all_failed_returns_empty_frame(scraper):
+    result = scraper.search_herbs(["未知"])
+    assert result.empty and result.columns[0] == "herb"